@@ -0,0 +1,11 @@
+from django.utils import timezone
+
+
+def momento_marcacion():
+    """
+    Fecha y hora locales (``TIME_ZONE``) con las que se completa una marcación
+    que llega sin ellas. La usan todas las rutas de marcación, así el mismo
+    registro cerca de medianoche cae en el mismo día sin importar la ruta.
+    """
+    ahora = timezone.localtime()
+    return ahora.date(), ahora.time()
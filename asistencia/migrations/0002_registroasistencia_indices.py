@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencia', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registroasistencia',
+            index=models.Index(fields=['-fecha', '-hora'], name='asistencia_fecha_hora_desc'),
+        ),
+        migrations.AddIndex(
+            model_name='registroasistencia',
+            index=models.Index(fields=['usuario', '-fecha', '-hora'], name='asistencia_usuario_fecha_desc'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencia', '0002_registroasistencia_indices'),
+    ]
+
+    operations = [
+        # La paginación por cursor necesita un orden total: id desempata
+        # los registros con la misma fecha y hora
+        migrations.AlterModelOptions(
+            name='registroasistencia',
+            options={
+                'ordering': ['-fecha', '-hora', '-id'],
+                'verbose_name': 'Registro de Asistencia',
+                'verbose_name_plural': 'Registros de Asistencia',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='registroasistencia',
+            name='asistencia_fecha_hora_desc',
+        ),
+        migrations.RemoveIndex(
+            model_name='registroasistencia',
+            name='asistencia_usuario_fecha_desc',
+        ),
+        migrations.AddIndex(
+            model_name='registroasistencia',
+            index=models.Index(fields=['-fecha', '-hora', '-id'], name='asistencia_fecha_hora_id'),
+        ),
+        migrations.AddIndex(
+            model_name='registroasistencia',
+            index=models.Index(fields=['usuario', '-fecha', '-hora', '-id'], name='asistencia_usuario_fecha_id'),
+        ),
+    ]
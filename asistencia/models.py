@@ -20,8 +20,15 @@ class RegistroAsistencia(models.Model):
     class Meta:
         verbose_name = 'Registro de Asistencia'
         verbose_name_plural = 'Registros de Asistencia'
-        ordering = ['-fecha', '-hora']
+        # id desempata: el cursor necesita un orden total
+        ordering = ['-fecha', '-hora', '-id']
         unique_together = ['usuario', 'fecha', 'tipo']
+        indexes = [
+            # Rango de fechas de supervisores y orden por defecto del listado
+            models.Index(fields=['-fecha', '-hora', '-id'], name='asistencia_fecha_hora_id'),
+            # Registros de un usuario en un rango, ya ordenados
+            models.Index(fields=['usuario', '-fecha', '-hora', '-id'], name='asistencia_usuario_fecha_id'),
+        ]
 
     def __str__(self):
         return f"{self.usuario.get_full_name()} - {self.fecha} - {self.get_tipo_display()}"
\ No newline at end of file
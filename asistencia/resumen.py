@@ -0,0 +1,58 @@
+from django.db.models import DurationField, ExpressionWrapper, F, Max, Min, Q
+
+
+def jornadas_por_usuario(registros):
+    """
+    Agrupa los registros por usuario y fecha en una sola consulta.
+
+    Cada fila trae la hora de entrada (primera ``ENT``), la hora de salida
+    (última ``SAL``) y la duración de la jornada calculada en la base de datos.
+    """
+    return registros.order_by().values(
+        'usuario_id',
+        'usuario__username',
+        'usuario__first_name',
+        'usuario__last_name',
+        'fecha',
+    ).annotate(
+        entrada=Min('hora', filter=Q(tipo='ENT')),
+        salida=Max('hora', filter=Q(tipo='SAL')),
+    ).annotate(
+        duracion=ExpressionWrapper(F('salida') - F('entrada'), output_field=DurationField()),
+    ).order_by('usuario_id', 'fecha')
+
+
+def horas(duracion):
+    if duracion is None:
+        return None
+    return round(duracion.total_seconds() / 3600, 2)
+
+
+def resumen_por_usuario(registros):
+    """Construye el resumen por trabajador y por día con los totales de cada trabajador"""
+    usuarios = {}
+    for jornada in jornadas_por_usuario(registros):
+        usuario_id = jornada['usuario_id']
+        if usuario_id not in usuarios:
+            nombre = f"{jornada['usuario__first_name']} {jornada['usuario__last_name']}".strip()
+            usuarios[usuario_id] = {
+                'usuario_id': usuario_id,
+                'username': jornada['usuario__username'],
+                'nombre': nombre or jornada['usuario__username'],
+                'dias': {},
+                'dias_trabajados': 0,
+                'total_horas': 0,
+            }
+
+        resumen = usuarios[usuario_id]
+        horas_trabajadas = horas(jornada['duracion'])
+        resumen['dias'][jornada['fecha'].strftime('%Y-%m-%d')] = {
+            'entrada': jornada['entrada'].strftime('%H:%M') if jornada['entrada'] else None,
+            'salida': jornada['salida'].strftime('%H:%M') if jornada['salida'] else None,
+            'horas_trabajadas': horas_trabajadas,
+        }
+        if horas_trabajadas is not None:
+            resumen['dias_trabajados'] += 1
+            resumen['total_horas'] = round(resumen['total_horas'] + horas_trabajadas, 2)
+
+    return list(usuarios.values())
@@ -55,4 +55,13 @@ class RegistroAsistenciaSerializer(serializers.ModelSerializer):
             
             return super().create(validated_data)
         except Exception as e:
-            raise serializers.ValidationError(f"Error al crear el registro: {str(e)}") 
\ No newline at end of file
+            raise serializers.ValidationError(f"Error al crear el registro: {str(e)}") 
+
+class RegistroAsistenciaLoteSerializer(serializers.Serializer):
+    """Valida una marcación individual dentro de un lote enviado por un dispositivo de obra"""
+    usuario_id = serializers.IntegerField(required=False)
+    tipo = serializers.ChoiceField(choices=RegistroAsistencia.TIPOS_REGISTRO)
+    fecha = serializers.DateField(required=False)
+    hora = serializers.TimeField(required=False)
+    ubicacion = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    observaciones = serializers.CharField(required=False, allow_blank=True, allow_null=True)
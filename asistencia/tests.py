@@ -1,3 +1,226 @@
-from django.test import TestCase
+import json
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.testing import PlanConsultaMixin
+from usuarios.models import Usuario
+from .models import RegistroAsistencia
+from .views_async import registrar_asistencia
+
+
+class RegistroAsistenciaIndicesTests(PlanConsultaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuarios = [
+            Usuario.objects.create_user(username=f'tec{i}', password='clave-prueba', rol='TEC')
+            for i in range(5)
+        ]
+        inicio = date(2025, 1, 1)
+        RegistroAsistencia.objects.bulk_create([
+            RegistroAsistencia(usuario=usuario, fecha=inicio + timedelta(days=dia), hora=hora, tipo=tipo)
+            for usuario in cls.usuarios
+            for dia in range(90)
+            for tipo, hora in (('ENT', time(7, 0)), ('SAL', time(16, 0)))
+        ])
+        cls.rango = [date(2025, 2, 1), date(2025, 2, 28)]
+
+    def test_registros_de_usuario_en_rango(self):
+        self.assertSinSeqScan(
+            RegistroAsistencia.objects.filter(
+                usuario=self.usuarios[0], fecha__range=self.rango
+            ).order_by('-fecha', '-hora', '-id')
+        )
+
+    def test_registros_de_supervisor_en_rango(self):
+        self.assertSinSeqScan(
+            RegistroAsistencia.objects.filter(fecha__range=self.rango).order_by('-fecha', '-hora', '-id')
+        )
+
+    def test_listado_ordenado(self):
+        self.assertSinSeqScan(RegistroAsistencia.objects.order_by('-fecha', '-hora', '-id')[:100])
+
+
+class RegistroAsistenciaAsyncTests(TestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(username='tec', password='clave-prueba', rol='TEC')
+        self.factory = AsyncRequestFactory()
+        self.autorizacion = f'Bearer {AccessToken.for_user(self.usuario)}'
+
+    def marcar(self, datos):
+        request = self.factory.post(
+            '/api/asistencia/registrar/', data=json.dumps(datos),
+            content_type='application/json', HTTP_AUTHORIZATION=self.autorizacion,
+        )
+        return registrar_asistencia(request)
+
+    async def test_registrar(self):
+        response = await self.marcar({'tipo': 'ENT', 'fecha': '2025-03-03', 'hora': '07:05:00'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(json.loads(response.content)['tipo'], 'ENT')
+        self.assertEqual(await RegistroAsistencia.objects.filter(usuario=self.usuario).acount(), 1)
+
+    async def test_registro_duplicado(self):
+        await self.marcar({'tipo': 'ENT', 'fecha': '2025-03-03'})
+        response = await self.marcar({'tipo': 'ENT', 'fecha': '2025-03-03'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('registro_existente', json.loads(response.content))
+
+    async def test_sin_credenciales(self):
+        request = self.factory.post(
+            '/api/asistencia/registrar/', data='{"tipo": "ENT"}', content_type='application/json',
+        )
+        self.assertEqual((await registrar_asistencia(request)).status_code, 401)
+
+
+class ResumenAsistenciaTests(APITestCase):
+    def setUp(self):
+        self.supervisor = Usuario.objects.create_user(username='sup', password='clave-prueba', rol='SUP')
+        self.ana = Usuario.objects.create_user(
+            username='ana', password='clave-prueba', rol='TEC', first_name='Ana', last_name='Pérez'
+        )
+        self.luis = Usuario.objects.create_user(username='luis', password='clave-prueba', rol='TEC')
+        marcaciones = [
+            (self.ana, date(2025, 3, 3), 'ENT', time(7, 0)),
+            (self.ana, date(2025, 3, 3), 'SAL', time(16, 0)),
+            (self.ana, date(2025, 3, 4), 'ENT', time(8, 15)),
+            (self.ana, date(2025, 3, 4), 'SAL', time(12, 45)),
+            (self.luis, date(2025, 3, 3), 'ENT', time(6, 30)),
+            (self.luis, date(2025, 3, 3), 'SAL', time(15, 0)),
+            # Sin salida: la jornada aparece pero no suma horas.
+            (self.luis, date(2025, 3, 4), 'ENT', time(7, 0)),
+            (self.luis, date(2025, 3, 5), 'ENT', time(7, 0)),
+            (self.luis, date(2025, 3, 5), 'SAL', time(17, 30)),
+        ]
+        RegistroAsistencia.objects.bulk_create([
+            RegistroAsistencia(usuario=usuario, fecha=fecha, tipo=tipo, hora=hora)
+            for usuario, fecha, tipo, hora in marcaciones
+        ])
+        self.client.force_authenticate(self.supervisor)
+
+    def resumen(self, **params):
+        params = {'fecha_inicio': '2025-03-01', 'fecha_fin': '2025-03-31', **params}
+        response = self.client.get('/api/asistencia/resumen/', params)
+        self.assertEqual(response.status_code, 200)
+        return {u['username']: u for u in response.data['usuarios']}
+
+    def test_agrupa_por_trabajador_y_dia(self):
+        usuarios = self.resumen()
+
+        self.assertEqual(set(usuarios), {'ana', 'luis'})
+        ana = usuarios['ana']
+        self.assertEqual(ana['nombre'], 'Ana Pérez')
+        self.assertEqual(ana['dias'], {
+            '2025-03-03': {'entrada': '07:00', 'salida': '16:00', 'horas_trabajadas': 9.0},
+            '2025-03-04': {'entrada': '08:15', 'salida': '12:45', 'horas_trabajadas': 4.5},
+        })
+        self.assertEqual(ana['dias_trabajados'], 2)
+        self.assertEqual(ana['total_horas'], 13.5)
+
+    def test_dia_sin_salida(self):
+        luis = self.resumen()['luis']
+
+        self.assertEqual(luis['nombre'], 'luis')
+        self.assertEqual(
+            luis['dias']['2025-03-04'],
+            {'entrada': '07:00', 'salida': None, 'horas_trabajadas': None},
+        )
+        self.assertEqual(luis['dias']['2025-03-03']['horas_trabajadas'], 8.5)
+        self.assertEqual(luis['dias']['2025-03-05']['horas_trabajadas'], 10.5)
+        self.assertEqual(luis['dias_trabajados'], 2)
+        self.assertEqual(luis['total_horas'], 19.0)
+
+    def test_rango_y_usuario(self):
+        usuarios = self.resumen(usuario_id=self.luis.id, fecha_inicio='2025-03-04', fecha_fin='2025-03-04')
+
+        self.assertEqual(set(usuarios), {'luis'})
+        self.assertEqual(list(usuarios['luis']['dias']), ['2025-03-04'])
+        self.assertEqual(usuarios['luis']['dias_trabajados'], 0)
+
+    def test_tecnico_solo_ve_su_resumen(self):
+        self.client.force_authenticate(self.ana)
+
+        usuarios = self.resumen(usuario_id=self.luis.id)
+
+        self.assertEqual(set(usuarios), {'ana'})
+
+    def test_usuario_id_invalido(self):
+        response = self.client.get('/api/asistencia/resumen/', {'usuario_id': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+
+class RegistroAsistenciaListadoTests(APITestCase):
+    def setUp(self):
+        self.supervisor = Usuario.objects.create_user(username='sup', password='clave-prueba', rol='SUP')
+        self.client.force_authenticate(self.supervisor)
+
+    def marcar(self, username):
+        usuario = Usuario.objects.create_user(username=username, password='clave-prueba', rol='TEC')
+        RegistroAsistencia.objects.create(usuario=usuario, fecha=date(2025, 3, 3), hora=time(7, 0), tipo='ENT')
+
+    def consultas_listado(self):
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get('/api/asistencia/registros/')
+        self.assertEqual(response.status_code, 200)
+        return len(contexto)
+
+    def test_usuarios_sin_consulta_por_fila(self):
+        self.marcar('tec0')
+        consultas = self.consultas_listado()
+
+        for i in range(1, 4):
+            self.marcar(f'tec{i}')
+
+        self.assertEqual(self.consultas_listado(), consultas)
+
+    def test_cursor_recorre_empates_sin_repetir(self):
+        # Todos con la misma fecha y hora: solo id define el orden
+        for i in range(5):
+            self.marcar(f'tec{i}')
+
+        vistos = []
+        url, params = '/api/asistencia/registros/', {'page_size': 2}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            vistos += [registro['id'] for registro in response.data['results']]
+            url, params = response.data['next'], None
+
+        esperados = RegistroAsistencia.objects.order_by('-id').values_list('id', flat=True)
+        self.assertEqual(vistos, list(esperados))
+
+
+class RegistroAsistenciaLoteTests(APITestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(username='tec', password='clave-prueba', rol='TEC')
+        self.client.force_authenticate(self.usuario)
+
+    def test_lote_informa_creados_y_existentes(self):
+        RegistroAsistencia.objects.create(usuario=self.usuario, fecha=date(2025, 3, 3), hora=time(7, 0), tipo='ENT')
+        response = self.client.post('/api/asistencia/registrar-lote/', {'registros': [
+            {'tipo': 'ENT', 'fecha': '2025-03-03', 'hora': '07:00:00'},
+            {'tipo': 'SAL', 'fecha': '2025-03-03', 'hora': '16:00:00'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['creados'], 1)
+        self.assertEqual([r['estado'] for r in response.data['resultados']], ['existente', 'creado'])
+        self.assertEqual(RegistroAsistencia.objects.filter(usuario=self.usuario).count(), 2)
+
+    def test_misma_fecha_local_en_ambas_rutas(self):
+        # 03:30 UTC del 4 de marzo son las 22:30 del 3 de marzo en Bogotá
+        ahora = datetime(2025, 3, 4, 3, 30, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=ahora):
+            individual = self.client.post('/api/asistencia/registrar/', {'tipo': 'ENT'}, format='json')
+            lote = self.client.post('/api/asistencia/registrar-lote/', {'registros': [{'tipo': 'SAL'}]}, format='json')
+        self.assertEqual(individual.status_code, 201)
+        self.assertEqual(lote.status_code, 200)
+        self.assertEqual(
+            set(RegistroAsistencia.objects.filter(usuario=self.usuario).values_list('fecha', flat=True)),
+            {date(2025, 3, 3)},
+        )
@@ -1,12 +1,15 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     RegistroAsistenciaCreateView,
+    RegistroAsistenciaLoteView,
     RegistroAsistenciaListView,
     RegistroAsistenciaAdminListView,
     ResumenAsistenciaView,
     RegistroAsistenciaViewSet
 )
+from . import views_async
 
 app_name = 'asistencia'  # Namespace opcional para tus URLs
 
@@ -17,14 +20,24 @@ router.register(r'registros', RegistroAsistenciaViewSet, basename='registroasist
 # URLs para la API REST
 api_urlpatterns = [
     path('', include(router.urls)),
-    path('registrar/', RegistroAsistenciaCreateView.as_view(), name='registro-asistencia-create'),
-    path('mis-registros/', RegistroAsistenciaListView.as_view(), name='mis-registros'),
+    path('registrar-lote/', RegistroAsistenciaLoteView.as_view(), name='registro-asistencia-lote'),
     path('registros/', RegistroAsistenciaAdminListView.as_view(), name='registros-admin'),
     path('resumen/', ResumenAsistenciaView.as_view(), name='resumen-asistencia'),
+    path('mis-registros/', RegistroAsistenciaListView.as_view(), name='mis-registros'),
     # path('reporte/', views.reporte_asistencia, name='reporte'),
     # Agrega más rutas según necesites
 ]
 
+# Marcación: bajo ASGI se atiende con una vista asíncrona para soportar el pico de inicio de turno
+if settings.SERVIDOR_ASGI:
+    api_urlpatterns += [
+        path('registrar/', views_async.registrar_asistencia, name='registro-asistencia-create'),
+    ]
+else:
+    api_urlpatterns += [
+        path('registrar/', RegistroAsistenciaCreateView.as_view(), name='registro-asistencia-create'),
+    ]
+
 # URLs para la interfaz web
 web_urlpatterns = [
     # Agrega aquí las URLs para la interfaz web si las necesitas
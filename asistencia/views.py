@@ -4,13 +4,49 @@ from django.http import HttpResponse
 from rest_framework import generics, permissions, status, viewsets
 from rest_framework.response import Response
 from .models import RegistroAsistencia
-from .serializers import RegistroAsistenciaSerializer
+from .serializers import RegistroAsistenciaSerializer, RegistroAsistenciaLoteSerializer
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.db import connection
 from django.db.models import Q
 from datetime import datetime, timedelta
 from usuarios.models import Usuario
 from rest_framework import serializers
 from .permissions import PuedeGestionarAsistencias
+from .marcacion import momento_marcacion
+from .resumen import resumen_por_usuario
+from backend.mixins import ListadoStreamingMixin
+from backend.exportacion import ExportacionMixin
+from backend.cache import RespuestaCondicionalMixin
+
+def insertar_sin_conflictos(registros, batch_size=500):
+    """
+    Inserta con ``ON CONFLICT DO NOTHING ... RETURNING`` y devuelve las claves
+    ``(usuario_id, fecha, tipo)`` realmente insertadas. ``bulk_create`` con
+    ``ignore_conflicts`` no informa qué filas perdió frente a una marcación
+    concurrente.
+    """
+    campos = [campo for campo in RegistroAsistencia._meta.concrete_fields if not campo.primary_key]
+    tabla = connection.ops.quote_name(RegistroAsistencia._meta.db_table)
+    columnas = ', '.join(connection.ops.quote_name(campo.column) for campo in campos)
+    fila = '(' + ', '.join(['%s'] * len(campos)) + ')'
+
+    insertadas = set()
+    with connection.cursor() as cursor:
+        for inicio in range(0, len(registros), batch_size):
+            lote = registros[inicio:inicio + batch_size]
+            parametros = [
+                campo.get_db_prep_save(campo.pre_save(registro, add=True), connection)
+                for registro in lote
+                for campo in campos
+            ]
+            cursor.execute(
+                f'INSERT INTO {tabla} ({columnas}) VALUES {", ".join([fila] * len(lote))} '
+                'ON CONFLICT DO NOTHING RETURNING usuario_id, fecha, tipo',
+                parametros
+            )
+            insertadas.update(cursor.fetchall())
+    return insertadas
 
 def index(request):
     return HttpResponse("¡Bienvenido al sistema de asistencia!")  # Mensaje básico
@@ -29,10 +65,11 @@ class RegistroAsistenciaCreateView(generics.CreateAPIView):
 
             # Preparar los datos para el serializer
             data = request.data.copy()
+            hoy, hora_actual = momento_marcacion()
             if 'fecha' not in data:
-                data['fecha'] = timezone.now().date()
+                data['fecha'] = hoy
             if 'hora' not in data:
-                data['hora'] = timezone.now().time()
+                data['hora'] = hora_actual
 
             # Validar que no exista un registro similar
             tipo = data.get('tipo')
@@ -84,16 +121,110 @@ class RegistroAsistenciaCreateView(generics.CreateAPIView):
     def perform_create(self, serializer):
         serializer.save(usuario=self.request.user)
 
-class RegistroAsistenciaListView(generics.ListAPIView):
+class RegistroAsistenciaLoteView(generics.GenericAPIView):
+    """
+    Registra un lote de marcaciones (p. ej. las acumuladas por una tableta sin
+    conexión). Los duplicados se resuelven contra ``(usuario, fecha, tipo)``
+    con una sola consulta y los nuevos se insertan con ``insertar_sin_conflictos``.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_registros = 1000
+
+    def post(self, request):
+        items = request.data.get('registros') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list):
+            return Response(
+                {"error": "Se espera una lista de registros"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > self.max_registros:
+            return Response(
+                {"error": f"El lote no puede tener más de {self.max_registros} registros"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        usuario = request.user
+        puede_registrar_otros = usuario.es_supervisor or usuario.es_arquitecto
+        hoy, hora_actual = momento_marcacion()
+
+        resultados = [None] * len(items)
+        validos = {}
+        for indice, item in enumerate(items):
+            serializer = RegistroAsistenciaLoteSerializer(data=item)
+            if not serializer.is_valid():
+                resultados[indice] = {'indice': indice, 'estado': 'invalido', 'errores': serializer.errors}
+                continue
+
+            data = serializer.validated_data
+            usuario_id = data.get('usuario_id', usuario.id)
+            if usuario_id != usuario.id and not puede_registrar_otros:
+                resultados[indice] = {
+                    'indice': indice,
+                    'estado': 'invalido',
+                    'errores': {'usuario_id': ['No puede registrar asistencia de otros usuarios']}
+                }
+                continue
+
+            clave = (usuario_id, data.get('fecha', hoy), data['tipo'])
+            if clave in validos:
+                resultados[indice] = {'indice': indice, 'estado': 'duplicado'}
+                continue
+            validos[clave] = (indice, data)
+
+        # Usuarios inexistentes y registros ya guardados, en una consulta cada uno
+        usuarios_ids = {clave[0] for clave in validos}
+        usuarios_existentes = set(
+            Usuario.objects.filter(id__in=usuarios_ids).values_list('id', flat=True)
+        )
+        existentes = set(
+            RegistroAsistencia.objects.filter(
+                usuario_id__in=usuarios_existentes,
+                fecha__in={clave[1] for clave in validos},
+                tipo__in={clave[2] for clave in validos},
+            ).values_list('usuario_id', 'fecha', 'tipo')
+        )
+
+        nuevos = {}
+        for clave, (indice, data) in validos.items():
+            if clave[0] not in usuarios_existentes:
+                resultados[indice] = {
+                    'indice': indice,
+                    'estado': 'invalido',
+                    'errores': {'usuario_id': ['Usuario no encontrado']}
+                }
+            elif clave in existentes:
+                resultados[indice] = {'indice': indice, 'estado': 'existente'}
+            else:
+                nuevos[clave] = (indice, RegistroAsistencia(
+                    usuario_id=clave[0],
+                    fecha=clave[1],
+                    tipo=clave[2],
+                    hora=data.get('hora', hora_actual),
+                    ubicacion=data.get('ubicacion'),
+                    observaciones=data.get('observaciones'),
+                ))
+
+        # Las marcaciones que llegaron en paralelo quedan como existentes
+        insertadas = insertar_sin_conflictos([registro for _, registro in nuevos.values()])
+        for clave, (indice, _) in nuevos.items():
+            resultados[indice] = {'indice': indice, 'estado': 'creado' if clave in insertadas else 'existente'}
+
+        return Response({
+            'creados': len(insertadas),
+            'resultados': resultados,
+        })
+
+class RegistroAsistenciaListView(RespuestaCondicionalMixin, ListadoStreamingMixin, generics.ListAPIView):
     serializer_class = RegistroAsistenciaSerializer
     permission_classes = [permissions.IsAuthenticated]
+    campo_actualizacion = 'actualizado_en'
 
     def get_queryset(self):
         usuario = self.request.user
         fecha_inicio = self.request.query_params.get('fecha_inicio')
         fecha_fin = self.request.query_params.get('fecha_fin')
         
-        queryset = RegistroAsistencia.objects.filter(usuario=usuario)
+        queryset = RegistroAsistencia.objects.filter(usuario=usuario).select_related('usuario')
         
         if fecha_inicio:
             queryset = queryset.filter(fecha__gte=fecha_inicio)
@@ -102,9 +233,10 @@ class RegistroAsistenciaListView(generics.ListAPIView):
             
         return queryset
 
-class RegistroAsistenciaAdminListView(generics.ListAPIView):
+class RegistroAsistenciaAdminListView(RespuestaCondicionalMixin, ListadoStreamingMixin, generics.ListAPIView):
     serializer_class = RegistroAsistenciaSerializer
     permission_classes = [permissions.IsAuthenticated]
+    campo_actualizacion = 'actualizado_en'
 
     def get_queryset(self):
         # Solo supervisores y arquitectos pueden ver todos los registros
@@ -115,7 +247,7 @@ class RegistroAsistenciaAdminListView(generics.ListAPIView):
         fecha_inicio = self.request.query_params.get('fecha_inicio')
         fecha_fin = self.request.query_params.get('fecha_fin')
         
-        queryset = RegistroAsistencia.objects.all()
+        queryset = RegistroAsistencia.objects.select_related('usuario')
         
         if usuario_id:
             queryset = queryset.filter(usuario_id=usuario_id)
@@ -130,47 +262,60 @@ class ResumenAsistenciaView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        fecha_inicio = request.query_params.get('fecha_inicio')
-        fecha_fin = request.query_params.get('fecha_fin') or timezone.now().date()
-        
-        if not fecha_inicio:
-            fecha_inicio = fecha_fin - timedelta(days=30)
-            
+        try:
+            fecha_fin = request.query_params.get('fecha_fin')
+            fecha_fin = parse_date(fecha_fin) if fecha_fin else timezone.now().date()
+            fecha_inicio = request.query_params.get('fecha_inicio')
+            fecha_inicio = parse_date(fecha_inicio) if fecha_inicio else fecha_fin - timedelta(days=30)
+        except ValueError:
+            fecha_inicio = fecha_fin = None
+        if not fecha_inicio or not fecha_fin:
+            return Response(
+                {"error": "Formato de fecha inválido. Use YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         registros = RegistroAsistencia.objects.filter(
             fecha__range=[fecha_inicio, fecha_fin]
         )
-        
+
         if not (request.user.es_supervisor or request.user.es_arquitecto):
             registros = registros.filter(usuario=request.user)
-            
-        resumen = {}
-        for registro in registros:
-            fecha_str = registro.fecha.strftime('%Y-%m-%d')
-            if fecha_str not in resumen:
-                resumen[fecha_str] = {
-                    'entrada': None,
-                    'salida': None,
-                    'horas_trabajadas': None
-                }
-            
-            if registro.tipo == 'ENT':
-                resumen[fecha_str]['entrada'] = registro.hora.strftime('%H:%M')
-            elif registro.tipo == 'SAL':
-                resumen[fecha_str]['salida'] = registro.hora.strftime('%H:%M')
-                
-                # Calcular horas trabajadas si tenemos entrada y salida
-                if resumen[fecha_str]['entrada']:
-                    entrada = datetime.strptime(resumen[fecha_str]['entrada'], '%H:%M')
-                    salida = datetime.strptime(resumen[fecha_str]['salida'], '%H:%M')
-                    horas_trabajadas = (salida - entrada).total_seconds() / 3600
-                    resumen[fecha_str]['horas_trabajadas'] = round(horas_trabajadas, 2)
-        
-        return Response(resumen)
+        else:
+            usuario_id = request.query_params.get('usuario_id')
+            if usuario_id:
+                try:
+                    registros = registros.filter(usuario_id=int(usuario_id))
+                except ValueError:
+                    return Response(
+                        {"error": "usuario_id debe ser un número entero"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+        return Response({
+            'fecha_inicio': fecha_inicio.strftime('%Y-%m-%d'),
+            'fecha_fin': fecha_fin.strftime('%Y-%m-%d'),
+            'usuarios': resumen_por_usuario(registros),
+        })
 
-class RegistroAsistenciaViewSet(viewsets.ModelViewSet):
+class RegistroAsistenciaViewSet(ExportacionMixin, RespuestaCondicionalMixin, ListadoStreamingMixin, viewsets.ModelViewSet):
     queryset = RegistroAsistencia.objects.all()
     serializer_class = RegistroAsistenciaSerializer
     permission_classes = [permissions.IsAuthenticated]
+    campo_actualizacion = 'actualizado_en'
+    cursor_ordering = ('-fecha', '-hora', '-id')
+    nombre_exportacion = 'asistencia'
+    columnas_exportacion = [
+        ('id', 'ID'),
+        ('usuario__username', 'Usuario'),
+        ('usuario__first_name', 'Nombre'),
+        ('usuario__last_name', 'Apellido'),
+        ('fecha', 'Fecha'),
+        ('hora', 'Hora'),
+        ('tipo', 'Tipo'),
+        ('ubicacion', 'Ubicación'),
+        ('observaciones', 'Observaciones'),
+    ]
 
     def get_permissions(self):
         if self.action in ['update', 'partial_update', 'destroy']:
@@ -178,7 +323,8 @@ class RegistroAsistenciaViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated()]
 
     def get_queryset(self):
-        queryset = RegistroAsistencia.objects.all()
+        # UserBasicSerializer lee el usuario de cada fila: se trae en el mismo JOIN
+        queryset = RegistroAsistencia.objects.select_related('usuario')
         
         # Si no es supervisor o arquitecto, solo ver sus registros
         if not (self.request.user.es_supervisor or self.request.user.es_arquitecto):
@@ -193,7 +339,7 @@ class RegistroAsistenciaViewSet(viewsets.ModelViewSet):
         if fecha_fin:
             queryset = queryset.filter(fecha__lte=fecha_fin)
             
-        return queryset.order_by('-fecha', '-hora')
+        return queryset.order_by('-fecha', '-hora', '-id')
 
     def perform_create(self, serializer):
         serializer.save(usuario=self.request.user)
@@ -0,0 +1,63 @@
+"""
+Versión asíncrona de la marcación, la ruta que recibe el pico de carga al
+inicio de cada turno. Se activa en lugar de ``RegistroAsistenciaCreateView``
+cuando el proyecto corre bajo ASGI (ver ``SERVIDOR_ASGI`` en settings) y
+responde lo mismo. El listado ``mis-registros/`` sigue siendo la vista DRF
+en ambos modos: conserva la paginación por cursor, ``?stream=1`` y el GET
+condicional.
+"""
+import json
+
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from backend.asincrono import no_autenticado, respuesta_json, usuario_autenticado
+from .marcacion import momento_marcacion
+from .models import RegistroAsistencia
+from .serializers import RegistroAsistenciaLoteSerializer, RegistroAsistenciaSerializer
+
+
+@csrf_exempt
+@require_POST
+async def registrar_asistencia(request):
+    usuario = await usuario_autenticado(request)
+    if usuario is None:
+        return no_autenticado()
+
+    try:
+        datos = json.loads(request.body or b'{}')
+    except ValueError:
+        return respuesta_json({'error': 'El cuerpo de la petición no es JSON válido'}, status=400)
+
+    # Solo validación de formato, no consulta la base de datos
+    serializer = RegistroAsistenciaLoteSerializer(data=datos)
+    if not serializer.is_valid():
+        return respuesta_json({'error': str(serializer.errors)}, status=400)
+    datos = serializer.validated_data
+    hoy, hora_actual = momento_marcacion()
+    fecha = datos.get('fecha') or hoy
+    tipo = datos['tipo']
+
+    registro_existente = await RegistroAsistencia.objects.filter(
+        usuario=usuario, fecha=fecha, tipo=tipo
+    ).afirst()
+    if registro_existente:
+        registro_existente.usuario = usuario
+        return respuesta_json({
+            'error': f'Ya existe un registro de {tipo} para este usuario en esta fecha',
+            'registro_existente': RegistroAsistenciaSerializer(registro_existente).data,
+        }, status=400)
+
+    try:
+        registro = await RegistroAsistencia.objects.acreate(
+            usuario=usuario,
+            fecha=fecha,
+            hora=datos.get('hora') or hora_actual,
+            tipo=tipo,
+            ubicacion=datos.get('ubicacion'),
+            observaciones=datos.get('observaciones'),
+        )
+    except Exception as e:
+        return respuesta_json({'error': f'Error al crear el registro: {str(e)}'}, status=500)
+
+    return respuesta_json(RegistroAsistenciaSerializer(registro).data, status=201)
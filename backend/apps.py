@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+
+
+class BackendConfig(AppConfig):
+    name = 'backend'
+    verbose_name = 'Backend'
+
+    def ready(self):
+        from django.db.models.signals import post_save
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        from . import checks  # noqa: F401 registra la verificación de la caché compartida
+        from .autenticacion import conectar_senales
+        from .blacklist import notificar_revocacion
+
+        conectar_senales()
+        post_save.connect(notificar_revocacion, sender=BlacklistedToken, dispatch_uid='blacklist_notificar_revocacion')
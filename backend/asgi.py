@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Activa las vistas asíncronas de marcación y la pila de middleware sin WhiteNoise
+os.environ.setdefault('SERVIDOR_ASGI', 'True')
 
 application = get_asgi_application()
@@ -0,0 +1,67 @@
+"""
+Utilidades para las vistas asíncronas (``async def``) que atienden los picos
+de carga bajo ASGI.
+
+DRF 3.14 no soporta vistas asíncronas, así que estas vistas son vistas
+Django normales: la autenticación replica la de la API (JWT Bearer con
+respaldo en la sesión y su verificación CSRF) usando el ORM asíncrono, y las
+respuestas se codifican con el mismo encoder JSON de DRF.
+"""
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+
+def respuesta_json(datos, status=200):
+    return JsonResponse(datos, status=status, encoder=JSONEncoder, safe=False)
+
+
+def no_autenticado():
+    return respuesta_json(
+        {'detail': 'Las credenciales de autenticación no se proveyeron.'}, status=401
+    )
+
+
+def falla_csrf(request):
+    """Misma verificación que SessionAuthentication.enforce_csrf de DRF."""
+    verificador = CsrfViewMiddleware(lambda request: None)
+    verificador.process_request(request)
+    return verificador.process_view(request, None, (), {})
+
+
+async def usuario_autenticado(request):
+    """
+    Devuelve el usuario del token JWT o, si no hay encabezado Authorization,
+    el de la sesión. ``None`` si no hay credenciales válidas.
+    """
+    autenticador = JWTAuthentication()
+    encabezado = autenticador.get_header(request)
+    if encabezado is not None:
+        token_crudo = autenticador.get_raw_token(encabezado)
+        if token_crudo is None:
+            return None
+        try:
+            # Solo verifica firma y expiración, no toca la base de datos
+            token = autenticador.get_validated_token(token_crudo)
+            user_id = token[api_settings.USER_ID_CLAIM]
+        except (InvalidToken, TokenError, KeyError):
+            return None
+        Usuario = get_user_model()
+        try:
+            usuario = await Usuario.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except Usuario.DoesNotExist:
+            return None
+        return usuario if usuario.is_active else None
+
+    if not hasattr(request, 'auser'):
+        return None
+    usuario = await request.auser()
+    if not usuario.is_authenticated:
+        return None
+    if falla_csrf(request) is not None:
+        return None
+    return usuario
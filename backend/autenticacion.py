@@ -0,0 +1,151 @@
+"""
+Autenticación JWT con el usuario y sus permisos en caché.
+
+``JWTAuthentication`` de simplejwt carga el usuario desde Postgres en cada
+petición y ``has_perm`` agrega las consultas de grupos y permisos. Aquí se
+guarda una proyección del usuario (sus columnas salvo ``password`` y
+``last_login``) junto con sus conjuntos de permisos, bajo una clave que
+incluye una versión global y una versión por usuario. El usuario se
+reconstruye con esos campos y los demás quedan diferidos: se leen de la base
+si alguien los usa, y ``save()`` solo escribe los cargados. Las señales de
+abajo suben las versiones al confirmarse la transacción que cambia el
+usuario, sus grupos o los permisos (antes, otra petición podría volver a
+cachear los datos viejos con la versión nueva), así que en régimen estable
+autenticar no hace ninguna consulta.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+AUTENTICACION_CACHE_TIMEOUT = getattr(settings, 'AUTENTICACION_CACHE_TIMEOUT', 300)
+VERSION_GLOBAL_KEY = 'auth:version'
+CAMPOS_EXCLUIDOS = ('password', 'last_login')
+CACHES_PERMISOS = ('_perm_cache', '_user_perm_cache', '_group_perm_cache')
+
+
+def clave_version_usuario(user_id):
+    return f'auth:usuario:{user_id}:version'
+
+
+def version_permisos(user_id):
+    """
+    Versión vigente de los permisos del usuario (global.usuario). También es
+    la época de revocación que viaja en el token: las versiones parten del
+    reloj, así que aunque se vacíe la caché nunca se repite una anterior.
+    """
+    claves = [VERSION_GLOBAL_KEY, clave_version_usuario(user_id)]
+    versiones = cache.get_many(claves)
+    for clave in claves:
+        if clave not in versiones:
+            cache.add(clave, int(time.time() * 1000), None)
+            versiones[clave] = cache.get(clave)
+    return f'{versiones[claves[0]]}.{versiones[claves[1]]}'
+
+
+def clave_usuario(user_id):
+    return f'auth:usuario:{user_id}:v{version_permisos(user_id)}'
+
+
+def incrementar(clave):
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.set(clave, int(time.time() * 1000), None)
+
+
+def invalidar_usuario(user_id):
+    clave = clave_version_usuario(user_id)
+    transaction.on_commit(lambda: incrementar(clave))
+
+
+def invalidar_todos():
+    """Para cambios en grupos o permisos que pueden afectar a cualquier usuario."""
+    transaction.on_commit(lambda: incrementar(VERSION_GLOBAL_KEY))
+
+
+def proyeccion(usuario):
+    """Lo que se guarda en caché: columnas sin credenciales y permisos ya resueltos."""
+    # Llena _perm_cache, _user_perm_cache y _group_perm_cache
+    usuario.get_all_permissions()
+    return {
+        'campos': {
+            campo.attname: getattr(usuario, campo.attname)
+            for campo in usuario._meta.concrete_fields
+            if campo.attname not in CAMPOS_EXCLUIDOS
+        },
+        'permisos': {nombre: getattr(usuario, nombre) for nombre in CACHES_PERMISOS},
+    }
+
+
+def reconstruir(datos):
+    Usuario = get_user_model()
+    campos = datos['campos']
+    usuario = Usuario.from_db(router.db_for_read(Usuario), list(campos), list(campos.values()))
+    for nombre, valor in datos['permisos'].items():
+        setattr(usuario, nombre, valor)
+    return usuario
+
+
+class JWTAutenticacionCacheada(JWTAuthentication):
+    def get_user(self, validated_token):
+        if not settings.CACHE_COMPARTIDA:
+            # Las invalidaciones de otro worker no llegarían a esta caché
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            return super().get_user(validated_token)
+
+        clave = clave_usuario(user_id)
+        datos = cache.get(clave)
+        if datos is None:
+            usuario = super().get_user(validated_token)
+            cache.set(clave, proyeccion(usuario), AUTENTICACION_CACHE_TIMEOUT)
+            return usuario
+        return reconstruir(datos)
+
+
+# --- Invalidación ---
+
+def usuario_modificado(sender, instance, **kwargs):
+    invalidar_usuario(instance.pk)
+
+
+def relaciones_usuario_modificadas(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidar_usuario(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            invalidar_usuario(user_id)
+    else:
+        invalidar_todos()
+
+
+def permisos_modificados(sender, **kwargs):
+    action = kwargs.get('action')
+    if action is None or action.startswith('post_'):
+        invalidar_todos()
+
+
+def conectar_senales():
+    Usuario = get_user_model()
+    post_save.connect(usuario_modificado, sender=Usuario, dispatch_uid='auth_cache_usuario_save')
+    post_delete.connect(usuario_modificado, sender=Usuario, dispatch_uid='auth_cache_usuario_delete')
+    m2m_changed.connect(relaciones_usuario_modificadas, sender=Usuario.groups.through,
+                        dispatch_uid='auth_cache_usuario_grupos')
+    m2m_changed.connect(relaciones_usuario_modificadas, sender=Usuario.user_permissions.through,
+                        dispatch_uid='auth_cache_usuario_permisos')
+    m2m_changed.connect(permisos_modificados, sender=Group.permissions.through,
+                        dispatch_uid='auth_cache_grupo_permisos')
+    for modelo in (Group, Permission):
+        post_save.connect(permisos_modificados, sender=modelo, dispatch_uid=f'auth_cache_{modelo.__name__}_save')
+        post_delete.connect(permisos_modificados, sender=modelo, dispatch_uid=f'auth_cache_{modelo.__name__}_delete')
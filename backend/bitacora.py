@@ -0,0 +1,181 @@
+"""
+Registro de logs sin bloquear la petición.
+
+Los loggers de la aplicación escriben en ``ManejadorCola``: el hilo de la
+petición solo filtra (nivel y muestreo) y encola el registro; el formateo
+(JSON o texto) y la escritura en consola o en el archivo rotativo los hace un
+``QueueListener`` en un hilo aparte. La cola es acotada: si el disco se
+traba, los registros que no entran se descartan y se cuentan en lugar de
+frenar las peticiones. El conteo sale en ``/api/metrics/`` y, cuando la cola
+vuelve a tener lugar, como una advertencia en el propio log.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import weakref
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from django.utils.module_loading import import_string
+
+FORMATO_TEXTO = '{levelname} {asctime} {name} {process:d} {thread:d} {message}'
+
+# Atributos propios de LogRecord; el resto son campos pasados con ``extra=``
+ATRIBUTOS_REGISTRO = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+_manejadores = weakref.WeakSet()
+
+
+def registros_descartados():
+    """Registros descartados por cola llena en este proceso."""
+    return sum(manejador.descartados for manejador in list(_manejadores))
+
+
+class FormateadorJSON(logging.Formatter):
+    """Un objeto JSON por línea, con los campos de ``extra=`` incluidos."""
+
+    def format(self, record):
+        datos = {
+            'fecha': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+            'modulo': record.module,
+            'linea': record.lineno,
+            'proceso': record.process,
+            'hilo': record.threadName,
+        }
+        for clave, valor in vars(record).items():
+            if clave not in ATRIBUTOS_REGISTRO and not clave.startswith('_'):
+                datos[clave] = valor
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            datos['excepcion'] = record.exc_text
+        if record.stack_info:
+            datos['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class FiltroMuestreo(logging.Filter):
+    """
+    Deja pasar solo una fracción de los registros por debajo de WARNING según
+    el logger: ``tasas={'backend.metricas': 0.1}`` conserva el 10 % de las
+    líneas de ``backend.metricas`` y de sus hijos. Advertencias y errores pasan
+    siempre.
+    """
+
+    def __init__(self, tasas=None):
+        super().__init__()
+        self.tasas = dict(tasas or {})
+        self._por_logger = {}
+
+    def tasa(self, nombre):
+        if nombre not in self._por_logger:
+            # El prefijo más largo que coincida define la tasa
+            tasa = 1.0
+            for prefijo in sorted(self.tasas, key=len):
+                if nombre == prefijo or nombre.startswith(prefijo + '.'):
+                    tasa = self.tasas[prefijo]
+            self._por_logger[nombre] = tasa
+        return self._por_logger[nombre]
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        tasa = self.tasa(record.name)
+        return tasa >= 1 or random.random() < tasa
+
+
+def crear_destino(clase, formato='texto', **opciones):
+    archivo = opciones.get('filename')
+    if archivo:
+        os.makedirs(os.path.dirname(os.path.abspath(archivo)), exist_ok=True)
+    destino = import_string(clase)(**opciones)
+    destino.setFormatter(FormateadorJSON() if formato == 'json' else logging.Formatter(FORMATO_TEXTO, style='{'))
+    return destino
+
+
+class ManejadorCola(QueueHandler):
+    """
+    QueueHandler con su propio listener. ``destinos`` es una lista de
+    diccionarios con ``clase`` (ruta del handler real), ``formato`` (``json``
+    o ``texto``) y los argumentos del handler, por ejemplo::
+
+        {'clase': 'logging.handlers.WatchedFileHandler', 'formato': 'json',
+         'filename': 'logs/backend.log'}
+
+    Con varios workers ningún proceso debe rotar un archivo compartido:
+    ``WatchedFileHandler`` solo agrega líneas y lo reabre cuando logrotate lo
+    mueve.
+    """
+
+    def __init__(self, destinos, tamano_cola=10000):
+        super().__init__(queue.Queue(maxsize=tamano_cola))
+        self.configuracion = [dict(destino) for destino in destinos]
+        self.descartados = 0
+        self.informados = 0
+        self.listener = None
+        _manejadores.add(self)
+        self.iniciar()
+        atexit.register(self.detener)
+        if hasattr(os, 'register_at_fork'):
+            # Los hilos no sobreviven al fork (gunicorn --preload): cada hijo arranca el suyo
+            os.register_at_fork(after_in_child=self.reiniciar)
+
+    def iniciar(self):
+        destinos = [crear_destino(**destino) for destino in self.configuracion]
+        self.listener = QueueListener(self.queue, *destinos, respect_handler_level=True)
+        self.listener.start()
+
+    def detener(self):
+        if self.listener is not None:
+            self.listener.stop()
+            for destino in self.listener.handlers:
+                destino.close()
+            self.listener = None
+
+    def reiniciar(self):
+        # En el hijo el hilo del listener ya no existe: se descarta sin join
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        self.listener = None
+        self.iniciar()
+
+    def prepare(self, record):
+        # Solo se resuelve el mensaje (los argumentos pueden cambiar después);
+        # el formateo y la traza de la excepción quedan para el listener
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        # emit() corre con el lock del manejador: los contadores no necesitan otro
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+            return
+        if self.descartados > self.informados:
+            self.informar_descartados()
+
+    def informar_descartados(self):
+        aviso = logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            'Cola de logs llena: se descartaron %d registros (%d desde el inicio)',
+            (self.descartados - self.informados, self.descartados), None,
+        )
+        try:
+            self.queue.put_nowait(self.prepare(aviso))
+        except queue.Full:
+            return
+        self.informados = self.descartados
+
+    def close(self):
+        self.detener()
+        super().close()
@@ -0,0 +1,198 @@
+"""
+Lista negra de refresh tokens con un filtro de Bloom delante de la tabla.
+
+Con ``BLACKLIST_AFTER_ROTATION`` cada refresh consulta
+``BlacklistedToken`` por jti. Aquí cada worker mantiene un filtro de Bloom
+con los jti revocados: si el jti no está en el filtro seguro que no está
+revocado y no se consulta la tabla; solo los positivos (revocados de verdad
+o falsos positivos) llegan a Postgres.
+
+El filtro se construye la primera vez que el worker lo necesita y se
+mantiene al día con un contador en caché: cada revocación (de cualquier
+worker) lo incrementa y los demás vuelven a leer las filas revocadas desde
+su última carga menos ``SOLAPAMIENTO``. No se usa el id como marca de agua:
+ids y fechas se asignan antes del commit, así que una fila confirmada tarde
+puede quedar por debajo de la última cargada. El comando ``purgar_tokens``
+borra los tokens vencidos y pide a todos los workers reconstruir el filtro,
+así la tabla y el filtro quedan acotados.
+
+Todo esto depende de que los workers compartan la caché; sin
+``CACHE_COMPARTIDA`` cada verificación va directo a la tabla.
+"""
+import hashlib
+import math
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer, TokenVerifySerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+
+from .permissions import agregar_claims_permisos
+
+VERSION_KEY = 'blacklist:version'
+GENERACION_KEY = 'blacklist:generacion'
+CAPACIDAD_MINIMA = getattr(settings, 'BLACKLIST_BLOOM_CAPACIDAD', 100_000)
+TASA_ERROR = getattr(settings, 'BLACKLIST_BLOOM_ERROR', 0.001)
+# Cota de lo que puede tardar en confirmarse una revocación (más el desfase
+# de reloj entre workers)
+SOLAPAMIENTO = timedelta(seconds=getattr(settings, 'BLACKLIST_SOLAPAMIENTO_SEGUNDOS', 300))
+
+
+class FiltroBloom:
+    def __init__(self, capacidad, tasa_error=TASA_ERROR):
+        self.capacidad = capacidad
+        self.m = math.ceil(-capacidad * math.log(tasa_error) / math.log(2) ** 2)
+        self.k = max(1, round(self.m / capacidad * math.log(2)))
+        self.bits = bytearray((self.m + 7) // 8)
+        self.elementos = 0
+
+    def posiciones(self, valor):
+        # Doble hashing (Kirsch-Mitzenmacher) sobre un solo digest
+        digest = hashlib.blake2b(valor.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.m for i in range(self.k))
+
+    def agregar(self, valor):
+        for posicion in self.posiciones(valor):
+            self.bits[posicion >> 3] |= 1 << (posicion & 7)
+        self.elementos += 1
+
+    def __contains__(self, valor):
+        return all(self.bits[posicion >> 3] & (1 << (posicion & 7)) for posicion in self.posiciones(valor))
+
+
+class EstadoFiltro:
+    """Filtro del worker con la marca de la última carga y las versiones vistas."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.filtro = None
+        self.cargado_hasta = None
+        # jti leídos dentro de la ventana de solapamiento, para no contarlos dos veces
+        self.recientes = {}
+        self.version = None
+        self.generacion = None
+
+    def reconstruir(self, generacion):
+        vigentes = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        self.filtro = FiltroBloom(max(CAPACIDAD_MINIMA, vigentes.count() * 2))
+        self.cargado_hasta = None
+        self.recientes = {}
+        self.generacion = generacion
+        self.cargar(vigentes)
+
+    def cargar(self, queryset):
+        ahora = timezone.now()
+        if self.cargado_hasta is not None:
+            queryset = queryset.filter(blacklisted_at__gte=self.cargado_hasta - SOLAPAMIENTO)
+        for jti, revocado_en in queryset.values_list('token__jti', 'blacklisted_at').iterator():
+            if jti not in self.recientes:
+                self.filtro.agregar(jti)
+            self.recientes[jti] = revocado_en
+        limite = ahora - SOLAPAMIENTO
+        self.recientes = {jti: fecha for jti, fecha in self.recientes.items() if fecha >= limite}
+        self.cargado_hasta = ahora
+
+    def sincronizar(self):
+        versiones = cache.get_many([VERSION_KEY, GENERACION_KEY])
+        version, generacion = versiones.get(VERSION_KEY), versiones.get(GENERACION_KEY)
+        with self.lock:
+            if (
+                self.filtro is None
+                or generacion != self.generacion
+                or self.filtro.elementos >= self.filtro.capacidad
+            ):
+                self.reconstruir(generacion)
+            elif version != self.version:
+                self.cargar(BlacklistedToken.objects.all())
+            self.version = version
+
+    def posiblemente_revocado(self, jti):
+        self.sincronizar()
+        return jti in self.filtro
+
+
+estado = EstadoFiltro()
+
+
+def incrementar_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def notificar_revocacion(sender=None, **kwargs):
+    """
+    Receptor post_save de BlacklistedToken: avisa a todos los workers una vez
+    confirmada la fila, para que al sincronizar ya la puedan leer.
+    """
+    transaction.on_commit(incrementar_version)
+
+
+def solicitar_reconstruccion():
+    try:
+        cache.incr(GENERACION_KEY)
+    except ValueError:
+        cache.set(GENERACION_KEY, 1, None)
+
+
+def posiblemente_revocado(jti):
+    return not settings.CACHE_COMPARTIDA or estado.posiblemente_revocado(jti)
+
+
+class RefreshTokenFiltrado(RefreshToken):
+    def check_blacklist(self):
+        if posiblemente_revocado(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+
+class TokenRefreshFiltradoSerializer(TokenRefreshSerializer):
+    """
+    Además de filtrar la lista negra, vuelve a estampar la máscara de
+    permisos y su época en el refresh antes de emitir el access: si no, un
+    token refrescado arrastra los permisos del login hasta que vence.
+    """
+    token_class = RefreshTokenFiltrado
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        Usuario = get_user_model()
+        usuario = Usuario.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if usuario is None or not usuario.is_active:
+            raise AuthenticationFailed('El usuario del token no existe o está inactivo')
+        agregar_claims_permisos(refresh, usuario)
+
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
+
+
+class TokenVerifyFiltradoSerializer(TokenVerifySerializer):
+    def validate(self, attrs):
+        token = UntypedToken(attrs['token'])
+        jti = token.get(api_settings.JTI_CLAIM)
+        if (
+            jti and posiblemente_revocado(jti)
+            and BlacklistedToken.objects.filter(token__jti=jti).exists()
+        ):
+            raise serializers.ValidationError('Token is blacklisted')
+        return {}
@@ -0,0 +1,181 @@
+"""
+Caché de respuestas y GET condicional.
+
+``RespuestaCacheadaMixin`` guarda las respuestas de catálogos que se leen en
+casi todas las pantallas y cambian poco (categorías, proveedores). La clave
+incluye la ruta completa con sus parámetros, el alcance de permisos del
+usuario y la versión del grupo; las señales de guardado/borrado suben la
+versión, así que nunca se borran claves una por una.
+
+``RespuestaCondicionalMixin`` no guarda nada: calcula ETag y Last-Modified
+a partir del campo de actualización del modelo y responde 304 antes de
+serializar cuando el cliente ya tiene la versión vigente.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+CACHE_RESPUESTAS_TIMEOUT = getattr(settings, 'CACHE_RESPUESTAS_TIMEOUT', 600)
+
+
+def clave_version(grupo):
+    return f'respuestas:{grupo}:version'
+
+
+def obtener_version(grupo):
+    return cache.get_or_set(clave_version(grupo), 1, None)
+
+
+def invalidar_grupo(grupo):
+    """Invalida todas las respuestas en caché del grupo subiendo su versión"""
+    try:
+        cache.incr(clave_version(grupo))
+    except ValueError:
+        cache.set(clave_version(grupo), 1, None)
+
+
+def alcance_permisos(usuario):
+    if not usuario or not usuario.is_authenticated:
+        return 'anonimo'
+    if usuario.is_staff:
+        return 'staff'
+    return getattr(usuario, 'rol', None) or 'usuario'
+
+
+def calcular_etag(datos):
+    contenido = json.dumps(datos, cls=DjangoJSONEncoder, sort_keys=True)
+    return quote_etag(hashlib.md5(contenido.encode('utf-8')).hexdigest())
+
+
+def no_modificado(request, etag, ultima_modificacion):
+    """
+    Evalúa If-None-Match y, si no viene, If-Modified-Since (RFC 9110 §13.2.2).
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etiquetas = [e.strip() for e in if_none_match.split(',')]
+        return '*' in etiquetas or etag in etiquetas or f'W/{etag}' in etiquetas
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    if if_modified_since and ultima_modificacion:
+        return int(ultima_modificacion.timestamp()) <= if_modified_since
+    return False
+
+
+def agregar_validadores(response, etag, ultima_modificacion):
+    response['ETag'] = etag
+    if ultima_modificacion:
+        response['Last-Modified'] = http_date(ultima_modificacion.timestamp())
+    # El cliente puede guardar la respuesta pero debe revalidarla en cada uso
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def respuesta_304(etag, ultima_modificacion):
+    return agregar_validadores(Response(status=status.HTTP_304_NOT_MODIFIED), etag, ultima_modificacion)
+
+
+class RespuestaCacheadaMixin:
+    """
+    Cachea las respuestas de ``list`` y ``retrieve`` del viewset.
+
+    ``grupo_cache`` agrupa las respuestas que se invalidan juntas;
+    ``campo_actualizacion`` es el campo usado para Last-Modified; sin él (o
+    si ninguna fila tiene fecha) la respuesta sale solo con ETag, porque la
+    hora en que se generó no dice nada de cuándo cambiaron los datos.
+    """
+    grupo_cache = None
+    campo_actualizacion = None
+
+    def clave_respuesta(self, request):
+        base = f'{request.get_full_path()}|{alcance_permisos(request.user)}'
+        digest = hashlib.md5(base.encode('utf-8')).hexdigest()
+        return f'respuestas:{self.grupo_cache}:v{obtener_version(self.grupo_cache)}:{digest}'
+
+    def ultima_modificacion(self, queryset):
+        if not self.campo_actualizacion:
+            return None
+        return queryset.order_by().aggregate(ultima=Max(self.campo_actualizacion))['ultima']
+
+    def respuesta_cacheada(self, request, generar, queryset):
+        clave = self.clave_respuesta(request)
+        entrada = cache.get(clave)
+        if entrada is None:
+            response = generar()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            entrada = {
+                'datos': response.data,
+                'etag': calcular_etag(response.data),
+                'ultima_modificacion': self.ultima_modificacion(queryset),
+            }
+            cache.set(clave, entrada, CACHE_RESPUESTAS_TIMEOUT)
+
+        if no_modificado(request, entrada['etag'], entrada['ultima_modificacion']):
+            return respuesta_304(entrada['etag'], entrada['ultima_modificacion'])
+        return agregar_validadores(Response(entrada['datos']), entrada['etag'], entrada['ultima_modificacion'])
+
+    def list(self, request, *args, **kwargs):
+        return self.respuesta_cacheada(
+            request,
+            lambda: super(RespuestaCacheadaMixin, self).list(request, *args, **kwargs),
+            self.filter_queryset(self.get_queryset()),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        return self.respuesta_cacheada(
+            request,
+            lambda: super(RespuestaCacheadaMixin, self).retrieve(request, *args, **kwargs),
+            self.get_queryset().filter(**{self.lookup_field: kwargs[lookup]}),
+        )
+
+
+class RespuestaCondicionalMixin:
+    """
+    Responde 304 en ``list`` y ``retrieve`` cuando no hubo cambios.
+
+    En listados el ETag sale de ``MAX(campo_actualizacion)`` y el número de
+    filas del queryset filtrado, en una sola consulta de agregación; en el
+    detalle, del pk y la fecha de actualización del objeto. Cambios en
+    objetos relacionados que no tocan el campo no cambian el ETag: cada
+    viewset documenta cuáles quedan fuera. En listados solo se responde 304
+    por If-None-Match; If-Modified-Since no ve los borrados (el máximo no
+    cambia al desaparecer una fila), así que ahí siempre se responde 200.
+    """
+    campo_actualizacion = 'fecha_actualizacion'
+
+    def etag_condicional(self, *partes):
+        base = '|'.join(str(parte) for parte in partes)
+        base = f'{base}|{self.request.get_full_path()}|{self.request.user.pk}'
+        return quote_etag(hashlib.md5(base.encode('utf-8')).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        datos = queryset.order_by().aggregate(
+            ultima=Max(self.campo_actualizacion), total=Count('pk')
+        )
+        ultima = datos['ultima']
+        etag = self.etag_condicional(ultima.isoformat() if ultima else '', datos['total'])
+        if no_modificado(request, etag, None):
+            return respuesta_304(etag, ultima)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            agregar_validadores(response, etag, ultima)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        ultima = getattr(instance, self.campo_actualizacion)
+        etag = self.etag_condicional(instance.pk, ultima.isoformat() if ultima else '')
+        if no_modificado(request, etag, ultima):
+            return respuesta_304(etag, ultima)
+        serializer = self.get_serializer(instance)
+        return agregar_validadores(Response(serializer.data), etag, ultima)
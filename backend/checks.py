@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+BACKENDS_LOCALES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def cache_compartida(app_configs, **kwargs):
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.CACHE_COMPARTIDA and backend in BACKENDS_LOCALES:
+        return [Error(
+            'CACHE_COMPARTIDA está activo con una caché local al proceso.',
+            hint=(
+                'Con varios workers cada uno sembraría su propia época de permisos, '
+                'su propia caché de usuarios y su propia versión de la lista negra. '
+                'Configure REDIS_URL o CACHE_COMPARTIDA=False.'
+            ),
+            id='backend.E001',
+        )]
+    return []
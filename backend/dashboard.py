@@ -0,0 +1,39 @@
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+
+from asistencia.models import RegistroAsistencia
+from materiales.models import Material
+from materiales.stock import Q_BAJO_MINIMO
+from obras.models import Obra
+from proyectos.models import Proyecto
+from usuarios.models import Usuario
+from .asincrono import no_autenticado, respuesta_json, usuario_autenticado
+
+
+@require_GET
+async def dashboard(request):
+    """
+    Indicadores del tablero principal. El ORM asíncrono delega cada consulta
+    al hilo síncrono de la petición, así que corren una tras otra; los dos
+    conteos de materiales salen de una sola agregación condicional.
+    """
+    usuario = await usuario_autenticado(request)
+    if usuario is None:
+        return no_autenticado()
+
+    hoy = timezone.localdate()
+    materiales = await Material.objects.aaggregate(
+        en_stock=Count('pk', filter=Q(cantidad__gt=0)),
+        bajo_minimo=Count('pk', filter=Q_BAJO_MINIMO),
+    )
+
+    return respuesta_json({
+        'proyectos_activos': await Proyecto.objects.filter(activo=True).acount(),
+        'obras_en_progreso': await Obra.objects.filter(estado='PROG').acount(),
+        'materiales_en_stock': materiales['en_stock'],
+        'materiales_bajo_minimo': materiales['bajo_minimo'],
+        'empleados_activos': await Usuario.objects.filter(Q(is_active=True) & ~Q(rol='ADM')).acount(),
+        'asistencia_hoy': await RegistroAsistencia.objects.filter(fecha=hoy, tipo='ENT')
+        .values('usuario_id').distinct().acount(),
+    })
@@ -0,0 +1,129 @@
+import csv
+import tempfile
+from datetime import datetime
+
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+
+from .permissions import tiene_permiso
+
+EXPORTACION_XLSX_MAX_FILAS = getattr(settings, 'EXPORTACION_XLSX_MAX_FILAS', 50_000)
+# Excel y LibreOffice interpretan como fórmula una celda que empieza así
+PREFIJOS_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Eco:
+    """Objeto tipo archivo que devuelve lo escrito, para usar csv.writer en streaming"""
+    def write(self, valor):
+        return valor
+
+
+def escapar_formula(valor):
+    """Antepone ``'`` a los textos que la hoja de cálculo ejecutaría como fórmula"""
+    if isinstance(valor, str) and valor.startswith(PREFIJOS_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def filas_csv(encabezados, filas):
+    writer = csv.writer(Eco())
+    # BOM para que Excel detecte UTF-8
+    yield '\ufeff' + writer.writerow(encabezados)
+    for fila in filas:
+        yield writer.writerow([escapar_formula(valor) for valor in fila])
+
+
+def valor_xlsx(valor):
+    # openpyxl no admite fechas con zona horaria
+    if isinstance(valor, datetime) and timezone.is_aware(valor):
+        return timezone.make_naive(valor)
+    # openpyxl guarda como fórmula cualquier texto que empiece con '='
+    return escapar_formula(valor)
+
+
+def respuesta_csv(nombre, encabezados, filas):
+    response = StreamingHttpResponse(filas_csv(encabezados, filas), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{nombre}.csv"'
+    return response
+
+
+def respuesta_xlsx(nombre, encabezados, filas):
+    """
+    Escribe el libro en modo ``write_only`` (las filas van a disco a medida
+    que se agregan) y lo entrega desde un archivo temporal.
+
+    No es streaming: el XLSX es un zip que openpyxl cierra en ``save()``,
+    así que el primer byte sale cuando el libro completo ya está en disco.
+    Por eso ``ExportacionMixin`` limita las filas a
+    ``EXPORTACION_XLSX_MAX_FILAS``; los volúmenes mayores van por CSV.
+    """
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet(title=nombre[:31])
+    hoja.append(encabezados)
+    for fila in filas:
+        hoja.append([valor_xlsx(valor) for valor in fila])
+
+    archivo = tempfile.TemporaryFile()
+    libro.save(archivo)
+    archivo.seek(0)
+    return FileResponse(
+        archivo,
+        as_attachment=True,
+        filename=f'{nombre}.xlsx',
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+
+
+class ExportacionMixin:
+    """
+    Agrega la acción ``exportar/?formato=csv|xlsx`` a un viewset. Las filas
+    salen de ``values_list(...).iterator()`` sobre el mismo queryset filtrado
+    del listado, así que respeta los mismos filtros y permisos.
+
+    Cada viewset define ``columnas_exportacion`` como una lista de pares
+    ``(campo, encabezado)`` y ``nombre_exportacion``. Si el listado exige
+    un permiso, ``permisos_exportacion`` lo repite para la acción: basta
+    con tener uno de ellos. Vacío, alcanza con los permisos del viewset.
+    """
+    columnas_exportacion = []
+    nombre_exportacion = 'exportacion'
+    permisos_exportacion = ()
+    exportacion_chunk_size = 2000
+
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        if self.permisos_exportacion and not any(
+            tiene_permiso(request, permiso) for permiso in self.permisos_exportacion
+        ):
+            raise PermissionDenied('No tiene permisos para exportar este listado')
+
+        formato = request.query_params.get('formato', 'csv')
+        if formato not in ('csv', 'xlsx'):
+            return Response(
+                {'error': 'Formato inválido. Use csv o xlsx'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        campos = [campo for campo, _ in self.columnas_exportacion]
+        encabezados = [encabezado for _, encabezado in self.columnas_exportacion]
+        queryset = self.filter_queryset(self.get_queryset())
+        if formato == 'xlsx' and queryset.count() > EXPORTACION_XLSX_MAX_FILAS:
+            return Response(
+                {'error': f'El listado supera las {EXPORTACION_XLSX_MAX_FILAS} filas permitidas en XLSX. '
+                          'Aplique filtros o exporte en CSV'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        filas = queryset.values_list(*campos).iterator(chunk_size=self.exportacion_chunk_size)
+        nombre = f"{self.nombre_exportacion}_{timezone.localdate().strftime('%Y%m%d')}"
+
+        if formato == 'xlsx':
+            return respuesta_xlsx(nombre, encabezados, filas)
+        return respuesta_csv(nombre, encabezados, filas)
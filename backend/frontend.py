@@ -0,0 +1,125 @@
+"""
+Integración del build de Vite (``frontend/dist``) con los estáticos de Django.
+
+Vite ya agrega el hash del contenido a los nombres de ``assets/`` y lo deja
+registrado en su manifiesto. ``AlmacenamientoEstaticos`` no vuelve a
+hashear esos archivos (los imports dinámicos entre chunks siguen apuntando
+al nombre de Vite) y genera las variantes gzip/brotli de todo; el
+middleware de WhiteNoise los sirve con caché de un año e ``immutable``.
+``IndiceFrontendView`` sirve ``index.html`` desde memoria, comprimido y con
+ETag, para que la navegación repetida termine en un 304.
+"""
+import gzip
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.http import quote_etag
+from django.views import View
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from .cache import no_modificado
+
+
+def ruta_manifiesto():
+    for ruta in ('.vite/manifest.json', 'manifest.json'):
+        completa = os.path.join(settings.FRONTEND_DIST, ruta)
+        if os.path.exists(completa):
+            return completa
+    return None
+
+
+def leer_manifiesto():
+    ruta = ruta_manifiesto()
+    if ruta is None:
+        return {}
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+
+def archivos_manifiesto(manifiesto):
+    """Archivos de salida (ya hasheados por Vite) referenciados en el manifiesto."""
+    archivos = set()
+    for entrada in manifiesto.values():
+        archivos.add(entrada['file'])
+        archivos.update(entrada.get('css', ()))
+        archivos.update(entrada.get('assets', ()))
+    return archivos
+
+
+_archivos_vite = None
+
+
+def archivos_vite():
+    global _archivos_vite
+    if _archivos_vite is None:
+        _archivos_vite = frozenset(archivos_manifiesto(leer_manifiesto()))
+    return _archivos_vite
+
+
+class AlmacenamientoEstaticos(CompressedManifestStaticFilesStorage):
+    def file_hash(self, name, content=None):
+        # Sin hash adicional el nombre queda igual al que usa el bundle de Vite
+        if name in archivos_vite():
+            return None
+        return super().file_hash(name, content)
+
+
+class WhiteNoiseFrontendMiddleware(WhiteNoiseMiddleware):
+    def immutable_file_test(self, path, url):
+        if super().immutable_file_test(path, url):
+            return True
+        return url.startswith(self.static_prefix) and url[len(self.static_prefix):] in archivos_vite()
+
+
+IndiceCargado = namedtuple('IndiceCargado', 'mtime contenido comprimido etag')
+
+
+class IndiceFrontend:
+    """``index.html`` del build en memoria; se recarga si el archivo cambia."""
+
+    def __init__(self):
+        self.actual = None
+
+    def cargar(self):
+        ruta = os.path.join(settings.FRONTEND_DIST, 'index.html')
+        try:
+            mtime = os.stat(ruta).st_mtime
+        except FileNotFoundError:
+            raise Http404('El frontend no está compilado. Ejecute: manage.py collectfrontend')
+        actual = self.actual
+        if actual is None or actual.mtime != mtime:
+            with open(ruta, 'rb') as archivo:
+                contenido = archivo.read()
+            # Una sola asignación para que otro hilo nunca vea un estado a medias
+            self.actual = actual = IndiceCargado(
+                mtime, contenido, gzip.compress(contenido, compresslevel=9),
+                quote_etag(hashlib.md5(contenido).hexdigest()),
+            )
+        return actual
+
+
+indice = IndiceFrontend()
+
+
+class IndiceFrontendView(View):
+    """Ruta comodín de la SPA: responde siempre el mismo ``index.html``."""
+
+    def get(self, request, *args, **kwargs):
+        actual = indice.cargar()
+        if no_modificado(request, actual.etag, None):
+            response = HttpResponseNotModified()
+        elif 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+            response = HttpResponse(actual.comprimido, content_type='text/html; charset=utf-8')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(actual.contenido, content_type='text/html; charset=utf-8')
+        response['ETag'] = actual.etag
+        response['Vary'] = 'Accept-Encoding'
+        # Los assets cambian de nombre en cada build; el índice se revalida siempre
+        response['Cache-Control'] = 'no-cache'
+        return response
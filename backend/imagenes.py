@@ -0,0 +1,210 @@
+"""
+Variantes WebP reducidas de las fotos de obras y proyectos.
+
+Al guardar una foto se programan sus variantes (``TAMANOS``) en un pool de
+hilos propio, después del commit, así la petición que sube la foto no espera
+el procesamiento. Los nombres de las variantes se derivan del nombre del
+original, por lo que no hace falta guardar nada en el modelo: los
+serializers consultan una marca en caché (en listados, las de todas las
+filas con un solo ``get_many``) y, si no está, devuelven el original y
+programan el procesamiento. El hilo de fondo revisa el almacenamiento antes
+de regenerar, así la petición nunca toca el storage (generación perezosa
+para las fotos anteriores a este cambio). Al reemplazar una foto se borran
+las variantes de la anterior.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+# Anchos en píxeles; 'thumb' es el que usan las tarjetas de los listados
+TAMANOS = {'thumb': 320, 'md': 768, 'lg': 1280}
+CALIDAD_WEBP = 80
+MARCA_TIMEOUT = 60 * 60 * 24 * 30
+
+_ejecutor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='imagenes')
+_en_proceso = set()
+
+
+def ruta_variante(nombre, ancho):
+    directorio, archivo = os.path.split(nombre)
+    base, _ = os.path.splitext(archivo)
+    return os.path.join(directorio, 'variantes', f'{base}_{ancho}.webp')
+
+
+def clave_marca(nombre):
+    return f'imagenes:variantes:{nombre}'
+
+
+def anchos_disponibles(nombre):
+    """Anchos ya generados para la foto, o ``None`` si aún no se procesó (``[]`` si falló)."""
+    return cache.get(clave_marca(nombre))
+
+
+def anchos_de_varias(nombres):
+    """Como ``anchos_disponibles`` para varias fotos con una sola lectura de caché."""
+    claves = {clave_marca(nombre): nombre for nombre in nombres}
+    return {claves[clave]: anchos for clave, anchos in cache.get_many(list(claves)).items()}
+
+
+def procesar(nombre):
+    """Tarea de fondo: registra las variantes que ya existan o las genera."""
+    try:
+        if default_storage.exists(ruta_variante(nombre, TAMANOS['thumb'])):
+            anchos = [ancho for ancho in TAMANOS.values()
+                      if default_storage.exists(ruta_variante(nombre, ancho))]
+            cache.set(clave_marca(nombre), anchos, MARCA_TIMEOUT)
+            _en_proceso.discard(nombre)
+            return anchos
+    except Exception as e:
+        logger.error('Error al revisar variantes de %s: %s', nombre, e)
+    return generar_variantes(nombre)
+
+
+def generar_variantes(nombre):
+    """Genera las variantes WebP de la foto; no amplía imágenes más chicas que el ancho pedido."""
+    try:
+        with default_storage.open(nombre, 'rb') as archivo:
+            original = ImageOps.exif_transpose(Image.open(archivo))
+            original.load()
+        if original.mode not in ('RGB', 'RGBA'):
+            original = original.convert('RGBA' if 'A' in original.getbands() else 'RGB')
+
+        anchos = []
+        for ancho in sorted(TAMANOS.values()):
+            # Siempre hay miniatura; los tamaños mayores solo si el original los supera
+            if anchos and ancho >= original.width:
+                break
+            imagen = original.copy()
+            imagen.thumbnail((ancho, ancho * 4), Image.LANCZOS)
+            salida = BytesIO()
+            imagen.save(salida, 'WEBP', quality=CALIDAD_WEBP, method=4)
+            ruta = ruta_variante(nombre, ancho)
+            if default_storage.exists(ruta):
+                default_storage.delete(ruta)
+            default_storage.save(ruta, ContentFile(salida.getvalue()))
+            anchos.append(ancho)
+
+        cache.set(clave_marca(nombre), anchos, MARCA_TIMEOUT)
+        return anchos
+    except Exception as e:
+        logger.error('Error al generar variantes de %s: %s', nombre, e)
+        # Se marca como procesada para no reintentar en cada listado
+        cache.set(clave_marca(nombre), [], MARCA_TIMEOUT)
+        return []
+    finally:
+        _en_proceso.discard(nombre)
+
+
+def borrar_variantes(nombre):
+    try:
+        for ancho in TAMANOS.values():
+            ruta = ruta_variante(nombre, ancho)
+            if default_storage.exists(ruta):
+                default_storage.delete(ruta)
+    except Exception as e:
+        logger.error('Error al borrar variantes de %s: %s', nombre, e)
+    cache.delete(clave_marca(nombre))
+
+
+def encolar(nombre):
+    if nombre in _en_proceso:
+        return
+    _en_proceso.add(nombre)
+    _ejecutor.submit(procesar, nombre)
+
+
+def programar_variantes(nombre):
+    """Encola la generación fuera del hilo de la petición, una sola vez por foto."""
+    if nombre:
+        transaction.on_commit(lambda: encolar(nombre))
+
+
+def foto_por_guardar(sender, instance, update_fields=None, **kwargs):
+    """Receptor pre_save: recuerda la foto anterior para borrar sus variantes."""
+    if instance.pk is None or (update_fields is not None and 'foto' not in update_fields):
+        return
+    instance._foto_anterior = sender.objects.filter(pk=instance.pk).values_list('foto', flat=True).first()
+
+
+def foto_guardada(sender, instance, update_fields=None, **kwargs):
+    """Receptor post_save: regenera las variantes cuando cambia la foto."""
+    anterior = instance.__dict__.pop('_foto_anterior', None)
+    if update_fields is not None and 'foto' not in update_fields:
+        return
+    if anterior and anterior != instance.foto.name:
+        transaction.on_commit(lambda: _ejecutor.submit(borrar_variantes, anterior))
+    if instance.foto and cache.get(clave_marca(instance.foto.name)) is None:
+        programar_variantes(instance.foto.name)
+
+
+SIN_LEER = object()
+
+
+def urls_variantes(campo, request=None, anchos=SIN_LEER):
+    """
+    Devuelve ``(thumb_url, srcset)`` para un ImageField. ``anchos`` es la
+    marca ya leída de la caché, si la hay. Mientras las variantes no existan
+    se devuelve el original y se programa su generación.
+    """
+    if not campo:
+        return None, None
+
+    def absoluta(url):
+        return request.build_absolute_uri(url) if request is not None else url
+
+    if anchos is SIN_LEER:
+        anchos = anchos_disponibles(campo.name)
+    if anchos is None:
+        programar_variantes(campo.name)
+    if not anchos:
+        # Aún en proceso o el original no se pudo procesar (lista vacía)
+        return absoluta(campo.url), None
+
+    urls = {ancho: absoluta(default_storage.url(ruta_variante(campo.name, ancho))) for ancho in anchos}
+    srcset = ', '.join(f'{url} {ancho}w' for ancho, url in urls.items())
+    return urls[min(urls)], srcset
+
+
+class VariantesFotoListSerializer(serializers.ListSerializer):
+    """Lee las marcas de variantes de todas las filas antes de serializarlas."""
+
+    def to_representation(self, data):
+        objetos = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        marcas = anchos_de_varias({obj.foto.name for obj in objetos if obj.foto})
+        for obj in objetos:
+            if obj.foto:
+                obj._anchos_foto = marcas.get(obj.foto.name)
+        return super().to_representation(objetos)
+
+
+class VariantesFotoSerializerMixin(serializers.Serializer):
+    """
+    Agrega ``foto_thumb_url`` y ``foto_srcset`` a partir del campo ``foto``.
+    Los serializers que lo usan declaran ``list_serializer_class =
+    VariantesFotoListSerializer`` en su ``Meta``.
+    """
+    foto_thumb_url = serializers.SerializerMethodField()
+    foto_srcset = serializers.SerializerMethodField()
+
+    def variantes_foto(self, obj):
+        if not hasattr(obj, '_variantes_foto'):
+            obj._variantes_foto = urls_variantes(
+                obj.foto, self.context.get('request'), getattr(obj, '_anchos_foto', SIN_LEER)
+            )
+        return obj._variantes_foto
+
+    def get_foto_thumb_url(self, obj):
+        return self.variantes_foto(obj)[0]
+
+    def get_foto_srcset(self, obj):
+        return self.variantes_foto(obj)[1]
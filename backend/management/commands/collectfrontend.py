@@ -0,0 +1,43 @@
+import os
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from backend import frontend
+
+
+class Command(BaseCommand):
+    help = (
+        'Valida el build de Vite (frontend/dist) contra su manifiesto y ejecuta collectstatic: '
+        'los assets hasheados por Vite se copian sin renombrar y con variantes gzip/brotli. '
+        'Ejecutar después de "npm run build".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clear', action='store_true', help='Vaciar STATIC_ROOT antes de copiar')
+
+    def handle(self, *args, **options):
+        if frontend.ruta_manifiesto() is None:
+            raise CommandError(
+                f'No se encontró el manifiesto de Vite en {settings.FRONTEND_DIST}. '
+                'Ejecute "npm run build" en frontend/ (build.manifest debe estar activo).'
+            )
+        manifiesto = frontend.leer_manifiesto()
+        archivos = frontend.archivos_manifiesto(manifiesto)
+        faltantes = sorted(a for a in archivos if not os.path.exists(os.path.join(settings.FRONTEND_DIST, a)))
+        if faltantes:
+            raise CommandError(f'El build está incompleto, faltan: {", ".join(faltantes[:10])}')
+
+        entrada = manifiesto.get('index.html')
+        if entrada is None:
+            raise CommandError('El manifiesto no tiene la entrada index.html')
+        with open(os.path.join(settings.FRONTEND_DIST, 'index.html'), encoding='utf-8') as archivo:
+            if settings.STATIC_URL + entrada['file'] not in archivo.read():
+                raise CommandError(
+                    f'index.html no carga los assets desde {settings.STATIC_URL}; '
+                    'revise "base" en frontend/vite.config.ts'
+                )
+
+        call_command('collectstatic', interactive=False, clear=options['clear'], verbosity=options['verbosity'])
+        self.stdout.write(self.style.SUCCESS(f'Frontend recolectado: {len(archivos)} assets inmutables'))
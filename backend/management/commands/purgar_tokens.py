@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from backend.blacklist import solicitar_reconstruccion
+
+
+class Command(BaseCommand):
+    help = (
+        'Borra los refresh tokens vencidos (y sus entradas en la lista negra) y pide a los '
+        'workers reconstruir el filtro de Bloom. Programar periódicamente, por ejemplo cada hora.'
+    )
+
+    def handle(self, *args, **options):
+        borrados, _ = OutstandingToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        solicitar_reconstruccion()
+        self.stdout.write(self.style.SUCCESS(f'Tokens vencidos eliminados: {borrados}'))
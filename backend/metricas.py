@@ -0,0 +1,256 @@
+"""
+Métricas por petición: número y tiempo de consultas SQL, tiempo de
+serialización y tiempo total.
+
+Cada respuesta lleva un encabezado ``Server-Timing`` y genera una línea de
+log estructurada; además los valores se acumulan en histogramas por ruta
+dentro del proceso y se exponen en formato Prometheus en ``/api/metrics/``.
+Los histogramas son por proceso: con varios workers cada uno publica los
+suyos y Prometheus los agrega por instancia.
+
+En las respuestas en streaming las consultas del iterador corren después de
+que el middleware devuelve: se cuentan envolviendo ``streaming_content`` y
+la métrica se registra al terminar el cuerpo. Como los encabezados ya se
+enviaron, ``Server-Timing`` en esas respuestas solo cubre hasta el primer
+byte.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import connections
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import APIView
+
+from .bitacora import registros_descartados
+from .permissions import EsAdministrador
+
+logger = logging.getLogger('backend.metricas')
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+HISTOGRAMAS = {
+    'http_request_duration_seconds': ('Tiempo total de la petición', BUCKETS_SEGUNDOS),
+    'http_sql_duration_seconds': ('Tiempo en consultas SQL por petición', BUCKETS_SEGUNDOS),
+    'http_serialization_duration_seconds': ('Tiempo de serialización de la respuesta', BUCKETS_SEGUNDOS),
+    'http_sql_queries': ('Número de consultas SQL por petición', BUCKETS_CONSULTAS),
+}
+
+
+class Histograma:
+    __slots__ = ('buckets', 'conteos', 'suma', 'total')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.conteos = [0] * (len(buckets) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.conteos[bisect_left(self.buckets, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+
+class RegistroMetricas:
+    """Histogramas y contadores en memoria, agrupados por (ruta, método)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histogramas = {}
+        self._peticiones = {}
+
+    def registrar(self, ruta, metodo, estado, valores):
+        with self._lock:
+            clave = (ruta, metodo, str(estado))
+            self._peticiones[clave] = self._peticiones.get(clave, 0) + 1
+            for nombre, valor in valores.items():
+                clave = (nombre, ruta, metodo)
+                histograma = self._histogramas.get(clave)
+                if histograma is None:
+                    histograma = self._histogramas[clave] = Histograma(HISTOGRAMAS[nombre][1])
+                histograma.observar(valor)
+
+    def reiniciar(self):
+        with self._lock:
+            self._histogramas.clear()
+            self._peticiones.clear()
+
+    def exportar(self):
+        """Texto en el formato de exposición de Prometheus (0.0.4)."""
+        lineas = [
+            '# HELP http_requests_total Peticiones atendidas',
+            '# TYPE http_requests_total counter',
+        ]
+        with self._lock:
+            for (ruta, metodo, estado), valor in sorted(self._peticiones.items()):
+                lineas.append(
+                    f'http_requests_total{{ruta="{escapar(ruta)}",metodo="{metodo}",estado="{estado}"}} {valor}'
+                )
+            for nombre, (ayuda, buckets) in HISTOGRAMAS.items():
+                lineas.append(f'# HELP {nombre} {ayuda}')
+                lineas.append(f'# TYPE {nombre} histogram')
+                for (metrica, ruta, metodo), histograma in sorted(self._histogramas.items()):
+                    if metrica != nombre:
+                        continue
+                    etiquetas = f'ruta="{escapar(ruta)}",metodo="{metodo}"'
+                    acumulado = 0
+                    for limite, conteo in zip(buckets, histograma.conteos):
+                        acumulado += conteo
+                        lineas.append(f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+                    lineas.append(f'{nombre}_bucket{{{etiquetas},le="+Inf"}} {histograma.total}')
+                    lineas.append(f'{nombre}_sum{{{etiquetas}}} {histograma.suma:.6f}')
+                    lineas.append(f'{nombre}_count{{{etiquetas}}} {histograma.total}')
+        lineas += [
+            '# HELP log_records_dropped_total Registros de log descartados por cola llena',
+            '# TYPE log_records_dropped_total counter',
+            f'log_records_dropped_total {registros_descartados()}',
+        ]
+        return '\n'.join(lineas) + '\n'
+
+
+def escapar(valor):
+    return valor.replace('\\', '\\\\').replace('"', '\\"')
+
+
+registro = RegistroMetricas()
+
+
+class ContadorConsultas:
+    """execute_wrapper que cuenta y cronometra las consultas de una petición."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.duracion = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duracion += time.perf_counter() - inicio
+            self.consultas += 1
+
+
+def instalar_contador(contador):
+    connections['default'].execute_wrappers.append(contador)
+
+
+def retirar_contador(contador):
+    connections['default'].execute_wrappers.remove(contador)
+
+
+def ruta_de(request):
+    coincidencia = getattr(request, 'resolver_match', None)
+    if coincidencia is None:
+        return 'sin_ruta'
+    return coincidencia.view_name or coincidencia.route or 'sin_ruta'
+
+
+class MetricasMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        contador = ContadorConsultas()
+        request._tiempo_serializacion = 0.0
+        inicio = time.perf_counter()
+        with connections['default'].execute_wrapper(contador):
+            response = self.get_response(request)
+        return self.completar(request, response, contador, inicio)
+
+    async def __acall__(self, request):
+        # Las consultas no corren en el hilo del event loop sino en el hilo
+        # síncrono de la petición (Django atiende cada petición ASGI en un
+        # ThreadSensitiveContext y el ORM asíncrono usa thread_sensitive=True),
+        # así que el wrapper se instala en la conexión de ese hilo. Las
+        # consultas lanzadas con thread_sensitive=False no se cuentan.
+        contador = ContadorConsultas()
+        request._tiempo_serializacion = 0.0
+        inicio = time.perf_counter()
+        await sync_to_async(instalar_contador)(contador)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(retirar_contador)(contador)
+        return self.completar(request, response, contador, inicio)
+
+    def completar(self, request, response, contador, inicio):
+        self.server_timing(request, response, contador, time.perf_counter() - inicio)
+        if response.streaming and not response.is_async:
+            response.streaming_content = self.medir_contenido(
+                request, response, response.streaming_content, contador, inicio
+            )
+        else:
+            self.registrar(request, response, contador, time.perf_counter() - inicio)
+        return response
+
+    def medir_contenido(self, request, response, contenido, contador, inicio):
+        # El wrapper se instala en cada next(): el servidor puede consumir el
+        # iterador desde otro hilo, y cada hilo tiene su propia conexión
+        iterador = iter(contenido)
+        try:
+            while True:
+                with connections['default'].execute_wrapper(contador):
+                    fragmento = next(iterador, None)
+                if fragmento is None:
+                    break
+                yield fragmento
+        finally:
+            self.registrar(request, response, contador, time.perf_counter() - inicio)
+
+    def server_timing(self, request, response, contador, total):
+        response['Server-Timing'] = (
+            f'db;desc="{contador.consultas} consultas";dur={contador.duracion * 1000:.1f}, '
+            f'ser;dur={request._tiempo_serializacion * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+
+    def registrar(self, request, response, contador, total):
+        serializacion = request._tiempo_serializacion
+
+        ruta = ruta_de(request)
+        registro.registrar(ruta, request.method, response.status_code, {
+            'http_request_duration_seconds': total,
+            'http_sql_duration_seconds': contador.duracion,
+            'http_serialization_duration_seconds': serializacion,
+            'http_sql_queries': contador.consultas,
+        })
+        logger.info(
+            'peticion ruta=%s metodo=%s estado=%s total_ms=%.1f sql=%d sql_ms=%.1f ser_ms=%.1f',
+            ruta, request.method, response.status_code, total * 1000,
+            contador.consultas, contador.duracion * 1000, serializacion * 1000,
+        )
+
+
+class JSONRendererMedido(JSONRenderer):
+    """JSONRenderer que acumula su tiempo de render en la petición para el middleware."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        inicio = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            request = (renderer_context or {}).get('request')
+            django_request = getattr(request, '_request', None)
+            if django_request is not None and hasattr(django_request, '_tiempo_serializacion'):
+                django_request._tiempo_serializacion += time.perf_counter() - inicio
+
+
+class MetricasView(APIView):
+    """Expone los histogramas del proceso en formato Prometheus."""
+    permission_classes = [EsAdministrador]
+
+    def get(self, request):
+        return HttpResponse(registro.exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
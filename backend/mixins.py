@@ -0,0 +1,48 @@
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils import encoders
+
+
+class ListadoStreamingMixin:
+    """
+    Agrega el modo ``?stream=1`` a los listados: la respuesta se emite como un
+    arreglo JSON por fragmentos leídos con ``.iterator(chunk_size=...)``, así
+    la memoria usada no depende del tamaño de la tabla.
+    """
+    stream_chunk_size = 500
+
+    def es_stream(self):
+        return self.request.query_params.get('stream') in ('1', 'true')
+
+    def list(self, request, *args, **kwargs):
+        if self.es_stream():
+            return self.respuesta_stream(self.filter_queryset(self.get_queryset()))
+        return super().list(request, *args, **kwargs)
+
+    def serializar_lote(self, lote):
+        datos = self.get_serializer(lote, many=True).data
+        return ','.join(
+            json.dumps(item, cls=encoders.JSONEncoder, ensure_ascii=False)
+            for item in datos
+        )
+
+    def generar_json(self, queryset):
+        yield '['
+        separador = ''
+        lote = []
+        for obj in queryset.iterator(chunk_size=self.stream_chunk_size):
+            lote.append(obj)
+            if len(lote) >= self.stream_chunk_size:
+                yield separador + self.serializar_lote(lote)
+                separador = ','
+                lote = []
+        if lote:
+            yield separador + self.serializar_lote(lote)
+        yield ']'
+
+    def respuesta_stream(self, queryset):
+        return StreamingHttpResponse(
+            self.generar_json(queryset),
+            content_type='application/json'
+        )
@@ -0,0 +1,46 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class CursorPaginacion(CursorPagination):
+    """
+    Paginación por cursor (keyset) sobre el ordenamiento de cada vista.
+
+    Es opcional: solo se activa cuando el cliente envía ``cursor`` o
+    ``page_size``, de modo que los listados existentes siguen devolviendo
+    un arreglo plano.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        # Las vistas declaran su orden con ``cursor_ordering``; si no, se usa
+        # el orden del queryset o el del modelo.
+        ordering = tuple(
+            getattr(view, 'cursor_ordering', None)
+            or queryset.query.order_by
+            or queryset.model._meta.ordering
+            or ('-pk',)
+        )
+        # DRF posiciona el cursor con el primer campo y resuelve los empates
+        # con un desplazamiento; eso solo es estable si el orden es total,
+        # así que se desempata por pk cuando el orden no lo incluye.
+        if not any(campo.lstrip('-') in ('pk', 'id') for campo in ordering):
+            ordering += ('-pk' if ordering[0].startswith('-') else 'pk',)
+        return ordering
+
+
+class PaginacionBusqueda(LimitOffsetPagination):
+    """
+    Páginas por ``limit``/``offset`` para resultados ordenados por
+    relevancia, que no tienen una columna única donde apoyar un cursor.
+    Siempre activa: una búsqueda nunca devuelve más de ``max_limit`` filas.
+    """
+    default_limit = 100
+    max_limit = 1000
@@ -0,0 +1,74 @@
+from django.conf import settings
+from rest_framework import permissions
+
+from .autenticacion import version_permisos
+
+# Orden fijo de los bits del token: solo se agregan permisos al final
+PERMISOS_TOKEN = (
+    'usuarios.gestionar_usuarios',
+    'usuarios.gestionar_proyectos',
+    'usuarios.gestionar_materiales',
+    'usuarios.gestionar_nomina',
+    'usuarios.ver_reportes',
+)
+CLAIM_PERMISOS = 'perm'
+CLAIM_VERSION = 'perm_ver'
+
+
+def mascara_permisos(usuario):
+    permisos = usuario.get_all_permissions()
+    if usuario.is_superuser:
+        return (1 << len(PERMISOS_TOKEN)) - 1
+    return sum(1 << bit for bit, permiso in enumerate(PERMISOS_TOKEN) if permiso in permisos)
+
+
+def agregar_claims_permisos(token, usuario):
+    token[CLAIM_PERMISOS] = mascara_permisos(usuario)
+    token[CLAIM_VERSION] = version_permisos(usuario.pk)
+    return token
+
+
+def tiene_permiso(request, permiso):
+    """
+    Verifica el permiso con la máscara del token si su época sigue vigente;
+    si el token es anterior a un cambio de permisos (o no hay token JWT) se
+    usa ``has_perm``, que con la autenticación cacheada tampoco consulta.
+    Sin ``CACHE_COMPARTIDA`` cada worker tendría su propia época, así que la
+    máscara no se usa.
+    """
+    token = getattr(request, 'auth', None)
+    usuario = request.user
+    if (
+        settings.CACHE_COMPARTIDA
+        and permiso in PERMISOS_TOKEN
+        and token is not None and hasattr(token, 'get')
+        and token.get(CLAIM_PERMISOS) is not None
+        and usuario.is_active
+        and token.get(CLAIM_VERSION) == version_permisos(usuario.pk)
+    ):
+        return bool(token[CLAIM_PERMISOS] & (1 << PERMISOS_TOKEN.index(permiso)))
+    return usuario.has_perm(permiso)
+
+
+def permiso_requerido(permiso, mensaje=None):
+    """Clase de permiso DRF para ``permission_classes``: ``permiso_requerido('usuarios.ver_reportes')``."""
+    class PermisoRequerido(permissions.BasePermission):
+        message = mensaje
+
+        def has_permission(self, request, view):
+            return bool(request.user and request.user.is_authenticated and tiene_permiso(request, permiso))
+
+    PermisoRequerido.__name__ = f'PermisoRequerido_{permiso.split(".")[-1]}'
+    return PermisoRequerido
+
+
+class EsAdministrador(permissions.BasePermission):
+    """
+    Permite el acceso solo a administradores (rol ADM o usuarios staff).
+    """
+    def has_permission(self, request, view):
+        usuario = request.user
+        return bool(
+            usuario and usuario.is_authenticated
+            and (usuario.is_staff or getattr(usuario, 'rol', None) == 'ADM')
+        )
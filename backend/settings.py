@@ -22,7 +22,6 @@ ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='*').split(',')
 # Application definition
 INSTALLED_APPS = [
     'drf_yasg',
-    'debug_toolbar',
 
     'django.contrib.admin',
     'django.contrib.auth',
@@ -30,19 +29,24 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'whitenoise',
     
     # Local apps
+    'backend.apps.BackendConfig',
     'usuarios.apps.UsuariosConfig',
     'proyectos.apps.ProyectosConfig',
     'obras.apps.ObrasConfig',
     'asistencia.apps.AsistenciaConfig',
     'nomina.apps.NominaConfig',
     'materiales.apps.MaterialesConfig',
+    'inventario.apps.InventarioConfig',
+    'rendimiento.apps.RendimientoConfig',
 ]
 INTERNAL_IPS = ['127.0.0.1']
 
@@ -51,7 +55,8 @@ AUTH_USER_MODEL = 'usuarios.Usuario'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'backend.frontend.WhiteNoiseFrontendMiddleware',
+    'backend.metricas.MetricasMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,9 +64,20 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# Bajo ASGI (backend/asgi.py) las rutas de marcación usan vistas asíncronas.
+# WhiteNoise 6.6 solo es WSGI y obligaría a pasar cada petición por un hilo,
+# así que en ese modo los estáticos los sirve el proxy inverso.
+SERVIDOR_ASGI = config('SERVIDOR_ASGI', default=False, cast=bool)
+if SERVIDOR_ASGI:
+    MIDDLEWARE.remove('backend.frontend.WhiteNoiseFrontendMiddleware')
+
+# Debug Toolbar solo en desarrollo; en producción se usan las métricas de backend.metricas
+if DEBUG:
+    INSTALLED_APPS.insert(1, 'debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 ROOT_URLCONF = 'backend.urls'
 
 TEMPLATES = [
@@ -99,6 +115,32 @@ DATABASES = {
     }
 }
 
+# Caché: Redis en producción (REDIS_URL), memoria local en desarrollo y pruebas
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'gestion',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'gestion',
+        }
+    }
+# Las épocas de permisos de los tokens y la lista negra se coordinan entre
+# workers por la caché. Con memoria local eso solo vale si hay un único
+# proceso (runserver, pruebas); si no, se desactivan y se consulta la base.
+CACHE_COMPARTIDA = config('CACHE_COMPARTIDA', default=bool(REDIS_URL) or DEBUG, cast=bool)
+AUTENTICACION_CACHE_TIMEOUT = config('AUTENTICACION_CACHE_TIMEOUT', default=300, cast=int)
+CACHE_RESPUESTAS_TIMEOUT = config('CACHE_RESPUESTAS_TIMEOUT', default=600, cast=int)
+# El XLSX se arma completo antes de enviarse: más filas que esto, en CSV
+EXPORTACION_XLSX_MAX_FILAS = config('EXPORTACION_XLSX_MAX_FILAS', default=50_000, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -125,13 +167,15 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
-frontend_static = os.path.join(BASE_DIR, 'frontend/build/static')
-if os.path.exists(frontend_static):
-    STATICFILES_DIRS = [frontend_static]
+# Build de Vite (npm run build); se publica con: manage.py collectfrontend
+FRONTEND_DIST = os.path.join(BASE_DIR, 'frontend', 'dist')
+if os.path.exists(FRONTEND_DIST):
+    STATICFILES_DIRS = [FRONTEND_DIST]
 else:
     STATICFILES_DIRS = []
 
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Manifest + gzip/brotli sin volver a hashear los assets de Vite (backend/frontend.py)
+STATICFILES_STORAGE = 'backend.frontend.AlmacenamientoEstaticos'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -142,12 +186,18 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'backend.autenticacion.JWTAutenticacionCacheada',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'backend.metricas.JSONRendererMedido',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'backend.pagination.CursorPaginacion',
+    'PAGE_SIZE': 100,
 }
 
 # CSRF Settings
@@ -213,6 +263,8 @@ SIMPLE_JWT = {
     'AUTH_HEADER_NAME': 'HTTP_AUTHORIZATION',
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    'TOKEN_REFRESH_SERIALIZER': 'backend.blacklist.TokenRefreshFiltradoSerializer',
+    'TOKEN_VERIFY_SERIALIZER': 'backend.blacklist.TokenVerifyFiltradoSerializer',
 }
 
 # Email Configuration
@@ -239,41 +291,57 @@ LOGOUT_REDIRECT_URL = '/login/'
 
 APPEND_SLASH = True  # Por defecto está True
 
-# Logging Configuration
+# Logging Configuration: los loggers solo encolan; un hilo por proceso formatea y escribe.
+# Por defecto solo consola: el gestor de procesos (systemd, supervisor, docker) junta la
+# salida de todos los workers. Con LOG_ARCHIVO se agrega un archivo JSON de nombre fijo
+# que todos los workers abren en modo append; lo rota logrotate, no los procesos.
+LOG_ARCHIVO = config('LOG_ARCHIVO', default='')
+DESTINOS_LOG = [{'clase': 'logging.StreamHandler', 'formato': 'texto'}]
+if LOG_ARCHIVO:
+    DESTINOS_LOG.append({
+        'clase': 'logging.handlers.WatchedFileHandler',
+        'formato': 'json',
+        'filename': LOG_ARCHIVO,
+        'encoding': 'utf-8',
+        'delay': True,
+    })
+
+# Fracción de registros INFO/DEBUG que se conservan por logger (WARNING y superiores siempre)
+LOGGING_MUESTREO = {
+    'backend.metricas': config('LOG_MUESTREO_METRICAS', default=1.0 if DEBUG else 0.1, cast=float),
+}
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
-    'formatters': {
-        'verbose': {
-            'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
-            'style': '{',
-        },
-        'simple': {
-            'format': '{levelname} {message}',
-            'style': '{',
+    'filters': {
+        'muestreo': {
+            '()': 'backend.bitacora.FiltroMuestreo',
+            'tasas': LOGGING_MUESTREO,
         },
     },
     'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
-        },
-        'file': {
-            'class': 'logging.FileHandler',
-            'filename': 'debug.log',
-            'formatter': 'verbose',
+        'cola': {
+            '()': 'backend.bitacora.ManejadorCola',
+            'filters': ['muestreo'],
+            'destinos': DESTINOS_LOG,
         },
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['cola'],
             'level': 'INFO',
             'propagate': True,
         },
         'materiales': {
-            'handlers': ['console', 'file'],
-            'level': 'DEBUG',
-            'propagate': True,
+            'handlers': ['cola'],
+            'level': 'DEBUG' if DEBUG else 'INFO',
+            'propagate': False,
+        },
+        'backend': {
+            'handlers': ['cola'],
+            'level': 'INFO',
+            'propagate': False,
         },
     },
 }
@@ -0,0 +1,22 @@
+from django.db import connection
+
+
+class PlanConsultaMixin:
+    """
+    Verifica con EXPLAIN que una consulta se resuelve con índices.
+
+    Con datos de prueba pequeños Postgres siempre prefiere un Seq Scan, así
+    que se desactiva ``enable_seqscan`` dentro de la transacción del test: si
+    aun así aparece un Seq Scan es porque ningún índice sirve para la consulta.
+    """
+
+    def plan_consulta(self, queryset):
+        if connection.vendor != 'postgresql':
+            self.skipTest('La verificación de planes requiere PostgreSQL')
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def assertSinSeqScan(self, queryset):
+        plan = self.plan_consulta(queryset)
+        self.assertNotIn('Seq Scan', plan, msg=f'La consulta recorre la tabla completa:\n{plan}')
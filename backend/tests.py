@@ -0,0 +1,306 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from backend.autenticacion import clave_usuario, invalidar_usuario, version_permisos
+from backend.bitacora import (
+    FiltroMuestreo, FormateadorJSON, ManejadorCola, crear_destino, registros_descartados,
+)
+from backend.blacklist import EstadoFiltro, FiltroBloom, estado
+from backend.frontend import archivos_manifiesto, indice
+from backend.metricas import registro
+from backend.permissions import (
+    CLAIM_PERMISOS, CLAIM_VERSION, PERMISOS_TOKEN, agregar_claims_permisos, tiene_permiso,
+)
+from obras.tests import ObrasDePruebaMixin
+from usuarios.models import Usuario
+
+
+class MetricasTests(ObrasDePruebaMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        registro.reiniciar()
+
+    def test_server_timing_en_respuesta(self):
+        self.crear_obras(2)
+        response = self.client.get('/api/obras/')
+        self.assertIn('db;desc=', response['Server-Timing'])
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+    def test_metricas_prometheus_solo_administradores(self):
+        self.client.get('/api/obras/')
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+        administrador = Usuario.objects.create_user(username='admin', password='clave-prueba', rol='ADM')
+        self.client.force_authenticate(administrador)
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        contenido = response.content.decode()
+        self.assertIn('http_request_duration_seconds_bucket{ruta="obras-api:obras-list",metodo="GET"', contenido)
+        self.assertIn('http_sql_queries_count', contenido)
+        self.assertIn('log_records_dropped_total ', contenido)
+
+    def test_streaming_cuenta_consultas_del_cuerpo(self):
+        self.crear_obras(3)
+        response = self.client.get('/api/obras/', {'stream': '1'})
+        clave = ('http_sql_queries', 'obras-api:obras-list', 'GET')
+        # La métrica se registra recién cuando se consume el cuerpo
+        self.assertNotIn(clave, registro._histogramas)
+        b''.join(response.streaming_content)
+        self.assertGreater(registro._histogramas[clave].suma, 0)
+
+    async def test_asgi_cuenta_consultas_del_hilo_sincrono(self):
+        token = AccessToken.for_user(self.arquitecto)
+        response = await self.async_client.get('/api/dashboard/', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('db;desc="', response['Server-Timing'])
+        self.assertNotIn('db;desc="0 consultas"', response['Server-Timing'])
+
+
+class AutenticacionCacheadaTests(ObrasDePruebaMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client.force_authenticate(None)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.arquitecto)}')
+
+    def consultas_de_usuario(self):
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get('/api/obras/')
+        self.assertEqual(response.status_code, 200)
+        return [q for q in contexto if 'usuarios_usuario' in q['sql'] and 'obras_obra' not in q['sql']]
+
+    def test_usuario_desde_cache(self):
+        self.assertTrue(self.consultas_de_usuario())
+        self.assertFalse(self.consultas_de_usuario())
+
+    def test_cache_sin_credenciales(self):
+        self.consultas_de_usuario()
+        datos = cache.get(clave_usuario(self.arquitecto.pk))
+        self.assertNotIn('password', datos['campos'])
+        self.assertNotIn(self.arquitecto.password, repr(datos))
+
+    def test_invalidacion_al_confirmar(self):
+        self.consultas_de_usuario()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.arquitecto.first_name = 'Nuevo'
+            self.arquitecto.save()
+        # Hasta el commit la versión no cambia
+        self.assertFalse(self.consultas_de_usuario())
+        for callback in callbacks:
+            callback()
+        self.assertTrue(self.consultas_de_usuario())
+
+    def test_invalidacion_por_cambios(self):
+        self.consultas_de_usuario()
+        with self.captureOnCommitCallbacks(execute=True):
+            grupo = Group.objects.create(name='Arquitectos')
+            self.arquitecto.groups.add(grupo)
+        self.assertTrue(self.consultas_de_usuario())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            grupo.permissions.add(Permission.objects.first())
+        self.assertTrue(self.consultas_de_usuario())
+        self.assertFalse(self.consultas_de_usuario())
+
+
+class PermisosTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.usuario = Usuario.objects.create_user(username='sup', password='clave-prueba', rol='SUP')
+
+    def peticion(self, mascara):
+        token = agregar_claims_permisos(AccessToken.for_user(self.usuario), self.usuario)
+        token[CLAIM_PERMISOS] = mascara
+        return SimpleNamespace(user=self.usuario, auth=token)
+
+    def test_mascara_vigente_sin_consultas(self):
+        request = self.peticion(0b01000)
+        with self.assertNumQueries(0):
+            self.assertTrue(tiene_permiso(request, 'usuarios.gestionar_nomina'))
+            self.assertFalse(tiene_permiso(request, 'usuarios.ver_reportes'))
+
+    def test_epoca_revocada_usa_permisos_actuales(self):
+        request = self.peticion(0b11111)
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidar_usuario(self.usuario.pk)
+        self.usuario = Usuario.objects.get(pk=self.usuario.pk)
+        request.user = self.usuario
+        self.assertFalse(tiene_permiso(request, 'usuarios.gestionar_nomina'))
+
+    @override_settings(CACHE_COMPARTIDA=False)
+    def test_sin_cache_compartida_ignora_la_mascara(self):
+        request = self.peticion(0b11111)
+        self.assertFalse(tiene_permiso(request, 'usuarios.gestionar_nomina'))
+
+    def test_refresh_vuelve_a_estampar_permisos(self):
+        refresh = agregar_claims_permisos(RefreshToken.for_user(self.usuario), self.usuario)
+        bit = 1 << PERMISOS_TOKEN.index('usuarios.gestionar_nomina')
+        self.assertFalse(refresh[CLAIM_PERMISOS] & bit)
+
+        permiso = Permission.objects.get(content_type__app_label='usuarios', codename='gestionar_nomina')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.user_permissions.add(permiso)
+        response = self.client.post('/api/auth/refresh/', {'refresh': str(refresh)}, secure=True)
+        self.assertEqual(response.status_code, 200)
+
+        access = AccessToken(response.data['access'])
+        self.assertTrue(access[CLAIM_PERMISOS] & bit)
+        self.assertEqual(access[CLAIM_VERSION], version_permisos(self.usuario.pk))
+        self.assertTrue(RefreshToken(response.data['refresh'])[CLAIM_PERMISOS] & bit)
+
+
+class ListaNegraTokensTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        estado.__init__()
+        self.usuario = Usuario.objects.create_user(username='tec', password='clave-prueba', rol='TEC')
+
+    def refrescar(self, token):
+        return self.client.post('/api/auth/refresh/', {'refresh': str(token)}, secure=True)
+
+    def revocar(self, revocado_en=None, **campos):
+        token = RefreshToken.for_user(self.usuario)
+        pendiente = OutstandingToken.objects.create(
+            user=self.usuario, jti=token['jti'], token=str(token),
+            created_at=token.current_time, expires_at=timezone.now() + timedelta(days=1),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            revocado = BlacklistedToken.objects.create(token=pendiente, **campos)
+            if revocado_en is not None:
+                # blacklisted_at es auto_now_add
+                BlacklistedToken.objects.filter(pk=revocado.pk).update(blacklisted_at=revocado_en)
+        return token['jti']
+
+    def test_filtro_sin_falsos_negativos(self):
+        filtro = FiltroBloom(1000)
+        for i in range(1000):
+            filtro.agregar(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in filtro for i in range(1000)))
+
+    def test_token_rotado_rechazado(self):
+        token = RefreshToken.for_user(self.usuario)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.refrescar(token).status_code, 200)
+        self.assertEqual(self.refrescar(token).status_code, 401)
+
+    def test_token_vigente_no_consulta_lista_negra(self):
+        estado.sincronizar()
+        token = RefreshToken.for_user(self.usuario)
+        with self.assertNumQueries(0):
+            self.assertFalse(estado.posiblemente_revocado(token['jti']))
+
+    def test_workers_consistentes_con_commit_fuera_de_orden(self):
+        worker_a, worker_b = EstadoFiltro(), EstadoFiltro()
+        posterior = self.revocar(id=1000)
+        worker_a.sincronizar()
+        # Fila con id menor y fecha anterior a la última carga del worker A,
+        # como una transacción que se confirma tarde
+        tardia = self.revocar(revocado_en=timezone.now() - timedelta(seconds=30))
+
+        worker_b.sincronizar()
+        worker_a.sincronizar()
+        for worker in (worker_a, worker_b):
+            self.assertTrue(worker.posiblemente_revocado(posterior))
+            self.assertTrue(worker.posiblemente_revocado(tardia))
+        self.assertEqual(worker_a.filtro.elementos, worker_b.filtro.elementos)
+
+    @override_settings(CACHE_COMPARTIDA=False)
+    def test_sin_cache_compartida_consulta_la_tabla(self):
+        token = RefreshToken.for_user(self.usuario)
+        self.assertEqual(self.refrescar(token).status_code, 200)
+        # Sin on_commit el contador no cambia: sin caché compartida igual se detecta
+        self.assertEqual(self.refrescar(token).status_code, 401)
+
+
+class BitacoraTests(SimpleTestCase):
+    def registro(self, nombre, nivel=logging.INFO, **extra):
+        record = logging.LogRecord(nombre, nivel, __file__, 1, 'total %s', ('12',), None)
+        record.__dict__.update(extra)
+        return record
+
+    def test_muestreo_por_logger(self):
+        filtro = FiltroMuestreo({'backend.metricas': 0, 'backend': 1})
+        self.assertFalse(filtro.filter(self.registro('backend.metricas')))
+        self.assertTrue(filtro.filter(self.registro('backend.metricas', logging.WARNING)))
+        self.assertTrue(filtro.filter(self.registro('backend.imagenes')))
+
+    def test_formato_json_con_extra(self):
+        datos = json.loads(FormateadorJSON().format(self.registro('materiales', material_id=7)))
+        self.assertEqual(datos['mensaje'], 'total 12')
+        self.assertEqual(datos['material_id'], 7)
+
+    def test_cola_llena_descarta_sin_bloquear(self):
+        manejador = ManejadorCola([{'clase': 'logging.NullHandler'}], tamano_cola=1)
+        manejador.detener()
+        manejador.handle(self.registro('materiales'))
+        manejador.handle(self.registro('materiales'))
+        self.assertEqual(manejador.descartados, 1)
+        self.assertEqual(manejador.queue.get_nowait().msg, 'total 12')
+
+    def test_descartados_se_informan(self):
+        manejador = ManejadorCola([{'clase': 'logging.NullHandler'}], tamano_cola=2)
+        manejador.detener()
+        antes = registros_descartados()
+        for _ in range(3):
+            manejador.handle(self.registro('materiales'))
+        self.assertEqual(registros_descartados() - antes, 1)
+
+        manejador.queue.get_nowait()
+        manejador.queue.get_nowait()
+        manejador.handle(self.registro('materiales'))
+        manejador.queue.get_nowait()
+        aviso = manejador.queue.get_nowait()
+        self.assertEqual(aviso.levelno, logging.WARNING)
+        self.assertIn('se descartaron 1 registros', aviso.msg)
+        self.assertEqual(manejador.informados, 1)
+
+    def test_archivo_de_nombre_fijo(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio)
+        archivo = os.path.join(directorio, 'logs', 'backend.log')
+        destino = crear_destino('logging.handlers.WatchedFileHandler', filename=archivo)
+        self.addCleanup(destino.close)
+        self.assertEqual(destino.baseFilename, archivo)
+
+
+class FrontendTests(SimpleTestCase):
+    def setUp(self):
+        self.dist = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dist)
+        with open(f'{self.dist}/index.html', 'w', encoding='utf-8') as archivo:
+            archivo.write('<script type="module" src="/static/assets/index-a1b2c3d4.js"></script>')
+        indice.actual = None
+
+    def test_archivos_del_manifiesto(self):
+        manifiesto = {
+            'index.html': {'file': 'assets/index-a1b2c3d4.js', 'css': ['assets/index-e5f6a7b8.css']},
+            'src/logo.svg': {'file': 'assets/logo-c9d0e1f2.svg'},
+        }
+        self.assertEqual(archivos_manifiesto(manifiesto), {
+            'assets/index-a1b2c3d4.js', 'assets/index-e5f6a7b8.css', 'assets/logo-c9d0e1f2.svg',
+        })
+
+    def test_indice_comprimido_y_304(self):
+        with self.settings(FRONTEND_DIST=self.dist):
+            response = self.client.get('/obras/12/', HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(response['Cache-Control'], 'no-cache')
+
+            response = self.client.get('/materiales/', HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304)
@@ -0,0 +1,24 @@
+"""
+Inicio de sesión que agrega al token la máscara de permisos y su época de
+revocación (ver ``backend.permissions``).
+"""
+from usuarios.views import CustomTokenObtainPairView
+
+from .permissions import agregar_claims_permisos
+
+
+class TokenConPermisosMixin:
+    @classmethod
+    def get_token(cls, user):
+        # Los claims del refresh se copian a cada access token que se emita con él
+        return agregar_claims_permisos(super().get_token(user), user)
+
+
+class TokenConPermisosView(CustomTokenObtainPairView):
+    _serializers = {}
+
+    def get_serializer_class(self):
+        base = super().get_serializer_class()
+        if base not in self._serializers:
+            self._serializers[base] = type(f'{base.__name__}ConPermisos', (TokenConPermisosMixin, base), {})
+        return self._serializers[base]
@@ -1,6 +1,5 @@
 from django.contrib import admin
 from django.urls import path, include, re_path
-from django.views.generic import TemplateView
 from django.conf import settings
 from django.conf.urls.static import static
 from django.shortcuts import redirect
@@ -14,11 +13,14 @@ from rest_framework_simplejwt.views import (
 from usuarios.views import (
     LoginView,
     LogoutView,
-    CustomTokenObtainPairView
 )
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
+from backend.metricas import MetricasView
+from backend.dashboard import dashboard
+from backend.frontend import IndiceFrontendView
+from backend.tokens import TokenConPermisosView
 
 # Configuración de Swagger/OpenAPI
 schema_view = get_schema_view(
@@ -54,7 +56,7 @@ urlpatterns = [
     
     # Endpoints de seguridad y autenticación
     path('api/csrf_token/', get_csrf_token, name='csrf_token'),
-    path('api/auth/login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/auth/login/', TokenConPermisosView.as_view(), name='token_obtain_pair'),
     path('api/auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/auth/verify/', TokenVerifyView.as_view(), name='token_verify'),
     path('api/auth/logout/', LogoutView.as_view(), name='auth_logout'),
@@ -63,6 +65,12 @@ urlpatterns = [
     # Documentación de la API
     path('api/docs/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('api/redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+
+    # Tablero principal (vista asíncrona)
+    path('api/dashboard/', dashboard, name='dashboard'),
+
+    # Métricas de rendimiento (formato Prometheus, solo administradores)
+    path('api/metrics/', MetricasView.as_view(), name='metricas'),
     
     # APIs de las aplicaciones
     path('api/usuarios/', include(('usuarios.urls', 'usuarios'), namespace='usuarios-api')),
@@ -71,12 +79,13 @@ urlpatterns = [
     path('api/asistencia/', include(('asistencia.urls', 'asistencia'), namespace='asistencia-api')),
     path('api/nomina/', include(('nomina.urls', 'nomina'), namespace='nomina-api')),
     path('api/materiales/', include(('materiales.urls', 'materiales'), namespace='materiales-api')),
+    path('api/inventario/', include(('inventario.urls', 'inventario'), namespace='inventario-api')),
     
     # Redirección de la raíz a la documentación
     path('', lambda request: redirect('/api/docs/')),
     
     # Captura todas las demás rutas para el frontend React
-    re_path(r'^(?!api/|admin/|media/|static/).*$', TemplateView.as_view(template_name='index.html')),
+    re_path(r'^(?!api/|admin/|media/|static/).*$', IndiceFrontendView.as_view()),
 ]
 
 # Configuración específica para desarrollo
@@ -6,16 +6,37 @@ import {
   Inventory as InventoryIcon,
   People as PeopleIcon
 } from '@mui/icons-material';
+import { dashboardService } from '../services/dashboard';
 
 const Dashboard = () => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [stats, setStats] = useState({
-    proyectosActivos: 3,
-    materialesEnStock: 24,
-    empleadosActivos: 12
+    proyectosActivos: 0,
+    materialesEnStock: 0,
+    empleadosActivos: 0
   });
 
+  useEffect(() => {
+    const cargarEstadisticas = async () => {
+      setLoading(true);
+      try {
+        const data = await dashboardService.getStats();
+        setStats({
+          proyectosActivos: data.proyectos_activos,
+          materialesEnStock: data.materiales_en_stock,
+          empleadosActivos: data.empleados_activos
+        });
+      } catch (err) {
+        console.error('Error al cargar el dashboard:', err);
+        setError('No se pudieron cargar las estadísticas');
+      } finally {
+        setLoading(false);
+      }
+    };
+    cargarEstadisticas();
+  }, []);
+
   if (loading) {
     return (
       <div style={{ display: 'flex', justifyContent: 'center', alignItems: 'center', height: '100vh' }}>
@@ -407,8 +407,17 @@ const Nomina = () => {
 
   const handleExportarExcel = async () => {
     try {
-      // Aquí iría la lógica para exportar a Excel
       enqueueSnackbar('Exportando a Excel...', { variant: 'info' });
+      const archivo = await nominaService.exportar('xlsx', {
+        periodo: filtroPeriodo || undefined,
+        empleado: filtroEmpleado || undefined
+      });
+      const url = window.URL.createObjectURL(archivo);
+      const enlace = document.createElement('a');
+      enlace.href = url;
+      enlace.download = `nomina${filtroPeriodo ? `_${filtroPeriodo}` : ''}.xlsx`;
+      enlace.click();
+      window.URL.revokeObjectURL(url);
     } catch (error) {
       enqueueSnackbar('Error al exportar a Excel', { variant: 'error' });
     }
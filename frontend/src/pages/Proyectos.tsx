@@ -389,7 +389,10 @@ const Proyectos = () => {
                   <CardMedia
                     component="img"
                     height="140"
-                    image={proyecto.foto_url}
+                    image={proyecto.foto_thumb_url || proyecto.foto_url}
+                    srcSet={proyecto.foto_srcset || undefined}
+                    sizes="(min-width: 900px) 33vw, (min-width: 600px) 50vw, 100vw"
+                    loading="lazy"
                     alt={proyecto.nombre}
                   />
                 )}
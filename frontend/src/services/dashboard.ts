@@ -0,0 +1,17 @@
+import api from './api';
+
+export interface DashboardStats {
+  proyectos_activos: number;
+  obras_en_progreso: number;
+  materiales_en_stock: number;
+  materiales_bajo_minimo: number;
+  empleados_activos: number;
+  asistencia_hoy: number;
+}
+
+export const dashboardService = {
+  getStats: async (): Promise<DashboardStats> => {
+    const response = await api.get<DashboardStats>('/api/dashboard/');
+    return response.data;
+  },
+};
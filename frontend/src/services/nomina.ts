@@ -232,6 +232,26 @@ export const nominaService = {
     }
   },
 
+  /**
+   * Exportar nóminas (CSV o XLSX) generadas en el servidor con los mismos filtros del listado
+   */
+  exportar: async (
+    formato: 'csv' | 'xlsx',
+    filtros: { periodo?: string; empleado?: string; estado?: NominaEstado } = {}
+  ): Promise<Blob> => {
+    try {
+      const response = await api.get('/api/nomina/exportar/', {
+        params: { formato, ...filtros },
+        responseType: 'blob',
+        timeout: 0
+      });
+      return response.data;
+    } catch (error: any) {
+      console.error('Error al exportar nóminas:', error);
+      throw new Error('Error al exportar las nóminas');
+    }
+  },
+
   /**
    * Procesar nómina (cambiar estado a Pagado) con validación
    */
@@ -13,6 +13,8 @@ export interface Proyecto {
   activo: boolean;
   foto?: File | null;
   foto_url?: string;
+  foto_thumb_url?: string | null;
+  foto_srcset?: string | null;
   responsable?: number;
   responsable_info?: {
     id: number;
@@ -3,13 +3,20 @@ import react from '@vitejs/plugin-react'
 import path from 'path'
 
 // https://vitejs.dev/config/
-export default defineConfig({
+export default defineConfig(({ command }) => ({
   plugins: [react()],
+  // En producción Django sirve el build bajo STATIC_URL (manage.py collectfrontend)
+  base: command === 'build' ? '/static/' : '/',
   resolve: {
     alias: {
       '@': path.resolve(__dirname, './src'),
     },
   },
+  build: {
+    outDir: 'dist',
+    assetsDir: 'assets',
+    manifest: true,
+  },
   server: {
     port: 3000,
     proxy: {
@@ -19,4 +26,4 @@ export default defineConfig({
       },
     },
   },
-})
\ No newline at end of file
+}))
@@ -0,0 +1,18 @@
+from django.contrib import admin
+from .models import MovimientoStock, CorteStock
+
+@admin.register(MovimientoStock)
+class MovimientoStockAdmin(admin.ModelAdmin):
+    list_display = ('material', 'tipo', 'cantidad', 'cantidad_resultante', 'obra', 'usuario', 'fecha')
+    list_filter = ('tipo', 'fecha')
+    search_fields = ('material__nombre', 'material__codigo', 'obra__nombre')
+    date_hierarchy = 'fecha'
+    readonly_fields = ('cantidad_resultante', 'creado_en')
+    list_select_related = ('material', 'obra', 'usuario')
+
+@admin.register(CorteStock)
+class CorteStockAdmin(admin.ModelAdmin):
+    list_display = ('material', 'fecha', 'cantidad')
+    list_filter = ('fecha',)
+    search_fields = ('material__nombre', 'material__codigo')
+    list_select_related = ('material',)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from inventario.movimientos import generar_cortes
+
+
+class Command(BaseCommand):
+    help = 'Guarda el corte diario de stock de todos los materiales (ejecutar al cierre del día)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha', help='Fecha del corte en formato YYYY-MM-DD (por defecto hoy); las fechas pasadas se reconstruyen desde el historial')
+
+    def handle(self, *args, **options):
+        fecha = parse_date(options['fecha']) if options['fecha'] else None
+        try:
+            total = generar_cortes(fecha)
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f'{total} cortes de stock guardados'))
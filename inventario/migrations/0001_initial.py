@@ -0,0 +1,58 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('materiales', '0010_material_codigo_secuencia'),
+        ('obras', '0004_obra_delete_obras'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientoStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('ENT', 'Entrada'), ('SAL', 'Salida'), ('AJU', 'Ajuste')], max_length=3)),
+                ('cantidad', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('cantidad_resultante', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('observaciones', models.TextField(blank=True, null=True)),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movimientos', to='materiales.material')),
+                ('obra', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movimientos_stock', to='obras.obra')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movimientos_stock', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Movimiento de Stock',
+                'verbose_name_plural': 'Movimientos de Stock',
+                'ordering': ['-fecha', '-id'],
+                'indexes': [
+                    models.Index(fields=['material', 'fecha'], name='inventario_mov_material_fecha'),
+                    models.Index(fields=['obra', 'fecha'], name='inventario_mov_obra_fecha'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='CorteStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('cantidad', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cortes_stock', to='materiales.material')),
+            ],
+            options={
+                'verbose_name': 'Corte de Stock',
+                'verbose_name_plural': 'Cortes de Stock',
+                'ordering': ['-fecha'],
+                'unique_together': {('material', 'fecha')},
+            },
+        ),
+    ]
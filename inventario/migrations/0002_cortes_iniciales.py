@@ -0,0 +1,28 @@
+from django.db import migrations
+from django.utils import timezone
+
+
+def crear_cortes_iniciales(apps, schema_editor):
+    # El stock previo al historial queda registrado como corte inicial
+    Material = apps.get_model('materiales', 'Material')
+    CorteStock = apps.get_model('inventario', 'CorteStock')
+    fecha = timezone.localdate()
+    CorteStock.objects.bulk_create(
+        [
+            CorteStock(material_id=material_id, fecha=fecha, cantidad=cantidad)
+            for material_id, cantidad in Material.objects.values_list('id', 'cantidad').iterator()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_cortes_iniciales, migrations.RunPython.noop),
+    ]
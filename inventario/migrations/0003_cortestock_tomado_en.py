@@ -0,0 +1,30 @@
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copiar_creado_en(apps, schema_editor):
+    # Los cortes existentes se tomaron al crearse (ver 0002)
+    CorteStock = apps.get_model('inventario', 'CorteStock')
+    CorteStock.objects.update(tomado_en=F('creado_en'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0002_cortes_iniciales'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cortestock',
+            name='tomado_en',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(copiar_creado_en, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='cortestock',
+            name='tomado_en',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class MovimientoStock(models.Model):
+    TIPOS_MOVIMIENTO = (
+        ('ENT', 'Entrada'),
+        ('SAL', 'Salida'),
+        ('AJU', 'Ajuste'),
+    )
+
+    material = models.ForeignKey(
+        'materiales.Material',
+        on_delete=models.CASCADE,
+        related_name='movimientos'
+    )
+    obra = models.ForeignKey(
+        'obras.Obra',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='movimientos_stock'
+    )
+    tipo = models.CharField(max_length=3, choices=TIPOS_MOVIMIENTO)
+    # Variación con signo: positiva para entradas, negativa para salidas
+    cantidad = models.DecimalField(max_digits=10, decimal_places=2)
+    cantidad_resultante = models.DecimalField(max_digits=10, decimal_places=2)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='movimientos_stock'
+    )
+    observaciones = models.TextField(blank=True, null=True)
+    fecha = models.DateTimeField(default=timezone.now)
+    creado_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Movimiento de Stock'
+        verbose_name_plural = 'Movimientos de Stock'
+        ordering = ['-fecha', '-id']
+        indexes = [
+            models.Index(fields=['material', 'fecha'], name='inventario_mov_material_fecha'),
+            models.Index(fields=['obra', 'fecha'], name='inventario_mov_obra_fecha'),
+        ]
+
+    def __str__(self):
+        return f"{self.material} - {self.get_tipo_display()} - {self.cantidad}"
+
+
+class CorteStock(models.Model):
+    """Cantidad de un material al cierre de un día, para no recorrer todo el historial"""
+    material = models.ForeignKey(
+        'materiales.Material',
+        on_delete=models.CASCADE,
+        related_name='cortes_stock'
+    )
+    fecha = models.DateField()
+    cantidad = models.DecimalField(max_digits=10, decimal_places=2)
+    # Instante al que corresponde la cantidad: los movimientos desde aquí no están incluidos
+    tomado_en = models.DateTimeField(default=timezone.now)
+    creado_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Corte de Stock'
+        verbose_name_plural = 'Cortes de Stock'
+        ordering = ['-fecha']
+        unique_together = ['material', 'fecha']
+
+    def __str__(self):
+        return f"{self.material} - {self.fecha} - {self.cantidad}"
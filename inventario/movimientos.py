@@ -0,0 +1,171 @@
+"""
+Registro de movimientos de stock.
+
+La cantidad de cada material se modifica siempre con ``F('cantidad') + delta``
+en la misma transacción que guarda el movimiento, así dos salidas simultáneas
+no se pisan y el historial coincide con el stock.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Sum, Value, When
+from django.utils import timezone
+
+from materiales.models import Material
+from .models import CorteStock, MovimientoStock
+
+
+class StockInsuficiente(Exception):
+    pass
+
+
+def calcular_delta(tipo, cantidad):
+    """Entradas suman, salidas restan y los ajustes se aplican con su signo"""
+    cantidad = Decimal(str(cantidad))
+    if tipo == 'ENT':
+        return abs(cantidad)
+    if tipo == 'SAL':
+        return -abs(cantidad)
+    return cantidad
+
+
+@transaction.atomic
+def registrar_movimientos(movimientos, usuario=None):
+    """
+    Aplica una lista de movimientos en una transacción.
+
+    Cada movimiento es un dict con ``material_id``, ``tipo``, ``cantidad`` y
+    opcionalmente ``obra_id`` y ``observaciones``. Todos quedan con la fecha
+    actual: ``cantidad_resultante`` parte del stock vigente y los cortes solo
+    suman movimientos posteriores a su ``tomado_en``. Las cantidades de
+    todos los materiales se actualizan con un único UPDATE y los movimientos se
+    insertan con ``bulk_create``. Si algún material queda en negativo se
+    revierte todo y se lanza ``StockInsuficiente``.
+    """
+    if not movimientos:
+        return []
+
+    deltas = defaultdict(Decimal)
+    for movimiento in movimientos:
+        movimiento['delta'] = calcular_delta(movimiento['tipo'], movimiento['cantidad'])
+        deltas[movimiento['material_id']] += movimiento['delta']
+
+    material_ids = sorted(deltas)
+    actualizados = Material.objects.filter(pk__in=material_ids).update(
+        cantidad=F('cantidad') + Case(
+            *[When(pk=material_id, then=Value(deltas[material_id])) for material_id in material_ids],
+            output_field=DecimalField(max_digits=10, decimal_places=2)
+        ),
+        fecha_actualizacion=timezone.now()
+    )
+    if actualizados != len(material_ids):
+        raise Material.DoesNotExist('Uno o más materiales no existen')
+
+    # Las filas quedaron bloqueadas por el UPDATE: la lectura es consistente
+    cantidades = dict(
+        Material.objects.filter(pk__in=material_ids).values_list('id', 'cantidad')
+    )
+    agotados = [material_id for material_id, cantidad in cantidades.items() if cantidad < 0]
+    if agotados:
+        raise StockInsuficiente(
+            f"Stock insuficiente para los materiales: {', '.join(map(str, agotados))}"
+        )
+
+    # Cantidad resultante de cada movimiento, en el orden recibido
+    acumulado = {
+        material_id: cantidades[material_id] - deltas[material_id]
+        for material_id in material_ids
+    }
+    ahora = timezone.now()
+    registros = []
+    for movimiento in movimientos:
+        material_id = movimiento['material_id']
+        acumulado[material_id] += movimiento['delta']
+        registros.append(MovimientoStock(
+            material_id=material_id,
+            obra_id=movimiento.get('obra_id'),
+            tipo=movimiento['tipo'],
+            cantidad=movimiento['delta'],
+            cantidad_resultante=acumulado[material_id],
+            usuario=usuario,
+            observaciones=movimiento.get('observaciones'),
+            fecha=ahora,
+        ))
+    return MovimientoStock.objects.bulk_create(registros)
+
+
+def registrar_movimiento(material_id, tipo, cantidad, usuario=None, **datos):
+    return registrar_movimientos(
+        [dict(material_id=material_id, tipo=tipo, cantidad=cantidad, **datos)],
+        usuario=usuario
+    )[0]
+
+
+def fin_del_dia(fecha):
+    return timezone.make_aware(datetime.combine(fecha + timedelta(days=1), time.min))
+
+
+def stock_en_fecha(material_id, fecha):
+    """
+    Cantidad de un material al cierre de ``fecha``: parte del último corte
+    anterior o igual a esa fecha y suma los movimientos desde el instante en
+    que se tomó (``tomado_en``), incluidos los del mismo día del corte.
+    """
+    corte = CorteStock.objects.filter(
+        material_id=material_id, fecha__lte=fecha
+    ).order_by('-fecha').values('tomado_en', 'cantidad').first()
+
+    movimientos = MovimientoStock.objects.filter(material_id=material_id, fecha__lt=fin_del_dia(fecha))
+    base = Decimal('0')
+    if corte:
+        movimientos = movimientos.filter(fecha__gte=corte['tomado_en'])
+        base = corte['cantidad']
+
+    delta = movimientos.aggregate(total=Sum('cantidad'))['total'] or Decimal('0')
+    return base + delta
+
+
+@transaction.atomic
+def generar_cortes(fecha=None):
+    """
+    Guarda la cantidad de cada material al cierre de ``fecha`` (por defecto
+    hoy). Para fechas pasadas la cantidad se reconstruye desde el historial,
+    restando a la cantidad actual los movimientos posteriores al cierre.
+    """
+    hoy = timezone.localdate()
+    fecha = fecha or hoy
+    if fecha > hoy:
+        raise ValueError('No se pueden generar cortes de fechas futuras')
+
+    # Bloquear las filas espera a los movimientos en curso, así ninguno queda
+    # aplicado en la cantidad leída pero con fecha posterior a tomado_en
+    cantidades = dict(Material.objects.select_for_update().values_list('id', 'cantidad'))
+    tomado_en = min(fin_del_dia(fecha), timezone.now())
+    posteriores = dict(
+        MovimientoStock.objects.filter(fecha__gte=tomado_en)
+        .values('material_id').annotate(total=Sum('cantidad'))
+        .values_list('material_id', 'total')
+    )
+    creados_antes = set(
+        Material.objects.filter(fecha_creacion__lt=tomado_en).values_list('id', flat=True)
+    )
+    cortes = [
+        CorteStock(
+            material_id=material_id,
+            fecha=fecha,
+            cantidad=cantidad - posteriores.get(material_id, Decimal('0')),
+            tomado_en=tomado_en,
+        )
+        for material_id, cantidad in cantidades.items()
+        if material_id in creados_antes
+    ]
+    CorteStock.objects.bulk_create(
+        cortes,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['material', 'fecha'],
+        update_fields=['cantidad', 'tomado_en']
+    )
+    return len(cortes)
@@ -0,0 +1,38 @@
+from rest_framework import serializers
+from .models import MovimientoStock
+
+
+class MovimientoStockSerializer(serializers.ModelSerializer):
+    material_nombre = serializers.CharField(source='material.nombre', read_only=True)
+    obra_nombre = serializers.CharField(source='obra.nombre', read_only=True, allow_null=True)
+    tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
+
+    class Meta:
+        model = MovimientoStock
+        fields = [
+            'id',
+            'material',
+            'material_nombre',
+            'obra',
+            'obra_nombre',
+            'tipo',
+            'tipo_display',
+            'cantidad',
+            'cantidad_resultante',
+            'usuario',
+            'observaciones',
+            'fecha',
+            'creado_en'
+        ]
+        # La fecha es la del servidor: cantidad_resultante sale del stock actual
+        # y un movimiento con fecha anterior a un corte nunca se contaría
+        read_only_fields = ['id', 'cantidad_resultante', 'usuario', 'fecha', 'creado_en']
+
+    def validate(self, data):
+        if data['tipo'] in ('ENT', 'SAL') and data['cantidad'] <= 0:
+            raise serializers.ValidationError({
+                'cantidad': 'La cantidad de una entrada o salida debe ser mayor a 0'
+            })
+        if data['tipo'] == 'AJU' and data['cantidad'] == 0:
+            raise serializers.ValidationError({'cantidad': 'El ajuste no puede ser 0'})
+        return data
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from materiales.models import Material
+from usuarios.models import Usuario
+from .models import CorteStock, MovimientoStock
+from .movimientos import (
+    StockInsuficiente,
+    generar_cortes,
+    registrar_movimiento,
+    registrar_movimientos,
+    stock_en_fecha,
+)
+
+
+class MovimientoStockTests(TestCase):
+    def setUp(self):
+        self.cemento = Material.objects.create(nombre='Cemento', codigo='MAT900', cantidad=Decimal('100'))
+        self.arena = Material.objects.create(nombre='Arena', codigo='MAT901', cantidad=Decimal('10'))
+
+    def test_salida_descuenta_de_forma_atomica(self):
+        movimiento = registrar_movimiento(self.cemento.id, 'SAL', Decimal('30'))
+        self.cemento.refresh_from_db()
+        self.assertEqual(self.cemento.cantidad, Decimal('70'))
+        self.assertEqual(movimiento.cantidad, Decimal('-30'))
+        self.assertEqual(movimiento.cantidad_resultante, Decimal('70'))
+
+    def test_lote_aplica_todos_los_movimientos(self):
+        registrar_movimientos([
+            {'material_id': self.cemento.id, 'tipo': 'ENT', 'cantidad': Decimal('20')},
+            {'material_id': self.arena.id, 'tipo': 'SAL', 'cantidad': Decimal('4')},
+            {'material_id': self.cemento.id, 'tipo': 'SAL', 'cantidad': Decimal('5')},
+        ])
+        self.cemento.refresh_from_db()
+        self.arena.refresh_from_db()
+        self.assertEqual(self.cemento.cantidad, Decimal('115'))
+        self.assertEqual(self.arena.cantidad, Decimal('6'))
+        self.assertEqual(
+            list(MovimientoStock.objects.filter(material=self.cemento)
+                 .order_by('id').values_list('cantidad_resultante', flat=True)),
+            [Decimal('120'), Decimal('115')]
+        )
+
+    def test_stock_insuficiente_revierte_el_lote(self):
+        with self.assertRaises(StockInsuficiente):
+            registrar_movimientos([
+                {'material_id': self.cemento.id, 'tipo': 'SAL', 'cantidad': Decimal('10')},
+                {'material_id': self.arena.id, 'tipo': 'SAL', 'cantidad': Decimal('11')},
+            ])
+        self.cemento.refresh_from_db()
+        self.assertEqual(self.cemento.cantidad, Decimal('100'))
+        self.assertFalse(MovimientoStock.objects.exists())
+
+    def test_stock_en_fecha_incluye_movimientos_del_dia_del_corte(self):
+        hoy = timezone.localdate()
+        generar_cortes()
+        registrar_movimiento(self.cemento.id, 'SAL', Decimal('25'))
+        self.assertEqual(CorteStock.objects.get(material=self.cemento, fecha=hoy).cantidad, Decimal('100'))
+        self.assertEqual(stock_en_fecha(self.cemento.id, hoy), Decimal('75'))
+
+    def test_corte_pasado_se_reconstruye_del_historial(self):
+        hoy = timezone.localdate()
+        ahora = timezone.now()
+        Material.objects.filter(pk=self.cemento.pk).update(fecha_creacion=ahora - timedelta(days=5))
+        movimiento = registrar_movimiento(self.cemento.id, 'ENT', Decimal('20'))
+        MovimientoStock.objects.filter(pk=movimiento.pk).update(fecha=ahora - timedelta(days=1))
+
+        generar_cortes(hoy - timedelta(days=3))
+        corte = CorteStock.objects.get(material=self.cemento)
+        self.assertEqual(corte.cantidad, Decimal('100'))
+        # Arena se creó después del cierre de esa fecha
+        self.assertFalse(CorteStock.objects.filter(material=self.arena).exists())
+        self.assertEqual(stock_en_fecha(self.cemento.id, hoy), Decimal('120'))
+
+    def test_corte_de_fecha_futura(self):
+        with self.assertRaises(ValueError):
+            generar_cortes(timezone.localdate() + timedelta(days=1))
+
+
+class MovimientoStockAPITests(APITestCase):
+    def setUp(self):
+        self.cemento = Material.objects.create(nombre='Cemento', codigo='MAT900', cantidad=Decimal('100'))
+        self.client.force_authenticate(Usuario.objects.create_user(username='bodega', password='clave-prueba'))
+
+    def test_fecha_del_cliente_se_ignora(self):
+        hoy = timezone.localdate()
+        generar_cortes()
+        response = self.client.post('/api/inventario/movimientos/', {
+            'material': self.cemento.id, 'tipo': 'SAL', 'cantidad': '30',
+            'fecha': (timezone.now() - timedelta(days=10)).isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        movimiento = MovimientoStock.objects.get()
+        self.assertGreaterEqual(movimiento.fecha, CorteStock.objects.get(material=self.cemento).tomado_en)
+        self.assertEqual(stock_en_fecha(self.cemento.id, hoy), Decimal('70'))
@@ -0,0 +1,106 @@
+from rest_framework import mixins, permissions, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from django.utils.dateparse import parse_date
+from materiales.models import Material
+from backend.mixins import ListadoStreamingMixin
+from .models import MovimientoStock
+from .movimientos import StockInsuficiente, registrar_movimientos, stock_en_fecha
+from .serializers import MovimientoStockSerializer
+
+class MovimientoStockViewSet(ListadoStreamingMixin,
+                             mixins.CreateModelMixin,
+                             mixins.ListModelMixin,
+                             mixins.RetrieveModelMixin,
+                             viewsets.GenericViewSet):
+    """Historial de movimientos: solo se crean y se consultan, nunca se editan"""
+    serializer_class = MovimientoStockSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-fecha',)
+    max_movimientos_lote = 1000
+
+    def get_queryset(self):
+        queryset = MovimientoStock.objects.select_related('material', 'obra')
+
+        material = self.request.query_params.get('material')
+        obra = self.request.query_params.get('obra')
+        tipo = self.request.query_params.get('tipo')
+        fecha_inicio = self.request.query_params.get('fecha_inicio')
+        fecha_fin = self.request.query_params.get('fecha_fin')
+
+        if material:
+            queryset = queryset.filter(material_id=material)
+        if obra:
+            queryset = queryset.filter(obra_id=obra)
+        if tipo:
+            queryset = queryset.filter(tipo=tipo)
+        if fecha_inicio:
+            queryset = queryset.filter(fecha__date__gte=fecha_inicio)
+        if fecha_fin:
+            queryset = queryset.filter(fecha__date__lte=fecha_fin)
+
+        return queryset
+
+    def datos_movimiento(self, data):
+        return {
+            'material_id': data['material'].id,
+            'obra_id': data['obra'].id if data.get('obra') else None,
+            'tipo': data['tipo'],
+            'cantidad': data['cantidad'],
+            'observaciones': data.get('observaciones'),
+        }
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            movimiento = registrar_movimientos(
+                [self.datos_movimiento(serializer.validated_data)],
+                usuario=request.user
+            )[0]
+        except StockInsuficiente as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(movimiento).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def lote(self, request):
+        """Registra varios movimientos en una sola transacción"""
+        items = request.data.get('movimientos') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list):
+            return Response(
+                {'error': 'Se espera una lista de movimientos'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > self.max_movimientos_lote:
+            return Response(
+                {'error': f'El lote no puede tener más de {self.max_movimientos_lote} movimientos'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = self.get_serializer(data=items, many=True)
+        serializer.is_valid(raise_exception=True)
+        try:
+            movimientos = registrar_movimientos(
+                [self.datos_movimiento(data) for data in serializer.validated_data],
+                usuario=request.user
+            )
+        except StockInsuficiente as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {'registrados': len(movimientos)},
+            status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=False, methods=['get'], url_path='stock-en-fecha')
+    def stock_en_fecha(self, request):
+        material_id = request.query_params.get('material')
+        fecha = parse_date(request.query_params.get('fecha') or '')
+        if not material_id or not material_id.isdigit() or not fecha:
+            raise serializers.ValidationError('Debe indicar material y fecha (YYYY-MM-DD)')
+        if not Material.objects.filter(pk=material_id).exists():
+            return Response({'error': 'Material no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'material': int(material_id),
+            'fecha': fecha,
+            'cantidad': stock_en_fecha(material_id, fecha),
+        })
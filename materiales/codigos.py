@@ -0,0 +1,38 @@
+"""
+Asignación de códigos de material (``MAT001``, ``MAT002``, ...).
+
+Los números salen de una secuencia de Postgres, por lo que dos creaciones
+concurrentes nunca reciben el mismo código y no hace falta leer el último
+material. Los números de una secuencia no se devuelven al hacer rollback:
+puede haber huecos, pero nunca duplicados.
+"""
+from django.db import connection
+
+SECUENCIA_CODIGO = 'materiales_material_codigo_seq'
+PREFIJO_CODIGO = 'MAT'
+
+
+def formatear_codigo(numero):
+    return f'{PREFIJO_CODIGO}{str(numero).zfill(3)}'
+
+
+def reservar_codigos(cantidad):
+    """
+    Reserva ``cantidad`` códigos con una sola sentencia, en orden creciente.
+
+    No son necesariamente consecutivos: ``nextval()`` se evalúa fila por fila
+    y otra reserva concurrente puede tomar números intercalados. Solo se
+    garantiza que son únicos.
+    """
+    if cantidad <= 0:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT nextval(%s) FROM generate_series(1, %s)',
+            [SECUENCIA_CODIGO, cantidad]
+        )
+        return [formatear_codigo(numero) for numero in sorted(fila[0] for fila in cursor.fetchall())]
+
+
+def siguiente_codigo():
+    return reservar_codigos(1)[0]
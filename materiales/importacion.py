@@ -0,0 +1,189 @@
+"""
+Importación masiva de materiales desde CSV o XLSX.
+
+El archivo se lee por bloques: cada bloque se valida con las reglas de
+``MaterialSerializer`` y se inserta o actualiza por ``codigo`` con un único
+``bulk_create(update_conflicts=True)``. La cantidad de los materiales nuevos
+no se escribe en el upsert: entra como movimiento de stock inicial, así el
+historial de inventario sigue siendo la fuente de la cantidad. Las
+categorías y proveedores se
+resuelven por nombre con mapas construidos una sola vez, así que la memoria
+y las consultas dependen del tamaño del bloque y no del archivo.
+"""
+import csv
+import io
+from itertools import islice
+
+from django.db import connection, transaction
+from rest_framework import serializers
+
+from inventario.movimientos import registrar_movimientos
+
+from .codigos import reservar_codigos
+from .models import CategoriaMaterial, Material, Proveedor
+from .serializers import MaterialSerializer
+
+COLUMNAS = [
+    'codigo', 'nombre', 'descripcion', 'categoria', 'proveedor', 'cantidad',
+    'unidad_medida', 'precio_unitario', 'stock_minimo', 'ubicacion',
+]
+# La cantidad solo se toma al crear: en materiales existentes el stock se
+# modifica con movimientos de inventario.
+CAMPOS_ACTUALIZABLES = [
+    'nombre', 'descripcion', 'categoria', 'proveedor', 'unidad_medida',
+    'precio_unitario', 'stock_minimo', 'ubicacion', 'fecha_actualizacion',
+]
+TAMANO_BLOQUE = 1000
+MAX_ERRORES = 1000
+
+
+class ImportacionError(Exception):
+    pass
+
+
+class MaterialImportacionSerializer(MaterialSerializer):
+    """
+    Reglas de ``MaterialSerializer`` sin consultas por fila: el código no pasa
+    por el validador de unicidad (se hace upsert) y las relaciones llegan
+    resueltas por nombre.
+    """
+    codigo = serializers.CharField(max_length=20, required=False, allow_blank=True, allow_null=True)
+
+    class Meta(MaterialSerializer.Meta):
+        fields = [
+            'codigo', 'nombre', 'descripcion', 'cantidad', 'unidad_medida',
+            'precio_unitario', 'stock_minimo', 'ubicacion',
+        ]
+
+
+def leer_csv(archivo):
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    muestra = texto.read(4096)
+    texto.seek(0)
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+    for fila in csv.DictReader(texto, dialect=dialecto):
+        yield fila
+
+
+def leer_xlsx(archivo):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportacionError('Para importar archivos XLSX debe instalar openpyxl')
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezados = [str(valor or '') for valor in next(filas, [])]
+        for valores in filas:
+            yield dict(zip(encabezados, valores))
+    finally:
+        libro.close()
+
+
+def leer_filas(archivo, formato):
+    """Genera las filas como dicts con los encabezados normalizados"""
+    if formato == 'csv':
+        filas = leer_csv(archivo)
+    elif formato == 'xlsx':
+        filas = leer_xlsx(archivo)
+    else:
+        raise ImportacionError('Formato no soportado. Use csv o xlsx')
+
+    for fila in filas:
+        normalizada = {}
+        for clave, valor in fila.items():
+            clave = (clave or '').strip().lower()
+            if clave in COLUMNAS:
+                if isinstance(valor, str):
+                    valor = valor.strip()
+                normalizada[clave] = None if valor == '' else valor
+        yield normalizada
+
+
+def cargar_mapa(modelo):
+    return {
+        nombre.strip().lower(): pk
+        for pk, nombre in modelo.objects.values_list('id', 'nombre').iterator()
+    }
+
+
+def importar_materiales(archivo, formato, usuario=None, tamano_bloque=TAMANO_BLOQUE):
+    """Importa el archivo y devuelve un reporte con los errores por fila"""
+    categorias = cargar_mapa(CategoriaMaterial)
+    proveedores = cargar_mapa(Proveedor)
+    reporte = {'procesadas': 0, 'importadas': 0, 'con_errores': 0, 'errores': []}
+
+    def registrar_error(numero, errores):
+        reporte['con_errores'] += 1
+        if len(reporte['errores']) < MAX_ERRORES:
+            reporte['errores'].append({'fila': numero, 'errores': errores})
+
+    filas = enumerate(leer_filas(archivo, formato), start=2)  # fila 1: encabezados
+    while True:
+        bloque = list(islice(filas, tamano_bloque))
+        if not bloque:
+            break
+        reporte['procesadas'] += len(bloque)
+
+        materiales = {}
+        sin_codigo = []
+        for numero, fila in bloque:
+            errores = {}
+            relaciones = {}
+            for campo, mapa in (('categoria', categorias), ('proveedor', proveedores)):
+                nombre = fila.get(campo)
+                if nombre:
+                    relaciones[f'{campo}_id'] = mapa.get(str(nombre).lower())
+                    if relaciones[f'{campo}_id'] is None:
+                        errores[campo] = [f'No existe "{nombre}"']
+
+            serializer = MaterialImportacionSerializer(data=fila)
+            if not serializer.is_valid():
+                errores.update(serializer.errors)
+            if errores:
+                registrar_error(numero, errores)
+                continue
+
+            material = Material(**serializer.validated_data, **relaciones)
+            if material.codigo:
+                # Si el código se repite dentro del bloque gana la última fila
+                materiales[material.codigo] = material
+            else:
+                sin_codigo.append(material)
+
+        for material, codigo in zip(sin_codigo, reservar_codigos(len(sin_codigo))):
+            material.codigo = codigo
+            materiales[codigo] = material
+
+        cantidades = {}
+        for codigo, material in materiales.items():
+            cantidades[codigo] = material.cantidad or 0
+            material.cantidad = 0
+
+        with transaction.atomic():
+            # Serializa las importaciones para que un código no pase de nuevo
+            # a existente entre la consulta y el upsert
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext('materiales:importacion'))")
+            existentes = set(
+                Material.objects.filter(codigo__in=materiales).values_list('codigo', flat=True)
+            )
+            Material.objects.bulk_create(
+                list(materiales.values()),
+                update_conflicts=True,
+                unique_fields=['codigo'],
+                update_fields=CAMPOS_ACTUALIZABLES
+            )
+            iniciales = [codigo for codigo in materiales if codigo not in existentes and cantidades[codigo] > 0]
+            ids = dict(Material.objects.filter(codigo__in=iniciales).values_list('codigo', 'id'))
+            registrar_movimientos([
+                {'material_id': ids[codigo], 'tipo': 'ENT', 'cantidad': cantidades[codigo],
+                 'observaciones': 'Stock inicial (importación)'}
+                for codigo in iniciales
+            ], usuario=usuario)
+        reporte['importadas'] += len(materiales)
+
+    return reporte
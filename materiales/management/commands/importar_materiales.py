@@ -0,0 +1,34 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from materiales.importacion import ImportacionError, importar_materiales
+
+
+class Command(BaseCommand):
+    help = 'Importa o actualiza materiales desde un archivo CSV o XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo CSV o XLSX')
+        parser.add_argument('--bloque', type=int, default=1000, help='Filas por bloque')
+
+    def handle(self, *args, **options):
+        ruta = options['archivo']
+        formato = os.path.splitext(ruta)[1].lstrip('.').lower()
+        try:
+            with open(ruta, 'rb') as archivo:
+                reporte = importar_materiales(archivo, formato, tamano_bloque=options['bloque'])
+        except FileNotFoundError:
+            raise CommandError(f'No existe el archivo {ruta}')
+        except ImportacionError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{reporte["importadas"]} materiales importados de {reporte["procesadas"]} filas'
+        ))
+        for error in reporte['errores']:
+            self.stdout.write(self.style.WARNING(f'Fila {error["fila"]}: {error["errores"]}'))
+        if reporte['con_errores'] > len(reporte['errores']):
+            self.stdout.write(self.style.WARNING(
+                f'... {reporte["con_errores"] - len(reporte["errores"])} filas más con errores'
+            ))
@@ -0,0 +1,30 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materiales', '0007_alter_proveedor_fecha_actualizacion_and_more'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        # Índices GIN de trigramas: sirven para ILIKE '%texto%' y para el
+        # operador de similitud (%) usados en la búsqueda de materiales.
+        migrations.RunSQL(
+            sql=[
+                'CREATE INDEX IF NOT EXISTS materiales_material_nombre_trgm '
+                'ON materiales_material USING gin (nombre gin_trgm_ops);',
+                'CREATE INDEX IF NOT EXISTS materiales_material_codigo_trgm '
+                'ON materiales_material USING gin (codigo gin_trgm_ops);',
+                'CREATE INDEX IF NOT EXISTS materiales_material_descripcion_trgm '
+                'ON materiales_material USING gin (descripcion gin_trgm_ops);',
+            ],
+            reverse_sql=[
+                'DROP INDEX IF EXISTS materiales_material_nombre_trgm;',
+                'DROP INDEX IF EXISTS materiales_material_codigo_trgm;',
+                'DROP INDEX IF EXISTS materiales_material_descripcion_trgm;',
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materiales', '0008_material_indices_busqueda'),
+    ]
+
+    operations = [
+        # Índices parciales para los materiales que requieren reposición:
+        # solo contienen las filas bajo el mínimo o agotadas, así que contar
+        # y listar esos estados no recorre el catálogo completo.
+        migrations.RunSQL(
+            sql=[
+                'CREATE INDEX IF NOT EXISTS materiales_material_bajo_minimo '
+                'ON materiales_material (categoria_id, cantidad) '
+                'WHERE cantidad < stock_minimo;',
+                'CREATE INDEX IF NOT EXISTS materiales_material_bajo_critico '
+                'ON materiales_material (categoria_id, cantidad) '
+                'WHERE cantidad < stock_minimo * 0.3;',
+                'CREATE INDEX IF NOT EXISTS materiales_material_agotado '
+                'ON materiales_material (categoria_id) '
+                'WHERE cantidad <= 0;',
+            ],
+            reverse_sql=[
+                'DROP INDEX IF EXISTS materiales_material_bajo_minimo;',
+                'DROP INDEX IF EXISTS materiales_material_bajo_critico;',
+                'DROP INDEX IF EXISTS materiales_material_agotado;',
+            ],
+        ),
+    ]
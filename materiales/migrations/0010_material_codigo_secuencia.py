@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materiales', '0009_material_indices_stock'),
+    ]
+
+    operations = [
+        # La secuencia continúa desde el mayor código MATnnn existente
+        migrations.RunSQL(
+            sql=[
+                'CREATE SEQUENCE IF NOT EXISTS materiales_material_codigo_seq START 1;',
+                "SELECT setval('materiales_material_codigo_seq', "
+                "COALESCE(MAX(CAST(SUBSTRING(codigo FROM 4) AS bigint)), 0) + 1, false) "
+                "FROM materiales_material WHERE codigo ~ '^MAT[0-9]+$';",
+            ],
+            reverse_sql='DROP SEQUENCE IF EXISTS materiales_material_codigo_seq;',
+        ),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materiales', '0010_material_codigo_secuencia'),
+    ]
+
+    operations = [
+        # ?categoria= con el orden por código del listado
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS materiales_material_categoria_codigo '
+                'ON materiales_material (categoria_id, codigo);',
+            reverse_sql='DROP INDEX IF EXISTS materiales_material_categoria_codigo;',
+        ),
+    ]
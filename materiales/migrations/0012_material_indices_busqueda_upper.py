@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materiales', '0011_material_indices_categoria'),
+    ]
+
+    operations = [
+        # En Postgres icontains se compila como UPPER("col"::text) LIKE UPPER(%s):
+        # los índices de 0008 sobre la columna sola no sirven para esa expresión.
+        # El de nombre se conserva porque lo usa el operador de similitud (%).
+        migrations.RunSQL(
+            sql=[
+                'DROP INDEX IF EXISTS materiales_material_codigo_trgm;',
+                'DROP INDEX IF EXISTS materiales_material_descripcion_trgm;',
+                'CREATE INDEX IF NOT EXISTS materiales_material_nombre_upper_trgm '
+                'ON materiales_material USING gin ((UPPER(nombre::text)) gin_trgm_ops);',
+                'CREATE INDEX IF NOT EXISTS materiales_material_codigo_upper_trgm '
+                'ON materiales_material USING gin ((UPPER(codigo::text)) gin_trgm_ops);',
+                'CREATE INDEX IF NOT EXISTS materiales_material_descripcion_upper_trgm '
+                'ON materiales_material USING gin ((UPPER(descripcion::text)) gin_trgm_ops);',
+            ],
+            reverse_sql=[
+                'DROP INDEX IF EXISTS materiales_material_nombre_upper_trgm;',
+                'DROP INDEX IF EXISTS materiales_material_codigo_upper_trgm;',
+                'DROP INDEX IF EXISTS materiales_material_descripcion_upper_trgm;',
+                'CREATE INDEX IF NOT EXISTS materiales_material_codigo_trgm '
+                'ON materiales_material USING gin (codigo gin_trgm_ops);',
+                'CREATE INDEX IF NOT EXISTS materiales_material_descripcion_trgm '
+                'ON materiales_material USING gin (descripcion gin_trgm_ops);',
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materiales', '0012_material_indices_busqueda_upper'),
+    ]
+
+    operations = [
+        # Last-Modified de las respuestas cacheadas de categorías
+        migrations.AddField(
+            model_name='categoriamaterial',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,6 +1,7 @@
 # materiales/serializers.py
 from rest_framework import serializers
 from .models import Material, CategoriaMaterial, Proveedor
+from .codigos import siguiente_codigo
 from django.core.validators import MinValueValidator
 
 class CategoriaMaterialSerializer(serializers.ModelSerializer):
@@ -87,12 +88,7 @@ class MaterialSerializer(serializers.ModelSerializer):
         try:
             # Generar código automáticamente si no se proporciona
             if not validated_data.get('codigo'):
-                ultimo_material = Material.objects.order_by('-id').first()
-                if ultimo_material and ultimo_material.codigo and ultimo_material.codigo.startswith('MAT'):
-                    ultimo_numero = int(ultimo_material.codigo[3:])
-                    validated_data['codigo'] = f'MAT{str(ultimo_numero + 1).zfill(3)}'
-                else:
-                    validated_data['codigo'] = 'MAT001'
+                validated_data['codigo'] = siguiente_codigo()
 
             # Asegurarse de que los campos numéricos tengan valores por defecto
             if validated_data.get('cantidad') is None:
@@ -1,5 +1,8 @@
 from rest_framework import serializers
 from .models import Material, CategoriaMaterial, Proveedor
+from .codigos import siguiente_codigo
+from django.db import transaction
+from inventario.movimientos import registrar_movimiento
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 
@@ -50,6 +53,10 @@ class MaterialSerializer(serializers.ModelSerializer):
 
     def get_estado_stock(self, obj):
         """Calcula el estado del stock basado en la cantidad y stock mínimo"""
+        # En los listados el estado viene calculado desde la consulta
+        anotado = getattr(obj, 'estado_stock_anotado', None)
+        if anotado is not None:
+            return anotado
         if obj.cantidad <= 0:
             return 'Agotado'
         elif obj.cantidad < obj.stock_minimo * Decimal('0.3'):
@@ -75,4 +82,52 @@ class MaterialSerializer(serializers.ModelSerializer):
         """Valida que el stock mínimo no sea negativo"""
         if value < 0:
             raise serializers.ValidationError("El stock mínimo no puede ser negativo")
-        return value 
\ No newline at end of file
+        return value
+
+    def usuario_actual(self):
+        request = self.context.get('request')
+        return request.user if request is not None else None
+
+    @transaction.atomic
+    def create(self, validated_data):
+        """
+        Asigna el siguiente código de la secuencia si no se proporciona y
+        registra la cantidad inicial como una entrada del historial de stock
+        """
+        if not validated_data.get('codigo'):
+            validated_data['codigo'] = siguiente_codigo()
+        cantidad_inicial = validated_data.pop('cantidad', None) or 0
+        instance = super().create(validated_data)
+        if cantidad_inicial > 0:
+            registrar_movimiento(
+                instance.id, 'ENT', cantidad_inicial,
+                usuario=self.usuario_actual(),
+                observaciones='Stock inicial'
+            )
+            instance.refresh_from_db(fields=['cantidad'])
+        return instance
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        """
+        Guarda solo los campos enviados; un cambio de cantidad se registra como
+        ajuste en el historial y se aplica de forma atómica sobre la fila
+        """
+        nueva_cantidad = validated_data.pop('cantidad', None)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data) + ['fecha_actualizacion'])
+
+        if nueva_cantidad is None:
+            return instance
+        # La cantidad cargada con la instancia puede estar desactualizada: el
+        # ajuste se calcula contra la fila bloqueada
+        actual = Material.objects.select_for_update().values_list('cantidad', flat=True).get(pk=instance.pk)
+        if nueva_cantidad != actual:
+            registrar_movimiento(
+                instance.id, 'AJU', nueva_cantidad - actual,
+                usuario=self.usuario_actual(),
+                observaciones='Ajuste desde la edición del material'
+            )
+            instance.refresh_from_db(fields=['cantidad'])
+        return instance
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from backend.cache import invalidar_grupo
+from .models import CategoriaMaterial, Proveedor
+
+
+@receiver([post_save, post_delete], sender=CategoriaMaterial)
+def categoria_modificada(sender, **kwargs):
+    invalidar_grupo('categorias')
+
+
+@receiver([post_save, post_delete], sender=Proveedor)
+def proveedor_modificado(sender, **kwargs):
+    invalidar_grupo('proveedores')
@@ -0,0 +1,45 @@
+"""
+Clasificación del stock de materiales en la base de datos.
+
+Los predicados coinciden con los índices parciales de la migración 0009,
+de modo que filtrar o contar por estado usa esos índices en lugar de recorrer
+todo el catálogo.
+"""
+from decimal import Decimal
+
+from django.db.models import Case, CharField, F, Q, Value, When
+
+PROPORCION_CRITICA = Decimal('0.3')
+
+AGOTADO = 'Agotado'
+CRITICO = 'Crítico'
+BAJO = 'Bajo'
+DISPONIBLE = 'Disponible'
+ESTADOS_STOCK = [AGOTADO, CRITICO, BAJO, DISPONIBLE]
+
+Q_AGOTADO = Q(cantidad__lte=0)
+Q_BAJO_MINIMO = Q(cantidad__lt=F('stock_minimo'))
+Q_BAJO_CRITICO = Q(cantidad__lt=F('stock_minimo') * PROPORCION_CRITICA)
+
+FILTROS_ESTADO = {
+    AGOTADO: Q_AGOTADO,
+    CRITICO: ~Q_AGOTADO & Q_BAJO_CRITICO,
+    BAJO: ~Q_AGOTADO & Q_BAJO_MINIMO & ~Q_BAJO_CRITICO,
+    DISPONIBLE: ~Q_AGOTADO & ~Q_BAJO_MINIMO,
+}
+
+
+def expresion_estado_stock():
+    """Equivalente SQL de ``MaterialSerializer.get_estado_stock``"""
+    return Case(
+        When(Q_AGOTADO, then=Value(AGOTADO)),
+        When(Q_BAJO_CRITICO, then=Value(CRITICO)),
+        When(Q_BAJO_MINIMO, then=Value(BAJO)),
+        default=Value(DISPONIBLE),
+        output_field=CharField()
+    )
+
+
+def filtro_estado_stock(estado):
+    """Devuelve el ``Q`` de un estado o ``None`` si el estado no existe"""
+    return FILTROS_ESTADO.get(estado)
@@ -0,0 +1,169 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.http import http_date
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from backend.testing import PlanConsultaMixin
+from inventario.models import MovimientoStock
+from inventario.movimientos import stock_en_fecha
+from usuarios.models import Usuario
+from .codigos import reservar_codigos
+from .importacion import importar_materiales
+from .models import CategoriaMaterial, Material, Proveedor
+from .stock import Q_BAJO_MINIMO
+from .views_api import MaterialViewSet
+
+
+class MaterialIndicesTests(PlanConsultaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.categorias = [
+            CategoriaMaterial.objects.create(nombre=f'Categoría {i}', codigo=f'CAT{i}')
+            for i in range(5)
+        ]
+        Material.objects.bulk_create([
+            Material(
+                codigo=f'MAT{i:05d}',
+                nombre=f'Material {i}',
+                categoria=cls.categorias[i % 5],
+                cantidad=Decimal(i % 50),
+                stock_minimo=Decimal('10'),
+            )
+            for i in range(500)
+        ])
+
+    def test_filtro_por_categoria(self):
+        self.assertSinSeqScan(
+            Material.objects.filter(categoria=self.categorias[0]).order_by('codigo')
+        )
+
+    def test_materiales_bajo_minimo(self):
+        self.assertSinSeqScan(Material.objects.filter(Q_BAJO_MINIMO))
+
+    def test_busqueda_parcial(self):
+        # La consulta real del endpoint ?search=: icontains sobre tres columnas y similitud
+        self.assertSinSeqScan(MaterialViewSet().buscar(Material.objects.all(), 'rial 12'))
+
+
+class MaterialActualizacionTests(APITestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create_superuser(username='admin', password='clave-prueba')
+        self.client.force_authenticate(self.usuario)
+        self.material = Material.objects.create(
+            codigo='MAT900', nombre='Cemento', cantidad=Decimal('50'), stock_minimo=Decimal('10'),
+            categoria=CategoriaMaterial.objects.create(nombre='Obra gris', codigo='GRIS'),
+        )
+
+    def test_patch_devuelve_estado_stock_actualizado(self):
+        response = self.client.patch(f'/api/materiales/{self.material.pk}/', {'cantidad': '0'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['estado_stock'], 'Agotado')
+
+
+class MaterialBusquedaTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(Usuario.objects.create_superuser(username='admin', password='clave-prueba'))
+        Material.objects.bulk_create([
+            Material(codigo=f'CEM{i}', nombre=f'Cemento {i}') for i in range(5)
+        ])
+
+    def test_busqueda_paginada(self):
+        response = self.client.get('/api/materiales/', {'search': 'cemento', 'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(len(response.data['results']), 2)
+
+        siguiente = self.client.get(response.data['next'])
+        codigos = [m['codigo'] for m in response.data['results'] + siguiente.data['results']]
+        self.assertEqual(len(set(codigos)), 4)
+
+
+class ProveedorCacheTests(APITestCase):
+    url = '/api/materiales/proveedores/'
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = Usuario.objects.create_user(username='sup', password='clave-prueba', rol='SUP')
+        self.client.force_authenticate(self.usuario)
+        Proveedor.objects.create(
+            nombre='Ferretería Central', contacto='Ana', telefono='3001234567',
+            email='ventas@ferreteria.com', direccion='Calle 10',
+        )
+
+    def test_segunda_lectura_sin_consultas_de_datos(self):
+        primera = self.client.get(self.url)
+        self.assertEqual(primera.status_code, 200)
+        with CaptureQueriesContext(connection) as contexto:
+            segunda = self.client.get(self.url)
+        self.assertEqual(segunda.data, primera.data)
+        self.assertFalse([q for q in contexto if 'materiales_proveedor' in q['sql']])
+
+    def test_etag_devuelve_304(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_guardar_invalida_la_cache(self):
+        etag = self.client.get(self.url)['ETag']
+        Proveedor.objects.create(
+            nombre='Depósito Norte', contacto='Luis', telefono='3007654321',
+            email='info@deposito.com', direccion='Carrera 5',
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+
+
+class CategoriaCacheTests(APITestCase):
+    url = '/api/materiales/categorias/'
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = Usuario.objects.create_user(username='sup', password='clave-prueba', rol='SUP')
+        self.client.force_authenticate(self.usuario)
+        categoria = CategoriaMaterial.objects.create(nombre='Eléctricos', codigo='ELEC')
+        self.actualizada = timezone.now().replace(microsecond=0) - timedelta(days=3)
+        CategoriaMaterial.objects.filter(pk=categoria.pk).update(fecha_actualizacion=self.actualizada)
+
+    def test_last_modified_de_la_categoria(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Last-Modified'], http_date(self.actualizada.timestamp()))
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+
+class CodigosTests(TestCase):
+    def test_reserva_unica_y_creciente(self):
+        primera = reservar_codigos(3)
+        segunda = reservar_codigos(2)
+        numeros = [int(codigo[len('MAT'):]) for codigo in primera + segunda]
+        self.assertEqual(numeros, sorted(set(numeros)))
+        self.assertEqual(reservar_codigos(0), [])
+
+
+class ImportacionStockTests(TestCase):
+    def test_cantidad_nueva_entra_como_movimiento(self):
+        existente = Material.objects.create(codigo='MAT900', nombre='Cemento', cantidad=Decimal('5'))
+        archivo = BytesIO(
+            'codigo,nombre,cantidad\n'
+            'MAT900,Cemento gris,80\n'
+            'MAT901,Arena,40\n'.encode('utf-8')
+        )
+        reporte = importar_materiales(archivo, 'csv')
+        self.assertEqual(reporte['importadas'], 2)
+
+        existente.refresh_from_db()
+        self.assertEqual(existente.cantidad, Decimal('5'))
+        self.assertFalse(MovimientoStock.objects.filter(material=existente).exists())
+
+        arena = Material.objects.get(codigo='MAT901')
+        self.assertEqual(arena.cantidad, Decimal('40'))
+        self.assertEqual(stock_en_fecha(arena.id, timezone.localdate()), Decimal('40'))
@@ -1,18 +1,47 @@
 from rest_framework import viewsets, status, serializers
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Sum, Count, F
+from rest_framework.parsers import MultiPartParser
+import os
+from django.db.models import Sum, Count, F, Q, Case, When, Value, IntegerField
+from django.db.models.functions import Greatest
+from django.contrib.postgres.search import TrigramSimilarity
 from decimal import Decimal
 from .models import Material, CategoriaMaterial, Proveedor
 from .serializers import MaterialSerializer, CategoriaMaterialSerializer, ProveedorSerializer
+from .importacion import ImportacionError, importar_materiales
+from .stock import (
+    ESTADOS_STOCK, Q_AGOTADO, Q_BAJO_CRITICO, Q_BAJO_MINIMO,
+    expresion_estado_stock, filtro_estado_stock,
+)
 import logging
 from django.core.exceptions import ValidationError as DjangoValidationError
+from backend.mixins import ListadoStreamingMixin
+from backend.pagination import PaginacionBusqueda
+from backend.exportacion import ExportacionMixin
+from backend.cache import RespuestaCacheadaMixin, RespuestaCondicionalMixin
 
 logger = logging.getLogger(__name__)
 
-class MaterialViewSet(viewsets.ModelViewSet):
+class MaterialViewSet(ExportacionMixin, RespuestaCondicionalMixin, ListadoStreamingMixin, viewsets.ModelViewSet):
     queryset = Material.objects.all()
     serializer_class = MaterialSerializer
+    cursor_ordering = ('id',)
+    nombre_exportacion = 'materiales'
+    permisos_exportacion = ('usuarios.gestionar_materiales', 'usuarios.ver_reportes')
+    columnas_exportacion = [
+        ('codigo', 'Código'),
+        ('nombre', 'Nombre'),
+        ('descripcion', 'Descripción'),
+        ('categoria__nombre', 'Categoría'),
+        ('proveedor__nombre', 'Proveedor'),
+        ('cantidad', 'Cantidad'),
+        ('unidad_medida', 'Unidad de medida'),
+        ('precio_unitario', 'Precio unitario'),
+        ('stock_minimo', 'Stock mínimo'),
+        ('estado_stock_anotado', 'Estado de stock'),
+        ('ubicacion', 'Ubicación'),
+    ]
 
     def get_queryset(self):
         try:
@@ -22,21 +51,64 @@ class MaterialViewSet(viewsets.ModelViewSet):
             categoria = self.request.query_params.get('categoria', None)
             if categoria:
                 queryset = queryset.filter(categoria=categoria)
+
+            estado_stock = self.request.query_params.get('estado_stock', None)
+            if estado_stock:
+                filtro = filtro_estado_stock(estado_stock)
+                if filtro is None:
+                    raise serializers.ValidationError(
+                        f"Estado de stock inválido. Debe ser uno de: {', '.join(ESTADOS_STOCK)}"
+                    )
+                queryset = queryset.filter(filtro)
                 
-            # Búsqueda por nombre o descripción
-            search = self.request.query_params.get('search', None)
+            # Búsqueda por nombre, código o descripción
+            search = self.request.query_params.get('search', '').strip()
             if search:
-                queryset = queryset.filter(
-                    models.Q(nombre__icontains=search) |
-                    models.Q(descripcion__icontains=search) |
-                    models.Q(codigo__icontains=search)
-                )
+                queryset = self.buscar(queryset, search)
                 
-            return queryset.select_related('categoria', 'proveedor')
+            queryset = queryset.select_related('categoria', 'proveedor')
+            # Solo en lecturas: tras una escritura la anotación tendría el estado anterior
+            if self.action in ('list', 'retrieve', 'exportar', 'reponer'):
+                queryset = queryset.annotate(estado_stock_anotado=expresion_estado_stock())
+            return queryset
+        except serializers.ValidationError:
+            raise
         except Exception as e:
-            logger.error(f"Error al obtener materiales: {str(e)}")
+            logger.error("Error al obtener materiales: %s", e)
             raise serializers.ValidationError(f"Error al obtener materiales: {str(e)}")
 
+    def paginate_queryset(self, queryset):
+        # El cursor ordena por id y descartaría el orden por relevancia: la
+        # búsqueda se pagina por limit/offset sobre ese orden
+        if self.request.query_params.get('search', '').strip():
+            self._paginator = PaginacionBusqueda()
+        return super().paginate_queryset(queryset)
+
+    def buscar(self, queryset, texto):
+        """
+        Búsqueda respaldada por los índices GIN de trigramas: coincidencias
+        parciales (``UPPER(col) LIKE``, migración 0012) y aproximadas
+        (similitud) sobre nombre y código.
+        Primero aparecen los materiales cuyo nombre o código empiezan con el
+        texto y luego los más similares.
+        """
+        return queryset.filter(
+            Q(nombre__icontains=texto) |
+            Q(codigo__icontains=texto) |
+            Q(descripcion__icontains=texto) |
+            Q(nombre__trigram_similar=texto)
+        ).annotate(
+            es_prefijo=Case(
+                When(Q(codigo__istartswith=texto) | Q(nombre__istartswith=texto), then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField()
+            ),
+            relevancia=Greatest(
+                TrigramSimilarity('nombre', texto),
+                TrigramSimilarity('codigo', texto)
+            )
+        ).order_by('-es_prefijo', '-relevancia', 'codigo')
+
     def perform_create(self, serializer):
         try:
             if not serializer.validated_data.get('nombre'):
@@ -44,13 +116,13 @@ class MaterialViewSet(viewsets.ModelViewSet):
             
             # Guardar el material
             material = serializer.save()
-            logger.info(f"Material creado exitosamente: {material.nombre}")
+            logger.info("Material creado exitosamente: %s", material.nombre, extra={'material_id': material.pk})
             return material
         except DjangoValidationError as e:
-            logger.error(f"Error de validación al crear material: {str(e)}")
+            logger.error("Error de validación al crear material: %s", e)
             raise serializers.ValidationError(str(e))
         except Exception as e:
-            logger.error(f"Error al crear material: {str(e)}")
+            logger.error("Error al crear material: %s", e)
             raise serializers.ValidationError(f"Error al crear el material: {str(e)}")
 
     def perform_update(self, serializer):
@@ -60,30 +132,31 @@ class MaterialViewSet(viewsets.ModelViewSet):
             
             # Guardar el material
             material = serializer.save()
-            logger.info(f"Material actualizado exitosamente: {material.nombre}")
+            logger.info("Material actualizado exitosamente: %s", material.nombre, extra={'material_id': material.pk})
             return material
         except DjangoValidationError as e:
-            logger.error(f"Error de validación al actualizar material: {str(e)}")
+            logger.error("Error de validación al actualizar material: %s", e)
             raise serializers.ValidationError(str(e))
         except Exception as e:
-            logger.error(f"Error al actualizar material: {str(e)}")
+            logger.error("Error al actualizar material: %s", e)
             raise serializers.ValidationError(f"Error al actualizar el material: {str(e)}")
 
     @action(detail=False, methods=['get'])
     def estadisticas(self, request):
         try:
-            total_materiales = Material.objects.count()
-            total_valor = Material.objects.aggregate(
-                total=Sum(F('cantidad') * F('precio_unitario'))
-            )['total'] or 0
-            
-            stock_bajo = Material.objects.filter(
-                cantidad__lt=F('stock_minimo')
-            ).count()
-            
-            stock_critico = Material.objects.filter(
-                cantidad__lt=F('stock_minimo') * Decimal('0.3')
-            ).count()
+            # Un solo recorrido para los totales; los conteos de stock bajo
+            # y crítico coinciden con los índices parciales.
+            totales = Material.objects.aggregate(
+                total_materiales=Count('id'),
+                total_valor=Sum(F('cantidad') * F('precio_unitario')),
+                stock_bajo=Count('id', filter=Q_BAJO_MINIMO),
+                stock_critico=Count('id', filter=Q_BAJO_CRITICO),
+                agotados=Count('id', filter=Q_AGOTADO),
+            )
+            total_materiales = totales['total_materiales']
+            total_valor = totales['total_valor'] or 0
+            stock_bajo = totales['stock_bajo']
+            stock_critico = totales['stock_critico']
             
             materiales_por_categoria = Material.objects.values(
                 'categoria__nombre'
@@ -96,59 +169,105 @@ class MaterialViewSet(viewsets.ModelViewSet):
                 'total_valor': float(total_valor),  # Convertir Decimal a float para serialización
                 'stock_bajo': stock_bajo,
                 'stock_critico': stock_critico,
+                'agotados': totales['agotados'],
                 'materiales_por_categoria': list(materiales_por_categoria)  # Convertir QuerySet a lista
             })
         except Exception as e:
-            logger.error(f"Error al obtener estadísticas: {str(e)}")
+            logger.error("Error al obtener estadísticas: %s", e)
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    @action(detail=False, methods=['get'])
+    def reponer(self, request):
+        """Materiales bajo el stock mínimo, ordenados por el faltante"""
+        try:
+            queryset = self.get_queryset().filter(Q_BAJO_MINIMO).annotate(
+                faltante=F('stock_minimo') - F('cantidad')
+            ).order_by('-faltante')
+            serializer = self.get_serializer(queryset, many=True)
+            return Response(serializer.data)
+        except Exception as e:
+            logger.error("Error al obtener materiales por reponer: %s", e)
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class CategoriaMaterialViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser])
+    def importar(self, request):
+        """Importa materiales desde un archivo CSV o XLSX (campo ``archivo``)"""
+        archivo = request.FILES.get('archivo')
+        if not archivo:
+            return Response(
+                {'error': 'Debe adjuntar un archivo CSV o XLSX'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        formato = os.path.splitext(archivo.name)[1].lstrip('.').lower()
+        try:
+            reporte = importar_materiales(archivo.file, formato, usuario=request.user)
+        except ImportacionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error("Error al importar materiales: %s", e)
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        logger.info("Importación de materiales: %d de %d filas", reporte['importadas'], reporte['procesadas'])
+        return Response(reporte)
+
+class CategoriaMaterialViewSet(RespuestaCacheadaMixin, viewsets.ModelViewSet):
     queryset = CategoriaMaterial.objects.all()
     serializer_class = CategoriaMaterialSerializer
+    grupo_cache = 'categorias'
+    campo_actualizacion = 'fecha_actualizacion'
 
     def perform_create(self, serializer):
         try:
             serializer.save()
         except DjangoValidationError as e:
-            logger.error(f"Error de validación al crear categoría: {str(e)}")
+            logger.error("Error de validación al crear categoría: %s", e)
             raise serializers.ValidationError(str(e))
         except Exception as e:
-            logger.error(f"Error al crear categoría: {str(e)}")
+            logger.error("Error al crear categoría: %s", e)
             raise serializers.ValidationError(f"Error al crear la categoría: {str(e)}")
 
     def perform_update(self, serializer):
         try:
             serializer.save()
         except DjangoValidationError as e:
-            logger.error(f"Error de validación al actualizar categoría: {str(e)}")
+            logger.error("Error de validación al actualizar categoría: %s", e)
             raise serializers.ValidationError(str(e))
         except Exception as e:
-            logger.error(f"Error al actualizar categoría: {str(e)}")
+            logger.error("Error al actualizar categoría: %s", e)
             raise serializers.ValidationError(f"Error al actualizar la categoría: {str(e)}")
 
-class ProveedorViewSet(viewsets.ModelViewSet):
+class ProveedorViewSet(RespuestaCacheadaMixin, viewsets.ModelViewSet):
     queryset = Proveedor.objects.all()
     serializer_class = ProveedorSerializer
+    grupo_cache = 'proveedores'
+    campo_actualizacion = 'fecha_actualizacion'
 
     def perform_create(self, serializer):
         try:
             serializer.save()
         except DjangoValidationError as e:
-            logger.error(f"Error de validación al crear proveedor: {str(e)}")
+            logger.error("Error de validación al crear proveedor: %s", e)
             raise serializers.ValidationError(str(e))
         except Exception as e:
-            logger.error(f"Error al crear proveedor: {str(e)}")
+            logger.error("Error al crear proveedor: %s", e)
             raise serializers.ValidationError(f"Error al crear el proveedor: {str(e)}")
 
     def perform_update(self, serializer):
         try:
             serializer.save()
         except DjangoValidationError as e:
-            logger.error(f"Error de validación al actualizar proveedor: {str(e)}")
+            logger.error("Error de validación al actualizar proveedor: %s", e)
             raise serializers.ValidationError(str(e))
         except Exception as e:
-            logger.error(f"Error al actualizar proveedor: {str(e)}")
+            logger.error("Error al actualizar proveedor: %s", e)
             raise serializers.ValidationError(f"Error al actualizar el proveedor: {str(e)}")
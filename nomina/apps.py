@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class NominaConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'nomina'
+
+    def ready(self):
+        from . import signals  # noqa: F401 registra la invalidación de la caché
@@ -0,0 +1,68 @@
+"""
+Cálculo de horas extras y total de la nómina.
+
+El valor de la hora ordinaria es ``sueldo_base / (30 * 8)`` y la hora extra se
+paga a 1.5 veces ese valor, así que el valor de las horas extras se reduce a
+``sueldo_base * horas_extras * FACTOR_HORA_EXTRA``. Las mismas fórmulas se
+exponen como expresiones SQL para anotar querysets.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db.models import DecimalField, ExpressionWrapper, F, Value
+from django.db.models.functions import Round
+
+DIAS_MES = Decimal('30')
+HORAS_DIA = Decimal('8')
+RECARGO_HORA_EXTRA = Decimal('1.5')
+FACTOR_HORA_EXTRA = RECARGO_HORA_EXTRA / (DIAS_MES * HORAS_DIA)  # 0.00625, exacto
+CENTAVOS = Decimal('0.01')
+
+
+def a_decimal(valor):
+    if valor is None:
+        return Decimal('0')
+    if isinstance(valor, Decimal):
+        return valor
+    return Decimal(str(valor))
+
+
+def valor_horas_extras(sueldo_base, horas_extras):
+    return (a_decimal(sueldo_base) * a_decimal(horas_extras) * FACTOR_HORA_EXTRA).quantize(CENTAVOS, rounding=ROUND_HALF_UP)
+
+
+def calcular_total(sueldo_base, horas_extras=0, bonificaciones=0, deducciones=0):
+    return (
+        a_decimal(sueldo_base)
+        + valor_horas_extras(sueldo_base, horas_extras)
+        + a_decimal(bonificaciones)
+        - a_decimal(deducciones)
+    )
+
+
+def expresion_valor_horas_extras():
+    """Equivalente SQL de ``valor_horas_extras`` para usar en ``annotate``"""
+    # ROUND de Postgres redondea la mitad hacia arriba, igual que ROUND_HALF_UP
+    return Round(
+        ExpressionWrapper(
+            F('sueldo_base') * F('horas_extras') * Value(FACTOR_HORA_EXTRA),
+            output_field=DecimalField(max_digits=14, decimal_places=5)
+        ),
+        2,
+        output_field=DecimalField(max_digits=14, decimal_places=2)
+    )
+
+
+def expresion_total():
+    """Equivalente SQL de ``calcular_total`` para usar en ``annotate``"""
+    return ExpressionWrapper(
+        F('sueldo_base') + expresion_valor_horas_extras() + F('bonificaciones') - F('deducciones'),
+        output_field=DecimalField(max_digits=14, decimal_places=2)
+    )
+
+
+def recalcular_totales(queryset):
+    """
+    Versión por lotes de ``calcular_total``: fija ``total`` de todas las
+    nóminas del queryset con un solo UPDATE. Devuelve las filas afectadas.
+    """
+    return queryset.update(total=expresion_total())
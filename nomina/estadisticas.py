@@ -0,0 +1,81 @@
+from decimal import Decimal
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+ESTADISTICAS_VERSION_KEY = 'nomina:estadisticas:version'
+ESTADISTICAS_TIMEOUT = 300  # segundos
+
+
+def obtener_version():
+    return cache.get_or_set(ESTADISTICAS_VERSION_KEY, 1, None)
+
+
+def invalidar_estadisticas():
+    """Invalida todas las estadísticas en caché subiendo la versión"""
+    try:
+        cache.incr(ESTADISTICAS_VERSION_KEY)
+    except ValueError:
+        cache.set(ESTADISTICAS_VERSION_KEY, 1, None)
+
+
+def clave_cache(filtros, alcance, periodo_actual):
+    filtros_ordenados = '&'.join(f'{k}={v}' for k, v in sorted(filtros.items()) if v)
+    base = f'{filtros_ordenados}|{alcance}|{periodo_actual}'
+    digest = hashlib.md5(base.encode('utf-8')).hexdigest()
+    return f'nomina:estadisticas:v{obtener_version()}:{digest}'
+
+
+def calcular_estadisticas(queryset, periodo_actual):
+    """
+    Calcula las estadísticas de nómina con una sola consulta de agregación
+    condicional y una consulta agrupada para los empleados con mayor monto.
+    """
+    queryset = queryset.order_by()
+    agregados = queryset.aggregate(
+        total_nominas=Count('id'),
+        total_pagado=Count('id', filter=Q(estado='Pagado')),
+        total_pendiente=Count('id', filter=Q(estado='Pendiente')),
+        total_cancelado=Count('id', filter=Q(estado='Cancelado')),
+        total_monto=Sum('total'),
+        total_pagado_monto=Sum('total', filter=Q(estado='Pagado')),
+        total_pendiente_monto=Sum('total', filter=Q(estado='Pendiente')),
+        total_periodo=Sum('total', filter=Q(periodo=periodo_actual)),
+    )
+
+    empleados_stats = list(
+        queryset.values('empleado__username').annotate(
+            total_nominas=Count('id'),
+            total_monto=Sum('total')
+        ).order_by('-total_monto')[:5]
+    )
+
+    return {
+        'general': {
+            'total_nominas': agregados['total_nominas'],
+            'total_pagado': agregados['total_pagado'],
+            'total_pendiente': agregados['total_pendiente'],
+            'total_cancelado': agregados['total_cancelado']
+        },
+        'montos': {
+            'total_monto': str(agregados['total_monto'] or Decimal('0')),
+            'total_pagado_monto': str(agregados['total_pagado_monto'] or Decimal('0')),
+            'total_pendiente_monto': str(agregados['total_pendiente_monto'] or Decimal('0'))
+        },
+        'periodo_actual': {
+            'periodo': periodo_actual,
+            'total': str(agregados['total_periodo'] or Decimal('0'))
+        },
+        'top_empleados': empleados_stats
+    }
+
+
+def obtener_estadisticas(queryset, filtros, alcance, periodo_actual):
+    """Devuelve las estadísticas desde la caché o las calcula y las guarda"""
+    clave = clave_cache(filtros, alcance, periodo_actual)
+    estadisticas = cache.get(clave)
+    if estadisticas is None:
+        estadisticas = calcular_estadisticas(queryset, periodo_actual)
+        cache.set(clave, estadisticas, ESTADISTICAS_TIMEOUT)
+    return estadisticas
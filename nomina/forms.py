@@ -3,6 +3,7 @@ from .models import Nomina
 from decimal import Decimal
 from datetime import datetime
 import calendar
+from .calculos import calcular_total
 
 class NominaForm(forms.ModelForm):
     comentario = forms.CharField(
@@ -125,17 +126,12 @@ class NominaForm(forms.ModelForm):
     def clean(self):
         cleaned_data = super().clean()
         try:
-            sueldo_base = cleaned_data.get('sueldo_base', Decimal('0'))
-            horas_extras = cleaned_data.get('horas_extras', Decimal('0'))
-            bonificaciones = cleaned_data.get('bonificaciones', Decimal('0'))
-            deducciones = cleaned_data.get('deducciones', Decimal('0'))
-
-            # Calcular el valor de las horas extras (1.5 veces el valor hora normal)
-            valor_hora_normal = sueldo_base / (Decimal('30') * Decimal('8'))  # 30 días, 8 horas por día
-            valor_horas_extras = horas_extras * valor_hora_normal * Decimal('1.5')
-
-            # Calcular el total
-            cleaned_data['total'] = sueldo_base + valor_horas_extras + bonificaciones - deducciones
+            cleaned_data['total'] = calcular_total(
+                cleaned_data.get('sueldo_base', Decimal('0')),
+                cleaned_data.get('horas_extras', Decimal('0')),
+                cleaned_data.get('bonificaciones', Decimal('0')),
+                cleaned_data.get('deducciones', Decimal('0'))
+            )
         except Exception as e:
             raise forms.ValidationError(f'Error al calcular el total: {str(e)}')
         
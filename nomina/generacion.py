@@ -0,0 +1,120 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import calendar
+
+from django.db import connection, transaction
+
+from asistencia.models import RegistroAsistencia
+from asistencia.resumen import jornadas_por_usuario
+from .calculos import recalcular_totales
+from .estadisticas import invalidar_estadisticas
+from .models import Nomina
+
+JORNADA_ORDINARIA = timedelta(hours=8)
+MAX_HORAS_EXTRAS_DIA = Decimal('4')  # Máximo 4 horas extras por día
+
+
+def rango_periodo(periodo):
+    """Devuelve la primera y la última fecha de un período ``YYYY-MM``"""
+    inicio = datetime.strptime(periodo, '%Y-%m').date()
+    year, month = inicio.year, inicio.month
+    return inicio, date(year, month, calendar.monthrange(year, month)[1])
+
+
+def calcular_asistencia_periodo(periodo):
+    """
+    Calcula días trabajados y horas extras por trabajador a partir de los pares
+    entrada/salida del período, agrupados en la base de datos.
+    """
+    fecha_inicio, fecha_fin = rango_periodo(periodo)
+    registros = RegistroAsistencia.objects.filter(fecha__range=[fecha_inicio, fecha_fin])
+
+    asistencia = {}
+    for jornada in jornadas_por_usuario(registros):
+        if jornada['duracion'] is None or jornada['duracion'] <= timedelta(0):
+            continue
+        datos = asistencia.setdefault(
+            jornada['usuario_id'],
+            {'dias_trabajados': Decimal('0'), 'horas_extras': Decimal('0')}
+        )
+        datos['dias_trabajados'] += 1
+        extra = jornada['duracion'] - JORNADA_ORDINARIA
+        if extra > timedelta(0):
+            horas = Decimal(extra.total_seconds()) / Decimal('3600')
+            datos['horas_extras'] += min(horas, MAX_HORAS_EXTRAS_DIA).quantize(Decimal('0.01'))
+    return asistencia
+
+
+def ultimo_sueldo_base(empleado_ids):
+    """Sueldo base de la última nómina de cada empleado, en una sola consulta"""
+    return dict(
+        Nomina.objects.filter(empleado_id__in=empleado_ids)
+        .order_by('empleado_id', '-periodo', '-fecha_creacion')
+        .distinct('empleado_id')
+        .values_list('empleado_id', 'sueldo_base')
+    )
+
+
+def generar_nominas_periodo(periodo, usuario=None, sueldo_base=None, batch_size=500):
+    """
+    Genera las nóminas de un período para todos los trabajadores con asistencia
+    registrada. Los empleados que ya tienen nómina en el período se omiten.
+
+    La verificación de existentes y el ``bulk_create`` corren en la misma
+    transacción, bajo un lock del período: dos generaciones concurrentes del
+    mismo período se ejecutan una detrás de otra y la segunda omite lo que
+    insertó la primera.
+    """
+    rango_periodo(periodo)  # Valida el formato antes de consultar
+    asistencia = calcular_asistencia_periodo(periodo)
+
+    with transaction.atomic():
+        bloquear_periodo(periodo)
+        resultado = insertar_nominas_periodo(periodo, asistencia, usuario, sueldo_base, batch_size)
+    # bulk_create no dispara post_save
+    invalidar_estadisticas()
+    return resultado
+
+
+def bloquear_periodo(periodo):
+    """Lock de Postgres sobre el período, liberado al terminar la transacción."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [f'nomina:{periodo}'])
+
+
+def insertar_nominas_periodo(periodo, asistencia, usuario, sueldo_base, batch_size):
+    existentes = set(
+        Nomina.objects.filter(periodo=periodo, empleado_id__in=asistencia.keys())
+        .values_list('empleado_id', flat=True)
+    )
+    pendientes = [empleado_id for empleado_id in asistencia if empleado_id not in existentes]
+    sueldos = ultimo_sueldo_base(pendientes)
+
+    nominas = []
+    sin_sueldo_base = []
+    for empleado_id in pendientes:
+        sueldo = sueldos.get(empleado_id) or sueldo_base
+        if not sueldo:
+            sin_sueldo_base.append(empleado_id)
+            continue
+        datos = asistencia[empleado_id]
+        nominas.append(Nomina(
+            empleado_id=empleado_id,
+            periodo=periodo,
+            dias_trabajados=datos['dias_trabajados'],
+            sueldo_base=sueldo,
+            horas_extras=datos['horas_extras'],
+            total=Decimal('0'),
+            ultimo_cambio_por=usuario,
+        ))
+
+    Nomina.objects.bulk_create(nominas, batch_size=batch_size)
+    # Los totales se calculan en la base, en un solo UPDATE para todo el lote
+    recalcular_totales(Nomina.objects.filter(pk__in=[nomina.pk for nomina in nominas]))
+
+    return {
+        'periodo': periodo,
+        'creadas': len(nominas),
+        'omitidas': sorted(existentes),
+        'sin_sueldo_base': sin_sueldo_base,
+    }
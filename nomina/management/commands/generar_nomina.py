@@ -0,0 +1,42 @@
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from nomina.generacion import generar_nominas_periodo
+
+
+class Command(BaseCommand):
+    help = 'Genera las nóminas de un período (YYYY-MM) a partir de los registros de asistencia'
+
+    def add_arguments(self, parser):
+        parser.add_argument('periodo', help='Período en formato YYYY-MM')
+        parser.add_argument(
+            '--sueldo-base',
+            help='Sueldo base para los empleados sin nóminas anteriores'
+        )
+
+    def handle(self, *args, **options):
+        periodo = options['periodo']
+        sueldo_base = None
+        if options['sueldo_base']:
+            try:
+                sueldo_base = Decimal(options['sueldo_base'])
+            except InvalidOperation:
+                raise CommandError('El sueldo base debe ser un número')
+
+        try:
+            resultado = generar_nominas_periodo(periodo, sueldo_base=sueldo_base)
+        except ValueError:
+            raise CommandError('El período debe tener el formato YYYY-MM')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado["creadas"]} nóminas generadas para el período {periodo}'
+        ))
+        if resultado['omitidas']:
+            self.stdout.write(self.style.WARNING(
+                f'{len(resultado["omitidas"])} empleados ya tenían nómina en el período'
+            ))
+        if resultado['sin_sueldo_base']:
+            self.stdout.write(self.style.WARNING(
+                f'Empleados sin sueldo base: {", ".join(map(str, resultado["sin_sueldo_base"]))}'
+            ))
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nomina', '0004_alter_nomina_options_nomina_comentario_and_more'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                # Filtros por período y estado; INCLUDE permite sumar el total
+                # de las estadísticas con un index-only scan.
+                'CREATE INDEX IF NOT EXISTS nomina_periodo_estado_incl '
+                'ON nomina_nomina (periodo, estado) INCLUDE (total);',
+                # Nóminas de un empleado (filtro ?empleado= y duplicados por período)
+                'CREATE INDEX IF NOT EXISTS nomina_empleado_periodo '
+                'ON nomina_nomina (empleado_id, periodo);',
+                # Orden del listado y paginación por cursor
+                'CREATE INDEX IF NOT EXISTS nomina_creacion_desc '
+                'ON nomina_nomina (fecha_creacion DESC);',
+            ],
+            reverse_sql=[
+                'DROP INDEX IF EXISTS nomina_periodo_estado_incl;',
+                'DROP INDEX IF EXISTS nomina_empleado_periodo;',
+                'DROP INDEX IF EXISTS nomina_creacion_desc;',
+            ],
+        ),
+    ]
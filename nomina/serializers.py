@@ -4,6 +4,15 @@ from usuarios.serializers import UsuarioSerializer
 from datetime import datetime
 import calendar
 from decimal import Decimal
+from .calculos import valor_horas_extras
+
+def normalizar_periodo(value):
+    """Valida ``YYYY-MM`` y lo devuelve con el mes en dos dígitos ('2025-3' -> '2025-03')."""
+    try:
+        return datetime.strptime(value, '%Y-%m').strftime('%Y-%m')
+    except (TypeError, ValueError):
+        raise serializers.ValidationError('El período debe tener el formato YYYY-MM')
+
 
 class NominaSerializer(serializers.ModelSerializer):
     empleado_nombre = serializers.SerializerMethodField()
@@ -61,10 +70,13 @@ class NominaSerializer(serializers.ModelSerializer):
             return None
     
     def get_valor_horas_extras(self, obj):
+        # En los listados el valor viene anotado desde la consulta
+        anotado = getattr(obj, 'valor_horas_extras_anotado', None)
+        if anotado is not None:
+            return anotado
         try:
             if obj.sueldo_base and obj.horas_extras:
-                valor_hora_normal = Decimal(str(obj.sueldo_base)) / (Decimal('30') * Decimal('8'))
-                return obj.horas_extras * valor_hora_normal * Decimal('1.5')
+                return valor_horas_extras(obj.sueldo_base, obj.horas_extras)
             return Decimal('0')
         except Exception:
             return Decimal('0')
@@ -77,11 +89,7 @@ class NominaSerializer(serializers.ModelSerializer):
             return obj.periodo
     
     def validate_periodo(self, value):
-        try:
-            datetime.strptime(value, '%Y-%m')
-        except ValueError:
-            raise serializers.ValidationError('El período debe tener el formato YYYY-MM')
-        return value
+        return normalizar_periodo(value)
     
     def validate_dias_trabajados(self, value):
         if value <= 0:
@@ -119,4 +127,18 @@ class NominaSerializer(serializers.ModelSerializer):
                     'horas_extras': f'Las horas extras no pueden ser mayores a {max_horas} para {data["dias_trabajados"]} días trabajados'
                 })
         
-        return data 
\ No newline at end of file
+        return data 
+
+class GenerarPeriodoSerializer(serializers.Serializer):
+    periodo = serializers.RegexField(
+        r'^\d{4}-\d{1,2}$',
+        error_messages={'invalid': 'El período debe tener el formato YYYY-MM'},
+    )
+    sueldo_base = serializers.DecimalField(
+        max_digits=12, decimal_places=2, min_value=Decimal('0.01'),
+        required=False, allow_null=True,
+        error_messages={'min_value': 'El sueldo base debe ser mayor a 0'},
+    )
+
+    def validate_periodo(self, value):
+        return normalizar_periodo(value)
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .estadisticas import invalidar_estadisticas
+from .models import Nomina
+
+
+@receiver([post_save, post_delete], sender=Nomina)
+def nomina_modificada(sender, **kwargs):
+    invalidar_estadisticas()
@@ -0,0 +1,223 @@
+from datetime import date, time
+from decimal import Decimal
+
+from django.contrib.auth.models import Permission
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient, APITestCase
+
+from asistencia.models import RegistroAsistencia
+from backend.testing import PlanConsultaMixin
+from usuarios.models import Usuario
+from .calculos import (
+    calcular_total,
+    expresion_total,
+    expresion_valor_horas_extras,
+    recalcular_totales,
+    valor_horas_extras,
+)
+from .generacion import generar_nominas_periodo
+from .models import Nomina
+
+CASOS = [
+    # sueldo_base, horas_extras, bonificaciones, deducciones
+    (Decimal('1300000.00'), Decimal('0.00'), Decimal('0.00'), Decimal('0.00')),
+    (Decimal('1300000.00'), Decimal('12.50'), Decimal('50000.00'), Decimal('20000.00')),
+    (Decimal('1000.00'), Decimal('1.00'), Decimal('0.00'), Decimal('0.00')),
+    (Decimal('999.99'), Decimal('3.33'), Decimal('10.10'), Decimal('5.05')),
+    (Decimal('2400.00'), Decimal('40.00'), Decimal('0.00'), Decimal('100.00')),
+]
+
+
+class CalculosNominaTests(SimpleTestCase):
+    def test_valor_horas_extras_coincide_con_formula_original(self):
+        sueldo_base, horas_extras = Decimal('1300000.00'), Decimal('12.50')
+        valor_hora_normal = sueldo_base / (Decimal('30') * Decimal('8'))
+        esperado = (horas_extras * valor_hora_normal * Decimal('1.5')).quantize(Decimal('0.01'))
+        self.assertEqual(valor_horas_extras(sueldo_base, horas_extras), esperado)
+
+
+class CalculosNominaSQLTests(TestCase):
+    def setUp(self):
+        empleado = Usuario.objects.create_user(username='empleado', password='clave-prueba')
+        for i, (sueldo_base, horas_extras, bonificaciones, deducciones) in enumerate(CASOS):
+            Nomina.objects.create(
+                empleado=empleado,
+                periodo=f'2025-{i + 1:02d}',
+                dias_trabajados=Decimal('30'),
+                sueldo_base=sueldo_base,
+                horas_extras=horas_extras,
+                bonificaciones=bonificaciones,
+                deducciones=deducciones,
+                total=Decimal('0'),
+            )
+
+    def test_recalcular_totales_en_un_update(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(recalcular_totales(Nomina.objects.all()), len(CASOS))
+        for nomina in Nomina.objects.all():
+            self.assertEqual(
+                nomina.total,
+                calcular_total(nomina.sueldo_base, nomina.horas_extras,
+                               nomina.bonificaciones, nomina.deducciones)
+            )
+
+    def test_anotacion_coincide_con_calculo_python(self):
+        nominas = Nomina.objects.annotate(
+            valor_sql=expresion_valor_horas_extras(),
+            total_sql=expresion_total(),
+        )
+        for nomina in nominas:
+            self.assertEqual(
+                nomina.valor_sql,
+                valor_horas_extras(nomina.sueldo_base, nomina.horas_extras)
+            )
+            self.assertEqual(
+                nomina.total_sql,
+                calcular_total(nomina.sueldo_base, nomina.horas_extras,
+                               nomina.bonificaciones, nomina.deducciones)
+            )
+
+
+class GenerarPeriodoTests(TestCase):
+    def setUp(self):
+        self.empleado = Usuario.objects.create_user(username='empleado', password='clave-prueba', rol='TEC')
+        RegistroAsistencia.objects.bulk_create([
+            RegistroAsistencia(usuario=self.empleado, fecha=date(2025, 3, 3), hora=hora, tipo=tipo)
+            for tipo, hora in (('ENT', time(7, 0)), ('SAL', time(17, 0)))
+        ])
+
+    def test_segunda_generacion_omite_existentes(self):
+        primera = generar_nominas_periodo('2025-03', sueldo_base=Decimal('1300000'))
+        segunda = generar_nominas_periodo('2025-03', sueldo_base=Decimal('1300000'))
+        self.assertEqual(primera['creadas'], 1)
+        self.assertEqual(segunda['creadas'], 0)
+        self.assertEqual(segunda['omitidas'], [self.empleado.pk])
+        self.assertEqual(Nomina.objects.filter(periodo='2025-03').count(), 1)
+
+    def test_totales_calculados_en_la_base(self):
+        generar_nominas_periodo('2025-03', sueldo_base=Decimal('1300000'))
+        nomina = Nomina.objects.get(periodo='2025-03')
+        # 10 horas de jornada: 2 horas extras
+        self.assertEqual(nomina.horas_extras, Decimal('2.00'))
+        self.assertEqual(nomina.total, calcular_total(nomina.sueldo_base, nomina.horas_extras))
+
+    def test_endpoint_requiere_permiso(self):
+        # add_nomina no alcanza: generar un período exige gestionar_nomina
+        self.empleado.user_permissions.add(
+            Permission.objects.get(content_type__app_label='nomina', codename='add_nomina')
+        )
+        cliente = APIClient()
+        cliente.force_authenticate(Usuario.objects.get(pk=self.empleado.pk))
+        response = cliente.post('/api/nomina/generar-periodo/', {'periodo': '2025-03'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['detail'], 'No tiene permisos para generar nóminas')
+        self.assertFalse(Nomina.objects.exists())
+
+    def test_endpoint_valida_parametros(self):
+        cliente = APIClient()
+        cliente.force_authenticate(Usuario.objects.create_superuser(username='admin', password='clave-prueba'))
+        url = '/api/nomina/generar-periodo/'
+
+        for datos in (
+            {'periodo': '2025-03', 'sueldo_base': 'NaN'},
+            {'periodo': '2025-03', 'sueldo_base': '0'},
+            {'periodo': '2025-13'},
+            {'periodo': 'marzo'},
+            {},
+        ):
+            self.assertEqual(cliente.post(url, datos, format='json').status_code, 400, datos)
+
+        response = cliente.post(url, {'periodo': '2025-3', 'sueldo_base': '1300000'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['periodo'], '2025-03')
+        response = cliente.post(url, {'periodo': '2025-03', 'sueldo_base': '1300000'}, format='json')
+        self.assertEqual(response.data['creadas'], 0)
+        self.assertEqual(Nomina.objects.filter(periodo='2025-03').count(), 1)
+
+
+class NominaActualizacionTests(APITestCase):
+    def setUp(self):
+        self.admin = Usuario.objects.create_superuser(username='admin', password='clave-prueba')
+        self.client.force_authenticate(self.admin)
+        self.nomina = Nomina.objects.create(
+            empleado=self.admin, periodo='2025-03', dias_trabajados=Decimal('30'),
+            sueldo_base=Decimal('2400.00'), horas_extras=Decimal('0'), total=Decimal('2400.00'),
+        )
+
+    def test_patch_devuelve_valor_horas_extras_actualizado(self):
+        response = self.client.patch(f'/api/nomina/{self.nomina.pk}/', {'horas_extras': '8.00'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(str(response.data['valor_horas_extras'])), valor_horas_extras(
+            Decimal('2400.00'), Decimal('8.00')
+        ))
+
+
+class NominaExportacionTests(APITestCase):
+    url = '/api/nomina/exportar/'
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(
+            username='contable', password='clave-prueba', rol='TEC', first_name='=HYPERLINK("http://x")'
+        )
+        Nomina.objects.create(
+            empleado=self.usuario, periodo='2025-03', dias_trabajados=Decimal('30'),
+            sueldo_base=Decimal('2400.00'), horas_extras=Decimal('0'), total=Decimal('2400.00'),
+        )
+
+    def autenticar(self, *permisos):
+        self.usuario.user_permissions.add(
+            *Permission.objects.filter(content_type__app_label='usuarios', codename__in=permisos)
+        )
+        # Usuario recién leído: has_perm no reutiliza permisos ya calculados
+        self.client.force_authenticate(Usuario.objects.get(pk=self.usuario.pk))
+
+    def test_exportar_requiere_permiso(self):
+        self.autenticar()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        self.autenticar('ver_reportes')
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_csv_escapa_formulas(self):
+        self.autenticar('ver_reportes')
+
+        response = self.client.get(self.url, {'formato': 'csv'})
+        contenido = b''.join(response.streaming_content).decode('utf-8')
+
+        self.assertIn('\'=HYPERLINK(""http://x"")', contenido)
+        self.assertIn('2400.00', contenido)
+
+
+class NominaIndicesTests(PlanConsultaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.empleados = [
+            Usuario.objects.create_user(username=f'empleado{i}', password='clave-prueba')
+            for i in range(10)
+        ]
+        Nomina.objects.bulk_create([
+            Nomina(
+                empleado=empleado,
+                periodo=f'{anio}-{mes:02d}',
+                dias_trabajados=Decimal('30'),
+                sueldo_base=Decimal('1300000'),
+                total=Decimal('1300000'),
+                estado='Pagado' if anio < 2025 else 'Pendiente',
+            )
+            for empleado in cls.empleados
+            for anio in (2023, 2024, 2025)
+            for mes in range(1, 13)
+        ])
+
+    def test_periodo_y_estado(self):
+        self.assertSinSeqScan(
+            Nomina.objects.filter(periodo='2024-06', estado='Pagado').values('total')
+        )
+
+    def test_empleado_y_periodo(self):
+        self.assertSinSeqScan(
+            Nomina.objects.filter(empleado=self.empleados[0], periodo='2024-06')
+        )
+
+    def test_listado_ordenado(self):
+        self.assertSinSeqScan(Nomina.objects.order_by('-fecha_creacion')[:100])
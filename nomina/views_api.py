@@ -3,26 +3,56 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from .models import Nomina
-from .serializers import NominaSerializer
-from decimal import Decimal
-from django.db.models import Sum, Count
+from .serializers import GenerarPeriodoSerializer, NominaSerializer
 from django.utils import timezone
 from datetime import datetime
 from django.db import transaction
+from backend.mixins import ListadoStreamingMixin
+from backend.exportacion import ExportacionMixin
+from backend.cache import RespuestaCondicionalMixin
+from backend.permissions import permiso_requerido, tiene_permiso
+from .calculos import calcular_total, expresion_valor_horas_extras
+from .estadisticas import obtener_estadisticas
+from .generacion import generar_nominas_periodo
 
-class NominaViewSet(viewsets.ModelViewSet):
+class NominaViewSet(ExportacionMixin, RespuestaCondicionalMixin, ListadoStreamingMixin, viewsets.ModelViewSet):
     queryset = Nomina.objects.all().order_by('-fecha_creacion')
     serializer_class = NominaSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-fecha_creacion',)
+    nombre_exportacion = 'nomina'
+    permisos_exportacion = ('usuarios.gestionar_nomina', 'usuarios.ver_reportes')
+    columnas_exportacion = [
+        ('id', 'ID'),
+        ('empleado__username', 'Usuario'),
+        ('empleado__first_name', 'Nombre'),
+        ('empleado__last_name', 'Apellido'),
+        ('periodo', 'Período'),
+        ('dias_trabajados', 'Días trabajados'),
+        ('sueldo_base', 'Sueldo base'),
+        ('horas_extras', 'Horas extras'),
+        ('valor_horas_extras_anotado', 'Valor horas extras'),
+        ('bonificaciones', 'Bonificaciones'),
+        ('deducciones', 'Deducciones'),
+        ('total', 'Total'),
+        ('estado', 'Estado'),
+        ('fecha_creacion', 'Fecha de creación'),
+    ]
 
     def get_permissions(self):
+        if self.action == 'generar_periodo':
+            # Los permission_classes del @action: exige gestionar_nomina
+            return super().get_permissions()
         if self.action in ['create', 'update', 'partial_update', 'destroy', 'procesar', 'cancelar']:
             return [permissions.IsAuthenticated(), permissions.DjangoModelPermissions()]
         return [permissions.IsAuthenticated()]
 
     def get_queryset(self):
         try:
-            queryset = Nomina.objects.all().order_by('-fecha_creacion')
+            queryset = Nomina.objects.select_related('empleado', 'ultimo_cambio_por').order_by('-fecha_creacion')
+            # Solo en lecturas: tras una escritura la anotación tendría el valor anterior
+            if self.action in ('list', 'retrieve', 'exportar'):
+                queryset = queryset.annotate(valor_horas_extras_anotado=expresion_valor_horas_extras())
             periodo = self.request.query_params.get('periodo', None)
             empleado = self.request.query_params.get('empleado', None)
             estado = self.request.query_params.get('estado', None)
@@ -54,7 +84,7 @@ class NominaViewSet(viewsets.ModelViewSet):
     @transaction.atomic
     def perform_create(self, serializer):
         try:
-            if not self.request.user.has_perm('usuarios.gestionar_nomina'):
+            if not tiene_permiso(self.request, 'usuarios.gestionar_nomina'):
                 raise PermissionDenied("No tiene permisos para crear nóminas")
 
             # Validar período
@@ -64,21 +94,16 @@ class NominaViewSet(viewsets.ModelViewSet):
 
             # Calcular el total antes de guardar
             data = serializer.validated_data
-            sueldo_base = Decimal(str(data['sueldo_base']))
-            horas_extras = Decimal(str(data.get('horas_extras', 0)))
-            bonificaciones = Decimal(str(data.get('bonificaciones', 0)))
-            deducciones = Decimal(str(data.get('deducciones', 0)))
+            sueldo_base = data['sueldo_base']
+            horas_extras = data.get('horas_extras', 0)
+            bonificaciones = data.get('bonificaciones', 0)
+            deducciones = data.get('deducciones', 0)
             
             # Validar valores negativos
             if any(x < 0 for x in [sueldo_base, horas_extras, bonificaciones, deducciones]):
                 raise ValidationError('Los valores no pueden ser negativos')
             
-            # Calcular el valor de las horas extras
-            valor_hora_normal = sueldo_base / (Decimal('30') * Decimal('8'))
-            valor_horas_extras = horas_extras * valor_hora_normal * Decimal('1.5')
-            
-            # Calcular el total
-            total = sueldo_base + valor_horas_extras + bonificaciones - deducciones
+            total = calcular_total(sueldo_base, horas_extras, bonificaciones, deducciones)
             
             if total < 0:
                 raise ValidationError('El total no puede ser negativo')
@@ -94,7 +119,7 @@ class NominaViewSet(viewsets.ModelViewSet):
     @transaction.atomic
     def perform_update(self, serializer):
         try:
-            if not self.request.user.has_perm('usuarios.gestionar_nomina'):
+            if not tiene_permiso(self.request, 'usuarios.gestionar_nomina'):
                 raise PermissionDenied("No tiene permisos para actualizar nóminas")
 
             instance = serializer.instance
@@ -109,23 +134,19 @@ class NominaViewSet(viewsets.ModelViewSet):
                 if instance.estado == 'Pagado' and nuevo_estado != 'Pagado':
                     raise ValidationError('No se puede modificar una nómina ya pagada')
             
-            # Calcular el total antes de actualizar
+            # Calcular el total antes de actualizar (en PATCH se completan
+            # los campos ausentes con los valores actuales)
             data = serializer.validated_data
-            sueldo_base = Decimal(str(data['sueldo_base']))
-            horas_extras = Decimal(str(data.get('horas_extras', 0)))
-            bonificaciones = Decimal(str(data.get('bonificaciones', 0)))
-            deducciones = Decimal(str(data.get('deducciones', 0)))
+            sueldo_base = data.get('sueldo_base', instance.sueldo_base)
+            horas_extras = data.get('horas_extras', instance.horas_extras)
+            bonificaciones = data.get('bonificaciones', instance.bonificaciones)
+            deducciones = data.get('deducciones', instance.deducciones)
             
             # Validar valores negativos
             if any(x < 0 for x in [sueldo_base, horas_extras, bonificaciones, deducciones]):
                 raise ValidationError('Los valores no pueden ser negativos')
             
-            # Calcular el valor de las horas extras
-            valor_hora_normal = sueldo_base / (Decimal('30') * Decimal('8'))
-            valor_horas_extras = horas_extras * valor_hora_normal * Decimal('1.5')
-            
-            # Calcular el total
-            total = sueldo_base + valor_horas_extras + bonificaciones - deducciones
+            total = calcular_total(sueldo_base, horas_extras, bonificaciones, deducciones)
             
             if total < 0:
                 raise ValidationError('El total no puede ser negativo')
@@ -141,56 +162,48 @@ class NominaViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def estadisticas(self, request):
         try:
-            if not self.request.user.has_perm('usuarios.ver_reportes'):
+            if not tiene_permiso(self.request, 'usuarios.ver_reportes'):
                 raise PermissionDenied("No tiene permisos para ver estadísticas")
 
-            # Estadísticas generales
-            total_nominas = self.get_queryset().count()
-            total_pagado = self.get_queryset().filter(estado='Pagado').count()
-            total_pendiente = self.get_queryset().filter(estado='Pendiente').count()
-            total_cancelado = self.get_queryset().filter(estado='Cancelado').count()
-            
-            # Totales monetarios
-            total_monto = self.get_queryset().aggregate(total=Sum('total'))['total'] or Decimal('0')
-            total_pagado_monto = self.get_queryset().filter(estado='Pagado').aggregate(total=Sum('total'))['total'] or Decimal('0')
-            total_pendiente_monto = self.get_queryset().filter(estado='Pendiente').aggregate(total=Sum('total'))['total'] or Decimal('0')
-            
-            # Estadísticas por período
             periodo_actual = timezone.now().strftime('%Y-%m')
-            nominas_periodo = self.get_queryset().filter(periodo=periodo_actual)
-            total_periodo = nominas_periodo.aggregate(total=Sum('total'))['total'] or Decimal('0')
-            
-            # Estadísticas por empleado
-            empleados_stats = self.get_queryset().values('empleado__username').annotate(
-                total_nominas=Count('id'),
-                total_monto=Sum('total')
-            ).order_by('-total_monto')[:5]
-            
-            return Response({
-                'general': {
-                    'total_nominas': total_nominas,
-                    'total_pagado': total_pagado,
-                    'total_pendiente': total_pendiente,
-                    'total_cancelado': total_cancelado
-                },
-                'montos': {
-                    'total_monto': str(total_monto),
-                    'total_pagado_monto': str(total_pagado_monto),
-                    'total_pendiente_monto': str(total_pendiente_monto)
-                },
-                'periodo_actual': {
-                    'periodo': periodo_actual,
-                    'total': str(total_periodo)
-                },
-                'top_empleados': empleados_stats
-            })
+            filtros = {
+                clave: self.request.query_params.get(clave)
+                for clave in ('periodo', 'empleado', 'estado')
+            }
+            # Las estadísticas no se filtran por usuario: el alcance es el
+            # permiso con el que se consultan.
+            alcance = 'ver_reportes'
+
+            estadisticas = obtener_estadisticas(
+                self.get_queryset(), filtros, alcance, periodo_actual
+            )
+            return Response(estadisticas)
         except Exception as e:
             raise ValidationError(f"Error al obtener estadísticas: {str(e)}")
 
+    @action(
+        detail=False, methods=['post'], url_path='generar-periodo',
+        permission_classes=[permiso_requerido('usuarios.gestionar_nomina', 'No tiene permisos para generar nóminas')],
+    )
+    def generar_periodo(self, request):
+        parametros = GenerarPeriodoSerializer(data=request.data)
+        parametros.is_valid(raise_exception=True)
+
+        try:
+            resultado = generar_nominas_periodo(
+                parametros.validated_data['periodo'],
+                usuario=request.user,
+                sueldo_base=parametros.validated_data.get('sueldo_base'),
+            )
+        except Exception as e:
+            raise ValidationError(f"Error al generar las nóminas: {str(e)}")
+
+        return Response(resultado, status=status.HTTP_201_CREATED)
+
     @action(detail=True, methods=['post'])
     def procesar(self, request, pk=None):
         try:
-            if not self.request.user.has_perm('usuarios.gestionar_nomina'):
+            if not tiene_permiso(self.request, 'usuarios.gestionar_nomina'):
                 raise PermissionDenied("No tiene permisos para procesar nóminas")
 
             nomina = self.get_object()
@@ -211,7 +224,7 @@ class NominaViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def cancelar(self, request, pk=None):
         try:
-            if not self.request.user.has_perm('usuarios.gestionar_nomina'):
+            if not tiene_permiso(self.request, 'usuarios.gestionar_nomina'):
                 raise PermissionDenied("No tiene permisos para cancelar nóminas")
 
             nomina = self.get_object()
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ObrasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'obras'
+
+    def ready(self):
+        from . import signals  # noqa: F401 registra variantes de fotos y cambios de trabajadores
@@ -0,0 +1,30 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from backend.imagenes import clave_marca, generar_variantes
+from proyectos.models import Proyecto
+from obras.models import Obra
+
+
+class Command(BaseCommand):
+    help = 'Genera las variantes WebP de las fotos de obras y proyectos ya cargadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forzar', action='store_true',
+                            help='Regenera también las fotos que ya tienen variantes')
+
+    def handle(self, *args, **options):
+        for modelo in (Obra, Proyecto):
+            nombres = (
+                modelo.objects.exclude(foto='').exclude(foto__isnull=True)
+                .values_list('foto', flat=True).iterator()
+            )
+            generadas = 0
+            for nombre in nombres:
+                if not options['forzar'] and cache.get(clave_marca(nombre)):
+                    continue
+                if generar_variantes(nombre):
+                    generadas += 1
+            self.stdout.write(f'  {modelo._meta.verbose_name_plural}: {generadas} fotos procesadas')
+
+        self.stdout.write(self.style.SUCCESS('Variantes de fotos generadas correctamente'))
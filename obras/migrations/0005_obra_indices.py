@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('obras', '0004_obra_delete_obras'),
+    ]
+
+    operations = [
+        # El filtro de mis_obras usa obras_obra_trabajadores.usuario_id, que
+        # ya tiene índice propio por ser FK de la tabla intermedia.
+        migrations.AddIndex(
+            model_name='obra',
+            index=models.Index(fields=['-fecha_creacion'], name='obras_obra_creacion_desc'),
+        ),
+    ]
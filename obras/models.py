@@ -102,4 +102,7 @@ class Obra(models.Model):
         verbose_name = "Obra"
         verbose_name_plural = "Obras"
         ordering = ['-fecha_creacion']
-        app_label = 'obras'
\ No newline at end of file
+        app_label = 'obras'
+        indexes = [
+            models.Index(fields=['-fecha_creacion'], name='obras_obra_creacion_desc'),
+        ]
\ No newline at end of file
@@ -4,8 +4,9 @@ from proyectos.serializers import ProyectoSerializer
 from usuarios.serializers import UserBasicSerializer
 from django.core.validators import FileExtensionValidator
 from django.core.exceptions import ValidationError
+from backend.imagenes import VariantesFotoListSerializer, VariantesFotoSerializerMixin
 
-class ObraSerializer(serializers.ModelSerializer):
+class ObraSerializer(VariantesFotoSerializerMixin, serializers.ModelSerializer):
     proyecto = ProyectoSerializer(read_only=True)
     supervisor = UserBasicSerializer(read_only=True)
     arquitecto = UserBasicSerializer(read_only=True)
@@ -29,6 +30,8 @@ class ObraSerializer(serializers.ModelSerializer):
             'avance',
             'foto',
             'foto_url',
+            'foto_thumb_url',
+            'foto_srcset',
             'supervisor',
             'arquitecto',
             'trabajadores',
@@ -37,6 +40,7 @@ class ObraSerializer(serializers.ModelSerializer):
             'fecha_actualizacion'
         ]
         read_only_fields = ['id', 'fecha_creacion', 'fecha_actualizacion']
+        list_serializer_class = VariantesFotoListSerializer
         extra_kwargs = {
             'supervisor': {'write_only': True},
             'arquitecto': {'write_only': True},
@@ -83,6 +87,38 @@ class ObraSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("La fecha de fin no puede ser anterior a la de inicio")
         return data
 
+class ObraLiteSerializer(VariantesFotoSerializerMixin, serializers.ModelSerializer):
+    """Representación plana de la obra para listados (?view=lite)"""
+    estado_display = serializers.CharField(source='get_estado_display', read_only=True)
+    proyecto_nombre = serializers.CharField(source='proyecto.nombre', read_only=True)
+    supervisor_nombre = serializers.CharField(source='supervisor.get_full_name', read_only=True, allow_null=True)
+    arquitecto_nombre = serializers.CharField(source='arquitecto.get_full_name', read_only=True, allow_null=True)
+    trabajadores = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Obra
+        fields = [
+            'id',
+            'nombre',
+            'proyecto',
+            'proyecto_nombre',
+            'estado',
+            'estado_display',
+            'avance',
+            'fecha_inicio',
+            'fecha_fin',
+            'supervisor',
+            'supervisor_nombre',
+            'arquitecto',
+            'arquitecto_nombre',
+            'trabajadores',
+            'foto_thumb_url',
+            'foto_srcset',
+            'fecha_actualizacion'
+        ]
+        read_only_fields = fields
+        list_serializer_class = VariantesFotoListSerializer
+
 class ObraCreateUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Obra
@@ -0,0 +1,38 @@
+from django.db.models.signals import m2m_changed, post_save, pre_save
+from django.utils import timezone
+
+from backend.imagenes import foto_guardada, foto_por_guardar
+from proyectos.models import Proyecto
+from .models import Obra
+
+# La foto del proyecto se muestra en las tarjetas de obra, así que sus
+# variantes se registran junto con las de la obra.
+pre_save.connect(foto_por_guardar, sender=Obra, dispatch_uid='obras_obra_foto_anterior')
+pre_save.connect(foto_por_guardar, sender=Proyecto, dispatch_uid='proyectos_proyecto_foto_anterior')
+post_save.connect(foto_guardada, sender=Obra, dispatch_uid='obras_obra_variantes_foto')
+post_save.connect(foto_guardada, sender=Proyecto, dispatch_uid='proyectos_proyecto_variantes_foto')
+
+
+def trabajadores_cambiados(sender, instance, action, reverse, pk_set, **kwargs):
+    """Actualiza fecha_actualizacion para que el ETag de la obra cambie."""
+    if reverse:
+        # instance es el usuario; en clear hay que leer sus obras antes de borrar
+        if action == 'pre_clear':
+            instance._obras_desasignadas = list(instance.obras_asignadas.values_list('pk', flat=True))
+            return
+        if action == 'post_clear':
+            pk_set = instance.__dict__.pop('_obras_desasignadas', ())
+        elif action not in ('post_add', 'post_remove'):
+            return
+        obras = Obra.objects.filter(pk__in=pk_set or ())
+    elif action == 'post_clear' or (action in ('post_add', 'post_remove') and pk_set):
+        obras = Obra.objects.filter(pk=instance.pk)
+    else:
+        return
+    obras.update(fecha_actualizacion=timezone.now())
+
+
+m2m_changed.connect(
+    trabajadores_cambiados, sender=Obra.trabajadores.through,
+    dispatch_uid='obras_obra_trabajadores_actualizacion',
+)
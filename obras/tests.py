@@ -1,3 +1,218 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import date
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from backend import imagenes
+from backend.imagenes import generar_variantes, ruta_variante
+from backend.testing import PlanConsultaMixin
+from proyectos.models import Proyecto
+from PIL import Image
+from usuarios.models import Usuario
+from .models import Obra
+from .serializers import ObraLiteSerializer
+
+
+class ObrasDePruebaMixin:
+    def setUp(self):
+        self.arquitecto = Usuario.objects.create_user(
+            username='arquitecto', password='clave-prueba', rol='ARQ'
+        )
+        self.supervisor = Usuario.objects.create_user(
+            username='supervisor', password='clave-prueba', rol='SUP'
+        )
+        self.trabajadores = [
+            Usuario.objects.create_user(username=f'tec{i}', password='clave-prueba', rol='TEC')
+            for i in range(3)
+        ]
+        self.client.force_authenticate(self.arquitecto)
+
+    def crear_obras(self, cantidad):
+        for _ in range(cantidad):
+            proyecto = Proyecto.objects.create(
+                nombre='Proyecto de prueba',
+                fecha_inicio=date(2025, 1, 1),
+                responsable=self.arquitecto,
+            )
+            obra = Obra.objects.create(
+                proyecto=proyecto,
+                nombre='Obra de prueba',
+                direccion='Calle 1',
+                supervisor=self.supervisor,
+                arquitecto=self.arquitecto,
+                fecha_inicio=date(2025, 1, 1),
+            )
+            obra.trabajadores.set(self.trabajadores)
+
+
+class ObraListQueryCountTests(ObrasDePruebaMixin, APITestCase):
+    url = '/api/obras/'
+
+    def contar_consultas(self, params=None):
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(self.url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(contexto), response
+
+    def test_list_numero_de_consultas_constante(self):
+        self.crear_obras(2)
+        consultas_pocas, _ = self.contar_consultas()
+
+        self.crear_obras(20)
+        consultas_muchas, response = self.contar_consultas()
+
+        self.assertEqual(len(response.data), 22)
+        self.assertEqual(consultas_pocas, consultas_muchas)
+
+    def test_list_lite_numero_de_consultas_constante(self):
+        self.crear_obras(2)
+        consultas_pocas, _ = self.contar_consultas({'view': 'lite'})
+
+        self.crear_obras(20)
+        consultas_muchas, response = self.contar_consultas({'view': 'lite'})
+
+        self.assertEqual(consultas_pocas, consultas_muchas)
+        obra = response.data[0]
+        self.assertNotIn('descripcion', obra)
+        self.assertIsInstance(obra['proyecto'], int)
+        self.assertEqual(obra['supervisor'], self.supervisor.id)
+        self.assertCountEqual(obra['trabajadores'], [t.id for t in self.trabajadores])
+
+
+class ObraIndicesTests(PlanConsultaMixin, ObrasDePruebaMixin, APITestCase):
+    def test_mis_obras(self):
+        self.crear_obras(5)
+        self.assertSinSeqScan(Obra.objects.filter(trabajadores=self.trabajadores[0]))
+
+    def test_listado_ordenado(self):
+        self.crear_obras(5)
+        self.assertSinSeqScan(Obra.objects.order_by('-fecha_creacion')[:100])
+
+
+class ObraRespuestaCondicionalTests(ObrasDePruebaMixin, APITestCase):
+    url = '/api/obras/'
+
+    def test_listado_sin_cambios_devuelve_304(self):
+        self.crear_obras(3)
+        etag = self.client.get(self.url)['ETag']
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([q for q in contexto if 'obras_obra_trabajadores' in q['sql']])
+
+    def test_listado_cambia_etag_al_modificar_o_borrar(self):
+        self.crear_obras(3)
+        etag = self.client.get(self.url)['ETag']
+
+        obra = Obra.objects.first()
+        obra.avance = 50
+        obra.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        Obra.objects.exclude(pk=obra.pk).first().delete()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_listado_cambia_etag_al_asignar_trabajador(self):
+        self.crear_obras(2)
+        etag = self.client.get(self.url)['ETag']
+        obra = Obra.objects.first()
+        nuevo = Usuario.objects.create_user(username='tec-nuevo', password='clave-prueba', rol='TEC')
+        response = self.client.post(f'{self.url}{obra.pk}/asignar_trabajador/', {'trabajador_id': nuevo.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get(self.url)['ETag']
+        nuevo.obras_asignadas.clear()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_listado_if_modified_since_no_oculta_borrados(self):
+        self.crear_obras(3)
+        response = self.client.get(self.url)
+        Obra.objects.order_by('fecha_creacion').first().delete()
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_detalle_if_modified_since(self):
+        self.crear_obras(1)
+        obra = Obra.objects.get()
+        response = self.client.get(f'{self.url}{obra.pk}/')
+        response = self.client.get(f'{self.url}{obra.pk}/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+
+class ObraVariantesFotoTests(ObrasDePruebaMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        self.configuracion = override_settings(MEDIA_ROOT=self.media)
+        self.configuracion.enable()
+        self.addCleanup(self.configuracion.disable)
+        cache.clear()
+
+    def foto(self, ancho, alto):
+        contenido = BytesIO()
+        Image.new('RGB', (ancho, alto), 'orange').save(contenido, 'JPEG')
+        return SimpleUploadedFile('foto.jpg', contenido.getvalue(), content_type='image/jpeg')
+
+    def test_variantes_webp_sin_ampliar(self):
+        self.crear_obras(1)
+        obra = Obra.objects.get()
+        obra.foto = self.foto(1000, 750)
+        obra.save()
+
+        self.assertEqual(generar_variantes(obra.foto.name), [320, 768])
+        with Image.open(f'{self.media}/{ruta_variante(obra.foto.name, 320)}') as miniatura:
+            self.assertEqual((miniatura.format, miniatura.width), ('WEBP', 320))
+
+        datos = ObraLiteSerializer(obra).data
+        self.assertTrue(datos['foto_thumb_url'].endswith('_320.webp'))
+        self.assertIn('768w', datos['foto_srcset'])
+
+    def test_sin_variantes_devuelve_original(self):
+        self.crear_obras(1)
+        obra = Obra.objects.get()
+        obra.foto = self.foto(200, 200)
+        obra.save()
+        datos = ObraLiteSerializer(obra).data
+        self.assertEqual(datos['foto_thumb_url'], obra.foto.url)
+        self.assertIsNone(datos['foto_srcset'])
+
+    def test_listado_lee_marcas_sin_tocar_el_almacenamiento(self):
+        self.crear_obras(3)
+        for obra in Obra.objects.all():
+            obra.foto = self.foto(400, 300)
+            obra.save()
+            generar_variantes(obra.foto.name)
+        with mock.patch('backend.imagenes.default_storage.exists') as existe, \
+                mock.patch('backend.imagenes.cache.get') as lectura:
+            datos = ObraLiteSerializer(Obra.objects.all(), many=True).data
+        existe.assert_not_called()
+        lectura.assert_not_called()
+        self.assertTrue(all(item['foto_thumb_url'].endswith('_320.webp') for item in datos))
+
+    def test_reemplazar_foto_borra_variantes_anteriores(self):
+        self.crear_obras(1)
+        obra = Obra.objects.get()
+        obra.foto = self.foto(400, 300)
+        obra.save()
+        anterior = obra.foto.name
+        generar_variantes(anterior)
+
+        obra = Obra.objects.get()
+        obra.foto = self.foto(500, 300)
+        with mock.patch.object(imagenes._ejecutor, 'submit', side_effect=lambda tarea, *args: tarea(*args)), \
+                self.captureOnCommitCallbacks(execute=True):
+            obra.save()
+        self.assertFalse(os.path.exists(f'{self.media}/{ruta_variante(anterior, 320)}'))
+        self.assertTrue(os.path.exists(f'{self.media}/{ruta_variante(obra.foto.name, 320)}'))
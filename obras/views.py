@@ -3,18 +3,61 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from .models import Obra
-from .serializers import ObraSerializer, ObraCreateUpdateSerializer
+from django.db.models import Prefetch
+from .serializers import ObraSerializer, ObraCreateUpdateSerializer, ObraLiteSerializer
 from usuarios.models import Usuario
 from usuarios.permissions import EsSupervisorOArquitecto
 from proyectos.models import Proyecto
+from backend.mixins import ListadoStreamingMixin
+from backend.cache import RespuestaCondicionalMixin
 
-class ObraViewSet(viewsets.ModelViewSet):
+# Columnas necesarias para la representación de usuarios anidados
+CAMPOS_USUARIO_BASICO = ('id', 'username', 'first_name', 'last_name', 'rol')
+
+# Columnas necesarias para la representación "lite"
+CAMPOS_OBRA_LITE = (
+    'id', 'nombre', 'estado', 'avance', 'fecha_inicio', 'fecha_fin', 'fecha_actualizacion', 'foto',
+    'proyecto', 'proyecto__nombre',
+    'supervisor', 'supervisor__first_name', 'supervisor__last_name',
+    'arquitecto', 'arquitecto__first_name', 'arquitecto__last_name',
+)
+
+# El ETag de listado y detalle sale de Obra.fecha_actualizacion; las
+# señales la actualizan al cambiar los trabajadores asignados. No la tocan
+# los cambios en el proyecto (nombre, responsable, asignados) ni en los datos
+# de supervisor, arquitecto o trabajadores (nombre, rol): esos se ven cuando
+# la obra se modifica o el cliente recarga sin If-None-Match.
+class ObraViewSet(RespuestaCondicionalMixin, ListadoStreamingMixin, viewsets.ModelViewSet):
     queryset = Obra.objects.all()
     permission_classes = [IsAuthenticated]
+    cursor_ordering = ('-fecha_creacion',)
+
+    def es_vista_lite(self):
+        return (
+            self.action in ['list', 'mis_obras']
+            and self.request.query_params.get('view') == 'lite'
+        )
+
+    def get_queryset(self):
+        # Número fijo de consultas sin importar la cantidad de obras:
+        # una con JOIN para las FK y una por cada relación many-to-many.
+        queryset = Obra.objects.select_related('proyecto', 'supervisor', 'arquitecto')
+
+        if self.es_vista_lite():
+            return queryset.only(*CAMPOS_OBRA_LITE).prefetch_related(
+                Prefetch('trabajadores', queryset=Usuario.objects.only('id'))
+            )
+
+        return queryset.select_related('proyecto__responsable').prefetch_related(
+            'proyecto__asignados',
+            Prefetch('trabajadores', queryset=Usuario.objects.only(*CAMPOS_USUARIO_BASICO)),
+        )
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return ObraCreateUpdateSerializer
+        if self.es_vista_lite():
+            return ObraLiteSerializer
         return ObraSerializer
 
     def get_serializer_context(self):
@@ -23,9 +66,7 @@ class ObraViewSet(viewsets.ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         try:
-            queryset = self.get_queryset()
-            serializer = self.get_serializer(queryset, many=True)
-            return Response(serializer.data)
+            return super().list(request, *args, **kwargs)
         except Exception as e:
             return Response(
                 {'error': str(e)},
@@ -34,9 +75,7 @@ class ObraViewSet(viewsets.ModelViewSet):
 
     def retrieve(self, request, *args, **kwargs):
         try:
-            instance = self.get_object()
-            serializer = self.get_serializer(instance)
-            return Response(serializer.data)
+            return super().retrieve(request, *args, **kwargs)
         except Exception as e:
             return Response(
                 {'error': str(e)},
@@ -129,7 +168,7 @@ class ObraViewSet(viewsets.ModelViewSet):
     def mis_obras(self, request):
         try:
             user = request.user
-            queryset = Obra.objects.filter(trabajadores=user)
+            queryset = self.get_queryset().filter(trabajadores=user)
             serializer = self.get_serializer(queryset, many=True)
             return Response(serializer.data)
         except Exception as e:
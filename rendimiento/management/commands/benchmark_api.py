@@ -0,0 +1,172 @@
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from materiales.models import Material
+from rendimiento.utils import commit_actual, percentil
+from usuarios.models import Usuario
+
+
+# Escenarios de escritura que necesitan un usuario sin marcaciones previas
+USUARIO_NUEVO = {'asistencia_registrar'}
+
+
+def escenarios(material_id, empleado_id):
+    hoy = date.today()
+    hace_un_mes = (hoy - timedelta(days=30)).isoformat()
+    periodo = f'{hoy.year}-{hoy.month:02d}'
+    return [
+        ('obras_listado', 'GET', '/api/obras/', {}),
+        ('obras_listado_lite', 'GET', '/api/obras/', {'view': 'lite'}),
+        ('obras_pagina', 'GET', '/api/obras/', {'page_size': 100}),
+        ('asistencia_registros', 'GET', '/api/asistencia/registros/',
+         {'fecha_inicio': hace_un_mes, 'fecha_fin': hoy.isoformat(), 'page_size': 100}),
+        ('asistencia_resumen', 'GET', '/api/asistencia/resumen/',
+         {'fecha_inicio': hace_un_mes, 'fecha_fin': hoy.isoformat()}),
+        ('asistencia_registrar', 'POST', '/api/asistencia/registrar/', {'tipo': 'ENT'}),
+        ('nomina_periodo', 'GET', '/api/nomina/', {'periodo': periodo, 'page_size': 100}),
+        ('nomina_estadisticas', 'GET', '/api/nomina/estadisticas/', {}),
+        ('materiales_pagina', 'GET', '/api/materiales/', {'page_size': 100}),
+        ('materiales_busqueda', 'GET', '/api/materiales/', {'search': 'cemen'}),
+        ('materiales_bajo_minimo', 'GET', '/api/materiales/', {'estado_stock': 'Bajo', 'page_size': 100}),
+        ('materiales_estadisticas', 'GET', '/api/materiales/estadisticas/', {}),
+        # Escrituras: cada iteración se revierte
+        ('materiales_crear', 'POST', '/api/materiales/', {
+            'nombre': 'Material benchmark', 'cantidad': '10', 'stock_minimo': '5',
+            'precio_unitario': '1000', 'unidad_medida': 'un',
+        }),
+        ('inventario_movimiento', 'POST', '/api/inventario/movimientos/',
+         {'material': material_id, 'tipo': 'ENT', 'cantidad': '5'}),
+        ('nomina_crear', 'POST', '/api/nomina/', {
+            # Período sin nóminas sembradas
+            'empleado': empleado_id, 'periodo': f'{hoy.year + 1}-01',
+            'dias_trabajados': '30', 'sueldo_base': '1300000',
+        }),
+        ('nomina_generar_periodo', 'POST', '/api/nomina/generar-periodo/', {'periodo': periodo}),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Ejecuta los escenarios de carga contra la API y guarda latencias (p50/p95/p99), '
+        'número de consultas y memoria pico en un reporte JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iteraciones', type=int, default=30)
+        parser.add_argument('--calentamiento', type=int, default=3)
+        parser.add_argument('--salida', default='benchmark.json', help='Ruta del reporte JSON')
+        parser.add_argument('--comparar', help='Reporte JSON anterior contra el cual comparar p95')
+        parser.add_argument('--solo', nargs='*', help='Nombres de escenarios a ejecutar')
+
+    def handle(self, *args, **options):
+        supervisor = Usuario.objects.filter(rol='SUP', username__startswith='bench_').first()
+        if supervisor is None:
+            raise CommandError('No hay datos de rendimiento. Ejecute primero: manage.py seed_benchmark')
+
+        lectura = Client()
+        lectura.force_login(supervisor)
+        material_id = Material.objects.filter(codigo__startswith='BEN').values_list('id', flat=True).first()
+        empleado_id = Usuario.objects.filter(username__startswith='bench_tec_').values_list('id', flat=True).first()
+
+        resultados = {}
+        for nombre, metodo, url, params in escenarios(material_id, empleado_id):
+            if options['solo'] and nombre not in options['solo']:
+                continue
+            self.stdout.write(f'  {nombre}...', ending='')
+            resultados[nombre] = self.medir(nombre, lectura, metodo, url, params, options)
+            self.stdout.write(
+                f" p50={resultados[nombre]['p50_ms']}ms p95={resultados[nombre]['p95_ms']}ms "
+                f"consultas={resultados[nombre]['consultas']}"
+            )
+
+        reporte = {
+            'fecha': timezone.now().isoformat(),
+            'commit': commit_actual(),
+            'base_de_datos': settings.DATABASES['default']['ENGINE'],
+            'iteraciones': options['iteraciones'],
+            'escenarios': resultados,
+        }
+        with open(options['salida'], 'w', encoding='utf-8') as archivo:
+            json.dump(reporte, archivo, indent=2, ensure_ascii=False)
+
+        if options['comparar']:
+            self.comparar(resultados, options['comparar'])
+
+        self.stdout.write(self.style.SUCCESS(f"Reporte guardado en {options['salida']}"))
+
+    def ejecutar(self, cliente, metodo, url, params):
+        if metodo == 'GET':
+            response = cliente.get(url, params, secure=True)
+        else:
+            response = cliente.post(url, params, content_type='application/json', secure=True)
+        # Consumir el cuerpo para incluir el tiempo de generación de las respuestas en streaming
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def medir(self, nombre, cliente, metodo, url, params, options):
+        tiempos, consultas, memoria = [], [], []
+        total = options['calentamiento'] + options['iteraciones']
+        for i in range(total):
+            # Las escrituras se revierten para que cada iteración parta del mismo estado
+            with transaction.atomic():
+                if nombre in USUARIO_NUEVO:
+                    cliente = Client()
+                    cliente.force_login(Usuario.objects.create_user(
+                        username=f'bench_escritura_{i}', password='benchmark', rol='TEC'
+                    ))
+                tracemalloc.start()
+                with CaptureQueriesContext(connection) as contexto:
+                    inicio = time.perf_counter()
+                    response = self.ejecutar(cliente, metodo, url, params)
+                    duracion = (time.perf_counter() - inicio) * 1000
+                pico = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                transaction.set_rollback(True)
+
+            if response.status_code >= 400:
+                raise CommandError(f'{metodo} {url} respondió {response.status_code}')
+            if i < options['calentamiento']:
+                continue
+            tiempos.append(duracion)
+            consultas.append(len(contexto))
+            memoria.append(pico)
+
+        tiempos.sort()
+        return {
+            'metodo': metodo,
+            'url': url,
+            'parametros': params,
+            'p50_ms': round(percentil(tiempos, 50), 2),
+            'p95_ms': round(percentil(tiempos, 95), 2),
+            'p99_ms': round(percentil(tiempos, 99), 2),
+            'max_ms': round(tiempos[-1], 2),
+            'media_ms': round(statistics.fmean(tiempos), 2),
+            'consultas': max(consultas),
+            'memoria_pico_kb': round(max(memoria) / 1024, 1),
+        }
+
+    def comparar(self, resultados, ruta):
+        with open(ruta, encoding='utf-8') as archivo:
+            anterior = json.load(archivo)['escenarios']
+        self.stdout.write('\nComparación de p95 contra el reporte anterior:')
+        for nombre, actual in resultados.items():
+            if nombre not in anterior:
+                continue
+            base = anterior[nombre]['p95_ms']
+            cambio = (actual['p95_ms'] - base) / base * 100 if base else 0
+            estilo = self.style.ERROR if cambio > 10 else self.style.SUCCESS
+            self.stdout.write(estilo(
+                f"  {nombre}: {base}ms -> {actual['p95_ms']}ms ({cambio:+.1f}%), "
+                f"consultas {anterior[nombre]['consultas']} -> {actual['consultas']}"
+            ))
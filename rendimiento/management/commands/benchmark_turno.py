@@ -0,0 +1,120 @@
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib import error, request as urllib_request
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from asistencia.models import RegistroAsistencia
+from rendimiento.utils import commit_actual, percentil
+from usuarios.models import Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        'Simula el pico de marcación al inicio de turno contra uno o más servidores en ejecución '
+        '(por ejemplo WSGI y ASGI) y compara el throughput y las latencias.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--servidor', action='append', required=True,
+            help='nombre=url, por ejemplo wsgi=http://127.0.0.1:8000 (repetible)'
+        )
+        parser.add_argument('--trabajadores', type=int, default=1000,
+                            help='Trabajadores que marcan entrada en el pico')
+        parser.add_argument('--concurrencia', type=int, default=200,
+                            help='Conexiones simultáneas del generador de carga')
+        parser.add_argument('--salida', default='benchmark_turno.json')
+
+    def handle(self, *args, **options):
+        usuarios = list(
+            Usuario.objects.filter(username__startswith='bench_tec_').order_by('id')[:options['trabajadores']]
+        )
+        if not usuarios:
+            raise CommandError('No hay datos de rendimiento. Ejecute primero: manage.py seed_benchmark')
+        tokens = [str(AccessToken.for_user(usuario)) for usuario in usuarios]
+
+        resultados = {}
+        for indice, servidor in enumerate(options['servidor']):
+            nombre, _, url = servidor.partition('=')
+            if not url:
+                raise CommandError(f'Servidor inválido: {servidor}. Use nombre=url')
+            # Una fecha distinta por servidor para que ninguna marcación sea duplicada
+            fecha = date.today() + timedelta(days=400 + indice)
+            self.stdout.write(f'  {nombre} ({url})...', ending='')
+            try:
+                resultados[nombre] = self.pico(url.rstrip('/'), tokens, fecha, options['concurrencia'])
+            finally:
+                RegistroAsistencia.objects.filter(fecha=fecha, usuario__in=usuarios).delete()
+            self.stdout.write(
+                f" {resultados[nombre]['peticiones_por_segundo']} req/s, "
+                f"p95={resultados[nombre]['p95_ms']}ms, errores={resultados[nombre]['errores']}"
+            )
+
+        reporte = {
+            'fecha': timezone.now().isoformat(),
+            'commit': commit_actual(),
+            'trabajadores': len(tokens),
+            'concurrencia': options['concurrencia'],
+            'servidores': resultados,
+        }
+        with open(options['salida'], 'w', encoding='utf-8') as archivo:
+            json.dump(reporte, archivo, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f"Reporte guardado en {options['salida']}"))
+
+    def peticion(self, metodo, url, token, cuerpo=None):
+        datos = json.dumps(cuerpo).encode('utf-8') if cuerpo is not None else None
+        peticion = urllib_request.Request(url, data=datos, method=metodo, headers={
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/json',
+        })
+        inicio = time.perf_counter()
+        try:
+            with urllib_request.urlopen(peticion, timeout=30) as respuesta:
+                respuesta.read()
+                estado = respuesta.status
+        except error.HTTPError as e:
+            estado = e.code
+        except (error.URLError, OSError):
+            estado = None
+        return (time.perf_counter() - inicio) * 1000, estado
+
+    def pico(self, url, tokens, fecha, concurrencia):
+        tiempos, errores = [], []
+        lock = threading.Lock()
+
+        def marcar(token):
+            # Cada trabajador marca entrada y luego refresca su lista, como hace la app
+            for metodo, ruta, cuerpo in (
+                ('POST', '/api/asistencia/registrar/', {'tipo': 'ENT', 'fecha': fecha.isoformat()}),
+                ('GET', f'/api/asistencia/mis-registros/?fecha_inicio={fecha}&fecha_fin={fecha}', None),
+            ):
+                duracion, estado = self.peticion(metodo, url + ruta, token, cuerpo)
+                with lock:
+                    tiempos.append(duracion)
+                    if estado is None or estado >= 400:
+                        errores.append(estado)
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrencia) as ejecutor:
+            list(ejecutor.map(marcar, tokens))
+        total = time.perf_counter() - inicio
+
+        tiempos.sort()
+        return {
+            'url': url,
+            'peticiones': len(tiempos),
+            'duracion_s': round(total, 2),
+            'peticiones_por_segundo': round(len(tiempos) / total, 1),
+            'p50_ms': round(percentil(tiempos, 50), 2),
+            'p95_ms': round(percentil(tiempos, 95), 2),
+            'p99_ms': round(percentil(tiempos, 99), 2),
+            'media_ms': round(statistics.fmean(tiempos), 2),
+            'errores': len(errores),
+        }
@@ -0,0 +1,251 @@
+import random
+from datetime import date, time, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, Permission
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from asistencia.models import RegistroAsistencia
+from inventario.movimientos import generar_cortes
+from materiales.models import CategoriaMaterial, Material, Proveedor
+from nomina.models import Nomina
+from obras.models import Obra
+from proyectos.models import Proyecto
+from usuarios.models import Usuario
+
+PREFIJO = 'bench'
+NOMBRES = ['Ana', 'Luis', 'Carlos', 'María', 'Jorge', 'Lucía', 'Pedro', 'Sofía', 'Andrés', 'Camila']
+APELLIDOS = ['Gómez', 'Rodríguez', 'Martínez', 'López', 'García', 'Pérez', 'Sánchez', 'Ramírez', 'Torres', 'Díaz']
+# Permisos de supervisores y arquitectos, para que los escenarios de
+# estadísticas y escritura del benchmark no respondan 403
+PERMISOS_JEFES = [
+    ('usuarios', 'ver_reportes'),
+    ('usuarios', 'gestionar_nomina'),
+    ('usuarios', 'gestionar_materiales'),
+    ('usuarios', 'gestionar_proyectos'),
+    ('nomina', 'add_nomina'),
+    ('nomina', 'change_nomina'),
+    ('materiales', 'add_material'),
+    ('materiales', 'change_material'),
+    ('inventario', 'add_movimientostock'),
+]
+MATERIALES = ['Cemento', 'Arena', 'Grava', 'Ladrillo', 'Varilla', 'Bloque', 'Tubo PVC', 'Cable', 'Pintura', 'Madera']
+
+
+def en_lotes(iterable, tamano):
+    iterador = iter(iterable)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera datos sintéticos con volúmenes realistas para las pruebas de rendimiento. '
+        'Usar solo en bases de datos de prueba.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escala', type=float, default=1.0,
+                            help='Multiplicador de todos los volúmenes (1.0 = volumen completo)')
+        parser.add_argument('--trabajadores', type=int, default=3000)
+        parser.add_argument('--proyectos', type=int, default=2000)
+        parser.add_argument('--obras', type=int, default=3000)
+        parser.add_argument('--dias', type=int, default=365, help='Días de asistencia por trabajador')
+        parser.add_argument('--meses-nomina', type=int, default=24)
+        parser.add_argument('--materiales', type=int, default=50000)
+        parser.add_argument('--lote', type=int, default=5000, help='Filas por bulk_create')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--reiniciar', action='store_true',
+                            help='Borra los datos de rendimiento existentes y los vuelve a generar')
+
+    def cantidad(self, options, clave):
+        return max(1, int(options[clave] * options['escala']))
+
+    def insertar(self, modelo, filas, lote):
+        total = 0
+        for bloque in en_lotes(filas, lote):
+            with transaction.atomic():
+                modelo.objects.bulk_create(bloque, batch_size=lote)
+            total += len(bloque)
+        self.stdout.write(f'  {modelo._meta.verbose_name_plural}: {total}')
+        return total
+
+    def borrar(self):
+        self.stdout.write('Borrando datos de rendimiento anteriores...')
+        usuarios = Usuario.objects.filter(username__startswith=f'{PREFIJO}_')
+        Material.objects.filter(codigo__startswith='BEN').delete()
+        Proveedor.objects.filter(nombre__startswith=f'Proveedor {PREFIJO} ').delete()
+        CategoriaMaterial.objects.filter(nombre__startswith=f'Categoría {PREFIJO} ').delete()
+        Nomina.objects.filter(empleado__in=usuarios).delete()
+        RegistroAsistencia.objects.filter(usuario__in=usuarios).delete()
+        Obra.objects.filter(nombre__startswith=f'Obra {PREFIJO} ').delete()
+        Proyecto.objects.filter(nombre__startswith=f'Proyecto {PREFIJO} ').delete()
+        usuarios.delete()
+
+    def asignar_permisos(self, jefes):
+        grupo, _ = Group.objects.get_or_create(name=f'{PREFIJO}_jefes')
+        permisos = Permission.objects.none()
+        for app_label, codename in PERMISOS_JEFES:
+            permisos |= Permission.objects.filter(content_type__app_label=app_label, codename=codename)
+        grupo.permissions.set(permisos)
+        Membresia = Usuario.groups.through
+        self.insertar(Membresia, (Membresia(usuario_id=jefe, group_id=grupo.id) for jefe in jefes), 5000)
+
+    def handle(self, *args, **options):
+        if Usuario.objects.filter(username__startswith=f'{PREFIJO}_').exists():
+            if not options['reiniciar']:
+                self.stdout.write(self.style.WARNING(
+                    'Los datos de rendimiento ya existen. Use --reiniciar para generarlos de nuevo.'
+                ))
+                return
+            self.borrar()
+
+        random.seed(options['semilla'])
+        lote = options['lote']
+        hoy = date.today()
+        clave = make_password('benchmark')
+
+        self.stdout.write('Generando datos de rendimiento...')
+
+        # Usuarios: un 5% supervisores y arquitectos, el resto trabajadores
+        n_trabajadores = self.cantidad(options, 'trabajadores')
+        n_jefes = max(2, n_trabajadores // 20)
+
+        def usuarios():
+            for i in range(n_trabajadores + n_jefes):
+                rol = 'TEC' if i < n_trabajadores else ('SUP' if i % 2 else 'ARQ')
+                yield Usuario(
+                    username=f'{PREFIJO}_{rol.lower()}_{i}',
+                    first_name=random.choice(NOMBRES),
+                    last_name=random.choice(APELLIDOS),
+                    email=f'{PREFIJO}_{i}@example.com',
+                    rol=rol,
+                    password=clave,
+                )
+        self.insertar(Usuario, usuarios(), lote)
+
+        trabajadores = list(Usuario.objects.filter(username__startswith=f'{PREFIJO}_tec_').values_list('id', flat=True))
+        supervisores = list(Usuario.objects.filter(username__startswith=f'{PREFIJO}_sup_').values_list('id', flat=True))
+        arquitectos = list(Usuario.objects.filter(username__startswith=f'{PREFIJO}_arq_').values_list('id', flat=True))
+        self.asignar_permisos(supervisores + arquitectos)
+
+        # Proyectos y obras
+        n_proyectos = self.cantidad(options, 'proyectos')
+        self.insertar(Proyecto, (
+            Proyecto(
+                nombre=f'Proyecto {PREFIJO} {i}',
+                descripcion='Proyecto generado para pruebas de rendimiento',
+                fecha_inicio=hoy - timedelta(days=random.randint(0, 1000)),
+                presupuesto=Decimal(random.randint(10_000_000, 5_000_000_000)),
+                responsable_id=random.choice(arquitectos),
+            )
+            for i in range(n_proyectos)
+        ), lote)
+        proyectos = list(Proyecto.objects.filter(nombre__startswith=f'Proyecto {PREFIJO} ').values_list('id', flat=True))
+
+        n_obras = self.cantidad(options, 'obras')
+        self.insertar(Obra, (
+            Obra(
+                proyecto_id=random.choice(proyectos),
+                nombre=f'Obra {PREFIJO} {i}',
+                direccion=f'Calle {random.randint(1, 200)} # {random.randint(1, 99)}-{random.randint(1, 99)}',
+                supervisor_id=random.choice(supervisores),
+                arquitecto_id=random.choice(arquitectos),
+                estado=random.choice(['PLAN', 'PROG', 'SUSP', 'COMP']),
+                fecha_inicio=hoy - timedelta(days=random.randint(0, 700)),
+                presupuesto=Decimal(random.randint(1_000_000, 900_000_000)),
+                avance=random.randint(0, 100),
+            )
+            for i in range(n_obras)
+        ), lote)
+        obras = list(Obra.objects.filter(nombre__startswith=f'Obra {PREFIJO} ').values_list('id', flat=True))
+        Asignacion = Obra.trabajadores.through
+        self.insertar(Asignacion, (
+            Asignacion(obra_id=random.choice(obras), usuario_id=trabajador)
+            for trabajador in trabajadores
+        ), lote)
+
+        # Asistencia: entrada y salida por trabajador y día hábil
+        n_dias = self.cantidad(options, 'dias')
+
+        def registros():
+            for dia in range(n_dias):
+                fecha = hoy - timedelta(days=dia)
+                if fecha.weekday() == 6:
+                    continue
+                for trabajador in trabajadores:
+                    if random.random() < 0.05:
+                        continue  # ausencias
+                    yield RegistroAsistencia(
+                        usuario_id=trabajador, fecha=fecha, tipo='ENT',
+                        hora=time(random.randint(6, 8), random.randint(0, 59)),
+                    )
+                    yield RegistroAsistencia(
+                        usuario_id=trabajador, fecha=fecha, tipo='SAL',
+                        hora=time(random.randint(15, 19), random.randint(0, 59)),
+                    )
+        self.insertar(RegistroAsistencia, registros(), lote)
+
+        # Nómina mensual
+        n_meses = self.cantidad(options, 'meses_nomina')
+
+        def nominas():
+            for mes in range(n_meses):
+                anio, numero = divmod(hoy.year * 12 + hoy.month - 1 - mes, 12)
+                periodo = f'{anio}-{numero + 1:02d}'
+                for trabajador in trabajadores:
+                    sueldo = Decimal(random.randint(1_300, 4_000) * 1000)
+                    horas = Decimal(random.randint(0, 40))
+                    yield Nomina(
+                        empleado_id=trabajador,
+                        periodo=periodo,
+                        dias_trabajados=Decimal(random.randint(20, 30)),
+                        sueldo_base=sueldo,
+                        horas_extras=horas,
+                        total=sueldo + sueldo * horas * Decimal('0.00625'),
+                        estado='Pagado' if mes > 0 else random.choice(['Pendiente', 'Pagado']),
+                    )
+        self.insertar(Nomina, nominas(), lote)
+
+        # Catálogo de materiales
+        self.insertar(CategoriaMaterial, (
+            CategoriaMaterial(nombre=f'Categoría {PREFIJO} {i}', codigo=f'B{i:03d}', orden=i)
+            for i in range(50)
+        ), lote)
+        self.insertar(Proveedor, (
+            Proveedor(
+                nombre=f'Proveedor {PREFIJO} {i}',
+                contacto=f'{random.choice(NOMBRES)} {random.choice(APELLIDOS)}',
+                telefono=f'300{i:07d}',
+                email=f'proveedor{i}@example.com',
+                direccion=f'Carrera {random.randint(1, 120)}',
+            )
+            for i in range(500)
+        ), lote)
+        categorias = list(CategoriaMaterial.objects.filter(nombre__startswith=f'Categoría {PREFIJO} ').values_list('id', flat=True))
+        proveedores = list(Proveedor.objects.filter(nombre__startswith=f'Proveedor {PREFIJO} ').values_list('id', flat=True))
+
+        n_materiales = self.cantidad(options, 'materiales')
+        self.insertar(Material, (
+            Material(
+                codigo=f'BEN{i:07d}',
+                nombre=f'{random.choice(MATERIALES)} {PREFIJO} {i}',
+                descripcion='Material generado para pruebas de rendimiento',
+                categoria_id=random.choice(categorias),
+                proveedor_id=random.choice(proveedores),
+                cantidad=Decimal(random.randint(0, 500)),
+                stock_minimo=Decimal(random.randint(10, 100)),
+                precio_unitario=Decimal(random.randint(1_000, 500_000)),
+            )
+            for i in range(n_materiales)
+        ), lote)
+        # El stock sembrado queda como corte: stock_en_fecha parte de él
+        generar_cortes()
+
+        self.stdout.write(self.style.SUCCESS('Datos de rendimiento generados correctamente'))
@@ -0,0 +1,23 @@
+import subprocess
+
+from django.conf import settings
+
+
+def percentil(valores, p):
+    """Percentil por interpolación lineal sobre valores ya ordenados."""
+    if len(valores) == 1:
+        return valores[0]
+    posicion = (len(valores) - 1) * p / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(valores) - 1)
+    return valores[inferior] + (valores[superior] - valores[inferior]) * (posicion - inferior)
+
+
+def commit_actual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None